@@ -1,6 +1,9 @@
 import json
+import statistics
 
+import openpyxl
 import pytest
+from aiohttp.test_utils import make_mocked_coro
 
 import virtool.analyses.format
 
@@ -72,3 +75,89 @@ async def test_load_results(loadable, mocker, tmpdir):
 
 
 
+
+
+@pytest.mark.parametrize("values", [
+    [5],
+    [3, 1, 2],
+    [4, 1, 3, 2],
+    [2, 2, 2, 2],
+    [0, 10, 3, 3, 7, 1]
+])
+def test_calculate_median(values):
+    """
+    Test that the result and its type match :func:`statistics.median`.
+
+    """
+    result = virtool.analyses.format.calculate_median(values)
+    expected = statistics.median(values)
+
+    assert result == expected
+    assert type(result) == type(expected)
+
+
+def test_calculate_median_empty():
+    assert virtool.analyses.format.calculate_median([]) == 0
+
+
+def test_write_analysis_to_excel(tmpdir):
+    path = str(tmpdir.join("foo.xlsx"))
+
+    rows = [
+        ["Prunus virus F", "Isolate 8816-s2", "KX269872", 1500, 0.75, 12, 0.5],
+        ["Prunus virus F", "Isolate 8816-s2", "KX269873", 1200, 0.25, 3.5, 0.25]
+    ]
+
+    virtool.analyses.format.write_analysis_to_excel(path, "Pathoscope for bar", iter(rows))
+
+    wb = openpyxl.load_workbook(path)
+    ws = wb["Pathoscope for bar"]
+
+    assert [list(row) for row in ws.iter_rows(values_only=True)] == [
+        list(virtool.analyses.format.CSV_HEADERS),
+        *rows
+    ]
+
+    assert ws["A1"].font.bold
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 2, 1000])
+async def test_format_analysis_to_csv(chunk_rows, mocker):
+    """
+    Test that the CSV output is the same regardless of how many rows are sent in each chunk.
+
+    """
+    mocker.patch("virtool.analyses.format.CSV_CHUNK_ROWS", chunk_rows)
+
+    formatted = {
+        "results": [
+            {
+                "name": "Prunus virus F",
+                "isolates": [
+                    {
+                        "source_type": "isolate",
+                        "source_name": "8816-s2",
+                        "sequences": [
+                            {"id": "foo", "accession": "KX269872", "length": 1500, "pi": 0.75, "coverage": 0.5},
+                            {"id": "bar", "accession": "KX269873", "length": 1200, "pi": 0.25, "coverage": 0.25}
+                        ]
+                    }
+                ]
+            }
+        ]
+    }
+
+    mocker.patch(
+        "virtool.analyses.format.prepare_analysis_export",
+        make_mocked_coro((formatted, {"foo": 12}))
+    )
+
+    chunks = [chunk async for chunk in virtool.analyses.format.format_analysis_to_csv({}, {})]
+
+    assert len(chunks) == {1: 2, 2: 1, 1000: 1}[chunk_rows]
+
+    assert "".join(chunks) == (
+        '"OTU","Isolate","Sequence","Length","Weight","Median Depth","Coverage"\r\n'
+        '"Prunus virus F","Isolate 8816-s2","KX269872",1500,0.75,12,0.5\r\n'
+        '"Prunus virus F","Isolate 8816-s2","KX269873",1200,0.25,0,0.25\r\n'
+    )
@@ -0,0 +1,36 @@
+import datetime
+import json
+
+import pytest
+
+import virtool.api.json
+
+
+def test_compact_dumps():
+    obj = {
+        "foo": [1, 2, {"bar": "baz"}],
+        "created_at": datetime.datetime(2015, 10, 6, 20, 0)
+    }
+
+    assert virtool.api.json.compact_dumps(obj) == '{"foo":[1,2,{"bar":"baz"}],"created_at":"2015-10-06T20:00:00Z"}'
+
+
+@pytest.mark.parametrize("pretty", [True, False])
+def test_encode(pretty):
+    obj = {"b": [1, 2], "a": "foo"}
+
+    encoded = virtool.api.json.encode(obj, pretty)
+
+    assert json.loads(encoded) == obj
+    assert (b"\n" in encoded) is pretty
+
+
+@pytest.mark.parametrize("obj,large", [
+    ({"foo": "bar"}, False),
+    ([1, 2, 3, 4], False),
+    ([1, 2, 3, 4, 5], True),
+    ({"foo": {"bar": [1, 2, 3]}}, True),
+    ({"foo": {"bar": [1, 2]}}, False)
+])
+def test_is_large(obj, large):
+    assert virtool.api.json.is_large(obj, threshold=5) is large
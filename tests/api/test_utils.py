@@ -0,0 +1,149 @@
+import datetime
+
+import pytest
+
+import virtool.api.utils
+
+
+@pytest.mark.parametrize("values", [
+    ["foo", 1],
+    [datetime.datetime(2015, 10, 6, 20, 0), "foo"],
+    [None, "foo"]
+])
+def test_cursor(values):
+    """
+    Test that values encoded as a cursor token are decoded unchanged.
+
+    """
+    token = virtool.api.utils.encode_cursor(values)
+
+    assert "=" not in token
+
+    decoded = virtool.api.utils.decode_cursor(token)
+
+    if isinstance(values[0], datetime.datetime):
+        decoded[0] = decoded[0].replace(tzinfo=None)
+
+    assert decoded == values
+
+
+@pytest.mark.parametrize("token", ["", "!!!", "eyJmb28iOiAxfQ", "Zm9v"])
+def test_decode_cursor_invalid(token):
+    """
+    Test that ``None`` is returned for invalid tokens and tokens that don't encode a list.
+
+    """
+    assert virtool.api.utils.decode_cursor(token) is None
+
+
+@pytest.mark.parametrize("sort,expected", [
+    (None, [("_id", 1)]),
+    ([("name", 1)], [("name", 1), ("_id", 1)]),
+    ([("name", 1), ("version", -1)], [("name", 1), ("version", -1), ("_id", -1)]),
+    ([("_id", -1)], [("_id", -1)])
+])
+def test_get_keyset_sort(sort, expected):
+    assert virtool.api.utils.get_keyset_sort(sort) == expected
+
+
+def test_get_sort_values():
+    document = {
+        "_id": "foo",
+        "otu": {
+            "name": "Bar",
+            "version": 3
+        },
+        "status": [
+            {"timestamp": 1},
+            {"timestamp": 2}
+        ]
+    }
+
+    sort = [
+        ("otu.name", 1),
+        ("otu.version", -1),
+        ("reference.id", 1),
+        ("status.0.timestamp", 1),
+        ("status.2.timestamp", 1),
+        ("_id", -1)
+    ]
+
+    assert virtool.api.utils.get_sort_values(document, sort) == ["Bar", 3, None, 1, None, "foo"]
+
+
+def test_compose_keyset_query():
+    sort = [("name", 1), ("version", -1), ("_id", -1)]
+
+    assert virtool.api.utils.compose_keyset_query(sort, ["Foo", 3, "bar"]) == {
+        "$or": [
+            {"name": {"$gt": "Foo"}},
+            {"name": "Foo", "version": {"$lt": 3}},
+            {"name": "Foo", "version": 3, "_id": {"$lt": "bar"}}
+        ]
+    }
+
+
+@pytest.mark.parametrize("per_page", [1, 2, 5])
+async def test_paginate_cursor(per_page, dbi):
+    """
+    Test that following ``next_cursor`` tokens returns every matching document once in sort order.
+
+    """
+    await dbi.samples.insert_many([
+        {"_id": "a", "name": "Foo", "ready": True},
+        {"_id": "b", "name": "Bar", "ready": True},
+        {"_id": "c", "name": "Foo", "ready": True},
+        {"_id": "d", "name": "Baz", "ready": False},
+        {"_id": "e", "name": "Abc", "ready": True}
+    ])
+
+    ids = list()
+    url_query = {"per_page": per_page}
+
+    while True:
+        data = await virtool.api.utils.paginate(
+            dbi.samples,
+            {"ready": True},
+            url_query,
+            sort="name",
+            projection=["_id", "name"]
+        )
+
+        assert data["found_count"] == 4
+        assert data["total_count"] == 5
+        assert len(data["documents"]) <= per_page
+
+        ids += [document["id"] for document in data["documents"]]
+
+        if data["next_cursor"] is None:
+            break
+
+        url_query = {"per_page": per_page, "cursor": data["next_cursor"]}
+
+    assert ids == ["e", "b", "a", "c"]
+
+
+async def test_paginate_no_count(dbi):
+    await dbi.samples.insert_many([{"_id": "a"}, {"_id": "b"}])
+
+    data = await virtool.api.utils.paginate(dbi.samples, {}, {"count": "false"})
+
+    assert data["found_count"] is data["total_count"] is data["page_count"] is None
+    assert [document["id"] for document in data["documents"]] == ["a", "b"]
+
+
+async def test_paginate_stale_count(dbi):
+    """
+    Test that documents are returned even if a cached count says there are none.
+
+    """
+    await dbi.files.insert_one({"_id": "foo", "ready": False})
+
+    assert (await virtool.api.utils.paginate(dbi.files, {"ready": True}, {}))["documents"] == []
+
+    await dbi.files.update_one({"_id": "foo"}, {"$set": {"ready": True}})
+
+    data = await virtool.api.utils.paginate(dbi.files, {"ready": True}, {})
+
+    assert data["found_count"] == 0
+    assert [document["id"] for document in data["documents"]] == ["foo"]
@@ -149,3 +149,136 @@ class TestCollection:
 
 
 
+
+    @pytest.mark.parametrize("attr_silent", [True, False])
+    @pytest.mark.parametrize("param_silent", [True, False])
+    async def test_update_many(self, attr_silent, param_silent, mocker, test_motor, create_test_collection):
+        collection = create_test_collection(projection=["tag"], silent=attr_silent)
+
+        m_distinct = mocker.spy(collection._collection, "distinct")
+
+        await test_motor.samples.insert_many([
+            {"_id": "foo", "tag": 1, "name": "Foo"},
+            {"_id": "bar", "tag": 2, "name": "Bar"},
+            {"_id": "baz", "tag": 1, "name": "Baz"}
+        ])
+
+        update_result = await collection.update_many({"tag": 1}, {"$set": {"tag": 3}}, silent=param_silent)
+
+        assert isinstance(update_result, pymongo.results.UpdateResult)
+        assert update_result.modified_count == 2
+
+        if attr_silent or param_silent:
+            assert not m_distinct.called
+            assert not collection.dispatch.called
+        else:
+            assert collection.processor.call_count == 2
+            assert {call[0][1]["_id"] for call in collection.processor.call_args_list} == {"foo", "baz"}
+            assert collection.processor.call_args[0][1].keys() == {"_id", "tag"}
+            collection.dispatch.assert_called_with("samples", "update", {"id": "foo", "mock": True})
+
+        assert await test_motor.samples.distinct("_id", {"tag": 3}) == ["foo", "baz"]
+
+    @pytest.mark.parametrize("attr_silent", [True, False])
+    @pytest.mark.parametrize("param_silent", [True, False])
+    @pytest.mark.parametrize("exists", [True, False])
+    async def test_update_one(self, attr_silent, param_silent, exists, mocker, test_motor, create_test_collection):
+        collection = create_test_collection(projection=["tag"], silent=attr_silent)
+
+        m_find_one = mocker.spy(collection._collection, "find_one")
+
+        await test_motor.samples.insert_many([
+            {"_id": "foo", "tag": 1, "name": "Foo"},
+            {"_id": "bar", "tag": 2, "name": "Bar"}
+        ])
+
+        query = {"_id": "foo" if exists else "baz"}
+
+        update_result = await collection.update_one(query, {"$set": {"tag": 3}}, silent=param_silent)
+
+        assert isinstance(update_result, pymongo.results.UpdateResult)
+        assert update_result.matched_count == int(exists)
+        assert update_result.upserted_id is None
+
+        # Dispatched updates can't tell if the matched document was changed.
+        if attr_silent or param_silent:
+            assert update_result.modified_count == int(exists)
+        else:
+            assert update_result.modified_count is None
+
+        assert not m_find_one.called
+
+        if exists and not (attr_silent or param_silent):
+            collection.processor.assert_called_with(test_motor, {"_id": "foo", "tag": 3})
+            collection.dispatch.assert_called_with("samples", "update", {"id": "foo", "mock": True})
+        else:
+            assert not collection.dispatch.called
+
+        assert await test_motor.samples.distinct("_id", {"tag": 3}) == (["foo"] if exists else [])
+
+    async def test_update_one_upsert(self, test_motor, create_test_collection):
+        collection = create_test_collection()
+
+        update_result = await collection.update_one({"_id": "foo"}, {"$set": {"tag": 3}}, upsert=True)
+
+        assert update_result.matched_count == 0
+        assert update_result.upserted_id == "foo"
+
+        collection.processor.assert_called_with(test_motor, {"_id": "foo", "tag": 3})
+
+    @pytest.mark.parametrize("processor", ["batch", "single", None])
+    async def test_apply_processors(self, processor, test_motor, create_test_collection):
+        collection = create_test_collection()
+
+        if processor == "batch":
+            collection.batch_processor = make_mocked_coro(return_value=[{"id": "foo", "batch": True}])
+
+        if processor is None:
+            collection.processor = None
+
+        documents = [{"_id": "foo"}, {"_id": "bar"}]
+
+        processed = await collection.apply_processors(documents)
+
+        if processor == "batch":
+            assert processed == [{"id": "foo", "batch": True}]
+            collection.batch_processor.assert_called_with(test_motor, documents)
+            assert not collection.processor.called
+        elif processor == "single":
+            assert processed == [{"id": "foo", "mock": True}] * 2
+        else:
+            assert processed == [{"id": "foo"}, {"id": "bar"}]
+
+        assert await collection.apply_processors([]) == []
+
+    async def test_count_documents_cached(self, mocker, test_motor, create_test_collection):
+        """
+        Test that counts are cached until they expire or documents are inserted or deleted through the collection.
+
+        """
+        collection = create_test_collection()
+
+        await test_motor.samples.insert_many([{"_id": "foo", "tag": 1}, {"_id": "bar", "tag": 1}])
+
+        assert await collection.count_documents_cached({"tag": 1}) == 2
+
+        # Writes made around the collection are not seen until the cached count expires.
+        await test_motor.samples.insert_one({"_id": "baz", "tag": 1})
+
+        assert await collection.count_documents_cached({"tag": 1}) == 2
+
+        mocker.patch("virtool.db.core.COUNT_CACHE_TTL", -1)
+
+        await collection.count_documents_cached({"tag": 1})
+
+        mocker.patch("virtool.db.core.COUNT_CACHE_TTL", 5)
+
+        assert await collection.count_documents_cached({"tag": 1}) == 3
+
+        await collection.delete_one({"_id": "foo"})
+
+        assert await collection.count_documents_cached({"tag": 1}) == 2
+
+        await collection.insert_one({"_id": "foo", "tag": 1})
+
+        assert await collection.count_documents_cached({"tag": 1}) == 3
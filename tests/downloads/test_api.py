@@ -1,5 +1,10 @@
+import gzip
+import json
+
 import pytest
 
+import virtool.references.utils
+
 
 @pytest.mark.parametrize("get", ["otu", "isolate", "sequence"])
 @pytest.mark.parametrize("missing", [None, "otu", "isolate", "sequence"])
@@ -60,3 +65,92 @@ async def test_all(get, missing, spawn_client):
         assert resp.status == 404
     else:
         assert resp.status == 200
+
+
+class TestDownloadReference:
+
+    @pytest.fixture
+    async def client(self, mocker, tmpdir, spawn_client):
+        client = await spawn_client(authorize=True)
+
+        client.app["settings"]["data_path"] = str(tmpdir)
+
+        await client.db.references.insert_one({
+            "_id": "foo",
+            "data_type": "genome",
+            "organism": "virus"
+        })
+
+        async def iter_export(app, ref_id, header):
+            encoder = virtool.references.utils.ExportEncoder(header)
+            yield encoder.encode([{"_id": "bar", "name": "Bar virus"}])
+            yield encoder.finish()
+
+        client.iter_export = mocker.patch("virtool.references.db.iter_export", side_effect=iter_export)
+
+        return client
+
+    @pytest.mark.parametrize("indexed", [True, False])
+    async def test(self, indexed, tmpdir, client):
+        if indexed:
+            await client.db.indexes.insert_one({
+                "_id": "baz",
+                "ready": True,
+                "reference": {
+                    "id": "foo"
+                },
+                "version": 0
+            })
+
+        resp = await client.get("/download/refs/foo")
+
+        assert resp.status == 200
+        assert resp.headers["Content-Type"] == "application/gzip"
+
+        assert json.loads(gzip.decompress(await resp.read())) == {
+            "data_type": "genome",
+            "organism": "virus",
+            "otus": [{"_id": "bar", "name": "Bar virus"}]
+        }
+
+        cached = tmpdir.join("references", "foo", "baz").listdir() if indexed else list()
+
+        if indexed:
+            assert resp.headers["ETag"].startswith('"baz-')
+            assert [path.basename for path in cached] == [
+                virtool.references.utils.EXPORT_FILENAME.format(resp.headers["ETag"][5:-1])
+            ]
+        else:
+            assert "ETag" not in resp.headers
+            assert not tmpdir.join("references").check()
+
+    async def test_cached(self, client):
+        await client.db.indexes.insert_one({
+            "_id": "baz",
+            "ready": True,
+            "reference": {
+                "id": "foo"
+            },
+            "version": 0
+        })
+
+        resp = await client.get("/download/refs/foo")
+        body = await resp.read()
+        etag = resp.headers["ETag"]
+
+        resp = await client.get("/download/refs/foo")
+
+        assert resp.status == 200
+        assert resp.headers["ETag"] == etag
+        assert await resp.read() == body
+
+        resp = await client.get("/download/refs/foo", headers={"If-None-Match": etag})
+
+        assert resp.status == 304
+        assert resp.headers["ETag"] == etag
+
+        client.iter_export.assert_called_once()
+
+    async def test_not_found(self, client):
+        resp = await client.get("/download/refs/bar")
+        assert resp.status == 404
@@ -3,6 +3,7 @@ import pytest
 from aiohttp.test_utils import make_mocked_coro
 
 import virtool.files.db
+import virtool.files.utils
 import virtool.utils
 
 
@@ -170,3 +171,70 @@ async def test_reserve(dbi):
         files[2],
         files[0]
     ]
+
+
+@pytest.mark.parametrize("deduplicated", [True, False])
+async def test_attach_blob(deduplicated, mocker, dbi):
+    await dbi.files.insert_one({
+        "_id": "foo-test.fq"
+    })
+
+    if deduplicated:
+        await dbi.blobs.insert_one({
+            "_id": "abc123",
+            "count": 1,
+            "size": 2048
+        })
+
+    m_run_in_thread = make_mocked_coro(deduplicated)
+
+    settings = {
+        "data_path": "/virtool"
+    }
+
+    result = await virtool.files.db.attach_blob(dbi, settings, m_run_in_thread, "foo-test.fq", "abc123", 2048)
+
+    assert result is deduplicated
+
+    m_run_in_thread.assert_called_with(virtool.files.utils.link_blob, settings, "foo-test.fq", "abc123")
+
+    assert await dbi.blobs.find_one() == {
+        "_id": "abc123",
+        "count": 2 if deduplicated else 1,
+        "size": 2048
+    }
+
+    assert await dbi.files.find_one() == {
+        "_id": "foo-test.fq",
+        "hash": "abc123"
+    }
+
+
+@pytest.mark.parametrize("count", [1, 2])
+async def test_release_blob(count, dbi):
+    await dbi.blobs.insert_one({
+        "_id": "abc123",
+        "count": count,
+        "size": 2048
+    })
+
+    m_run_in_thread = make_mocked_coro()
+
+    settings = {
+        "data_path": "/virtool"
+    }
+
+    await virtool.files.db.release_blob(dbi, settings, m_run_in_thread, "abc123")
+
+    if count == 1:
+        assert await dbi.blobs.count_documents({}) == 0
+        m_run_in_thread.assert_called_with(virtool.utils.rm, "/virtool/blobs/abc123")
+        return
+
+    assert await dbi.blobs.find_one() == {
+        "_id": "abc123",
+        "count": 1,
+        "size": 2048
+    }
+
+    m_run_in_thread.assert_not_called()
@@ -18,7 +18,7 @@ def test_manager_instance(loop, dbi, tmpdir):
 
     scheduler = loop.run_until_complete(aiojobs.create_scheduler())
 
-    manager = virtool.files.manager.Manager(executor, dbi, files_path, watch_path)
+    manager = virtool.files.manager.Manager(executor, dbi, {"data_path": str(tmpdir)}, files_path, watch_path)
 
     loop.run_until_complete(scheduler.spawn(manager.run()))
 
@@ -91,12 +91,24 @@ async def test_detect_create_close_and_delete(called, patched_test_manager_insta
 
 
 @pytest.mark.parametrize("has_ext", [True, False])
-async def test_handle_watch(has_ext, mocker, dbi, test_manager_instance):
+@pytest.mark.parametrize("content_hash", [None, "abc123"], ids=["renamed", "copied"])
+async def test_handle_watch(has_ext, content_hash, mocker, dbi, test_manager_instance):
+    """
+    Test that read files are moved into the files path and marked as ready, that copied files are added to the blob
+    store, and that other files are removed.
+
+    """
+    await dbi.files.insert_one({
+        "_id": "foobar-test.fq",
+        "ready": False
+    })
 
-    m_copy = mocker.patch("shutil.copy")
+    m_move_file = mocker.patch("virtool.files.utils.move_file", return_value={"size": 12, "hash": content_hash})
 
     m_create = mocker.patch("virtool.files.db.create", make_mocked_coro({"id": "foobar-test.fq"}))
 
+    m_attach_blob = mocker.patch("virtool.files.db.attach_blob", make_mocked_coro(False))
+
     m_has_read_extension = mocker.patch("virtool.files.utils.has_read_extension", return_value=has_ext)
 
     m_remove = mocker.patch("os.remove")
@@ -109,19 +121,35 @@ async def test_handle_watch(has_ext, mocker, dbi, test_manager_instance):
 
     m_has_read_extension.assert_called_with(filename)
 
-    if has_ext:
-        m_create.assert_called_with(
-            dbi,
-            filename,
-            "reads"
-        )
+    if not has_ext:
+        m_create.assert_not_called()
+        m_move_file.assert_not_called()
+        m_remove.assert_called_with(path)
+        return
 
-        m_copy.assert_called_with(
-            path,
-            os.path.join(test_manager_instance.files_path, "foobar-test.fq")
-        )
+    m_create.assert_called_with(
+        dbi,
+        filename,
+        "reads"
+    )
+
+    m_move_file.assert_called_with(
+        path,
+        os.path.join(test_manager_instance.files_path, "foobar-test.fq")
+    )
+
+    m_remove.assert_not_called()
+
+    if content_hash:
+        assert m_attach_blob.call_args[0][:2] == (dbi, test_manager_instance.settings)
+    else:
+        m_attach_blob.assert_not_called()
 
-    m_remove.assert_called_with(path)
+    assert await dbi.files.find_one() == {
+        "_id": "foobar-test.fq",
+        "ready": True,
+        "size": 12
+    }
 
 
 @pytest.mark.parametrize("tracked", [True, False])
@@ -184,17 +212,83 @@ async def test_handle_close(tracked, mocker, dbi, test_manager_instance):
         m_remove.assert_called_with(path)
 
 
-async def test_handle_delete(dbi, test_manager_instance):
+@pytest.mark.parametrize("content_hash", [None, "abc123"])
+async def test_handle_delete(content_hash, mocker, dbi, test_manager_instance):
     """
-    Test the the correspond database document for a file is deleted when the file is deleted.
+    Test the the correspond database document for a file is deleted when the file is deleted and that its blob is
+    released.
 
     """
+    m_release_blob = mocker.patch("virtool.files.db.release_blob", make_mocked_coro())
+
     filename = "foobar-test.fq"
 
     await dbi.files.insert_one({
-        "_id": filename
+        "_id": filename,
+        "hash": content_hash
     })
 
     await test_manager_instance.handle_delete(filename)
 
     assert not await dbi.files.count_documents({})
+
+    if content_hash:
+        m_release_blob.assert_called_with(
+            dbi,
+            test_manager_instance.settings,
+            test_manager_instance.run_in_thread,
+            content_hash
+        )
+    else:
+        m_release_blob.assert_not_called()
+
+
+@pytest.mark.parametrize("full", [True, False])
+async def test_reconcile(full, mocker, dbi, tmpdir):
+    """
+    Test that untracked files are removed and that documents for missing created files are removed. When a full scan is
+    not due, the present files should come from the incrementally maintained state.
+
+    """
+    files_path = str(tmpdir.mkdir("files"))
+    watch_path = str(tmpdir.mkdir("watch"))
+
+    manager = virtool.files.manager.Manager(
+        concurrent.futures.ThreadPoolExecutor(),
+        dbi,
+        {"data_path": str(tmpdir)},
+        files_path,
+        watch_path,
+        clean_interval=None
+    )
+
+    for filename in ("tracked.fq", "untracked.fq"):
+        touch(os.path.join(files_path, filename))
+
+    await dbi.files.insert_many([
+        {"_id": "tracked.fq", "created": True},
+        {"_id": "missing.fq", "created": True, "hash": "abc123"},
+        {"_id": "uploading.fq", "created": False}
+    ])
+
+    if not full:
+        manager.last_scan = manager.loop.time()
+        manager.present = {"tracked.fq", "untracked.fq"}
+
+    m_release_blob = mocker.patch("virtool.files.db.release_blob", make_mocked_coro())
+
+    await manager.reconcile()
+
+    m_release_blob.assert_called_once_with(dbi, manager.settings, manager.run_in_thread, "abc123")
+
+    assert os.listdir(files_path) == ["tracked.fq"]
+    assert manager.present == {"tracked.fq"}
+
+    assert sorted(await dbi.files.distinct("_id")) == ["tracked.fq", "uploading.fq"]
+
+    assert manager.metrics == {
+        "scans": 1 if full else 0,
+        "scanned": 2 if full else 0,
+        "removed": 1,
+        "reconciled": 1
+    }
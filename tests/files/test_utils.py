@@ -1,3 +1,7 @@
+import errno
+import hashlib
+import os
+
 import aionotify
 import pytest
 
@@ -55,3 +59,79 @@ def test_join_file_path():
     result = virtool.files.utils.join_file_path(settings, "123-bar.fq.gz")
 
     assert result == "/foo/files/123-bar.fq.gz"
+
+
+def test_link_blob(tmpdir):
+    """
+    Test that the first file with some content becomes a blob and that later files with the same content are
+    replaced with links to that blob.
+
+    """
+    settings = {
+        "data_path": str(tmpdir)
+    }
+
+    files = tmpdir.mkdir("files")
+
+    files.join("foo-reads.fq").write("ACGT")
+    files.join("bar-reads.fq").write("ACGT")
+
+    assert virtool.files.utils.link_blob(settings, "foo-reads.fq", "abc123") is False
+    assert virtool.files.utils.link_blob(settings, "bar-reads.fq", "abc123") is True
+
+    blob = tmpdir.join("blobs", "abc123")
+
+    assert os.listdir(str(tmpdir.join("blobs"))) == ["abc123"]
+    assert os.stat(str(blob)).st_nlink == 3
+
+    for file_id in ("foo-reads.fq", "bar-reads.fq"):
+        assert os.path.samefile(str(files.join(file_id)), str(blob))
+
+
+def test_scan_files(tmpdir):
+    tmpdir.join("foo-reads.fq").write("ACGT")
+    tmpdir.join("bar-reads.fq").write("ACGT")
+    tmpdir.mkdir("baz")
+
+    assert virtool.files.utils.scan_files(str(tmpdir)) == {"foo-reads.fq", "bar-reads.fq"}
+
+
+def test_remove_files(tmpdir):
+    tmpdir.join("foo-reads.fq").write("ACGT")
+    tmpdir.join("bar-reads.fq").write("ACGT")
+
+    removed = virtool.files.utils.remove_files(str(tmpdir), ["foo-reads.fq", "missing.fq"])
+
+    assert removed == 1
+    assert os.listdir(str(tmpdir)) == ["bar-reads.fq"]
+
+
+@pytest.mark.parametrize("same_device", [True, False])
+def test_move_file(same_device, mocker, tmpdir):
+    """
+    Test that files on the same device are renamed and that files on other devices are copied and hashed.
+
+    """
+    content = os.urandom(1000)
+
+    source = tmpdir.mkdir("watch").join("reads.fq")
+    source.write_binary(content)
+
+    target = tmpdir.mkdir("files").join("foo-reads.fq")
+
+    mocker.patch("virtool.files.utils.COPY_BUFFER_SIZE", 64)
+
+    m_rename = mocker.patch("os.rename", wraps=os.rename)
+
+    if not same_device:
+        m_rename.side_effect = OSError(errno.EXDEV, "Invalid cross-device link")
+
+    result = virtool.files.utils.move_file(str(source), str(target))
+
+    assert not source.exists()
+    assert target.read_binary() == content
+
+    assert result == {
+        "size": 1000,
+        "hash": None if same_device else hashlib.sha256(content).hexdigest()
+    }
@@ -101,6 +101,9 @@ class VTClient:
     async def put(self, url, data):
         return await self._client.put(url, data=json.dumps(data))
 
+    async def put_bytes(self, url, data):
+        return await self._client.put(url, data=data, headers={"Content-Type": "application/octet-stream"})
+
     async def delete(self, url):
         return await self._client.delete(url)
 
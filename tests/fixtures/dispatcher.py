@@ -1,3 +1,5 @@
+import json
+
 import pytest
 from aiohttp import web
 
@@ -22,10 +24,15 @@ def create_test_connection(mocker):
             self.messages = list()
             self.send_stub = mocker.stub()
             self.close_stub = mocker.stub()
+            self.queue_size = 256
 
         async def send(self, message):
             self.send_stub(message)
 
+        def put(self, text):
+            self.send_stub(json.loads(text))
+            return True
+
         async def close(self):
             self.close_stub()
 
@@ -58,6 +65,16 @@ def test_ws_connection(mocker):
 
     ws.close = close
 
+    # Setup async stub for checking if send_str method was called.
+    send_str_stub = mocker.stub(name="send_str")
+
+    async def send_str(data):
+        return send_str_stub(data)
+
+    send_str.stub = send_str_stub
+
+    ws.send_str = send_str
+
     client.user_id = "test"
     client.groups = ["admin", "test"]
     client.permissions = ["create_sample"]
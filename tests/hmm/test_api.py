@@ -25,6 +25,7 @@ async def test_find(mocker, spawn_client, hmm_document):
     assert await resp.json() == {
         "total_count": 1,
         "found_count": 1,
+        "next_cursor": None,
         "page": 1,
         "page_count": 1,
         "per_page": 25,
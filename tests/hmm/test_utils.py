@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import subprocess
+
+import pytest
+
+import virtool.hmm.utils
+
+
+@pytest.fixture
+def hmm_path(tmpdir):
+    for filename in ["profiles.hmm"] + [f"profiles.hmm.{suffix}" for suffix in virtool.hmm.utils.PRESSED_SUFFIXES]:
+        tmpdir.join(filename).write("foobar")
+
+    tmpdir.join("profiles.json").write(json.dumps({
+        "files": {f: {"size": 6, "checksum": hashlib.sha256(b"foobar").hexdigest()} for f in os.listdir(str(tmpdir))}
+    }))
+
+    return str(tmpdir)
+
+
+@pytest.mark.parametrize("error", [None, "missing_manifest", "missing_file", "wrong_size"])
+def test_get_pressed_profiles_path(error, hmm_path):
+    if error == "missing_manifest":
+        os.remove(os.path.join(hmm_path, "profiles.json"))
+
+    if error == "missing_file":
+        os.remove(os.path.join(hmm_path, "profiles.hmm.h3m"))
+
+    if error == "wrong_size":
+        with open(os.path.join(hmm_path, "profiles.hmm.h3f"), "a") as f:
+            f.write("baz")
+
+    result = virtool.hmm.utils.get_pressed_profiles_path(hmm_path)
+
+    if error:
+        assert result is None
+    else:
+        assert result == os.path.join(hmm_path, "profiles.hmm")
+
+
+@pytest.mark.parametrize("error", [None, "missing_manifest", "wrong_size", "wrong_content"])
+def test_check_pressed_profiles(error, hmm_path):
+    """
+    Test that pressed files are rejected if they don't match the manifest, even when a corrupt file has the expected
+    size.
+
+    """
+    if error == "missing_manifest":
+        os.remove(os.path.join(hmm_path, "profiles.json"))
+
+    if error == "wrong_size":
+        with open(os.path.join(hmm_path, "profiles.hmm.h3f"), "a") as f:
+            f.write("baz")
+
+    if error == "wrong_content":
+        with open(os.path.join(hmm_path, "profiles.hmm.h3p"), "w") as f:
+            f.write("foobaz")
+
+    assert virtool.hmm.utils.check_pressed_profiles(hmm_path) is (error is None)
+
+    if error == "wrong_content":
+        # Jobs only check sizes.
+        assert virtool.hmm.utils.get_pressed_profiles_path(hmm_path) is not None
+
+
+def test_press_profiles(mocker, hmm_path):
+    def run(command, **kwargs):
+        for suffix in virtool.hmm.utils.PRESSED_SUFFIXES:
+            with open(f"{command[1]}.{suffix}", "w") as f:
+                f.write(suffix)
+
+    mocker.patch("subprocess.run", side_effect=run)
+
+    manifest = virtool.hmm.utils.press_profiles(hmm_path)
+
+    assert manifest["files"]["profiles.hmm"] == {
+        "size": 6,
+        "checksum": hashlib.sha256(b"foobar").hexdigest()
+    }
+
+    assert manifest["files"]["profiles.hmm.h3m"] == {
+        "size": 3,
+        "checksum": hashlib.sha256(b"h3m").hexdigest()
+    }
+
+    assert virtool.hmm.utils.check_pressed_profiles(hmm_path) is True
+
+
+def test_remove_pressed_profiles(hmm_path):
+    os.remove(os.path.join(hmm_path, "profiles.hmm.h3i"))
+
+    virtool.hmm.utils.remove_pressed_profiles(hmm_path)
+
+    assert os.listdir(hmm_path) == ["profiles.hmm"]
+
+
+def test_press_profiles_error(mocker, hmm_path):
+    """
+    Test that a failed ``hmmpress`` leaves no manifest, so NuVs jobs press the profiles themselves.
+
+    """
+    mocker.patch("subprocess.run", side_effect=subprocess.CalledProcessError(1, "hmmpress"))
+
+    with pytest.raises(subprocess.CalledProcessError):
+        virtool.hmm.utils.press_profiles(hmm_path)
+
+    assert virtool.hmm.utils.get_pressed_profiles_path(hmm_path) is None
+    assert not os.path.exists(os.path.join(hmm_path, "profiles.json"))
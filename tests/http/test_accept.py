@@ -0,0 +1,61 @@
+import concurrent.futures
+import json
+
+import pytest
+from aiohttp import web
+
+import virtool.http.accept
+from virtool.api.response import json_response
+
+
+@pytest.fixture
+def create_accept_client(loop, aiohttp_client):
+    async def func(data):
+        async def handler(req):
+            resp = json_response(data, status=201)
+            resp.set_cookie("session_id", "foobar")
+            return resp
+
+        executor = concurrent.futures.ThreadPoolExecutor()
+
+        async def run_in_thread(func, *args):
+            return await loop.run_in_executor(executor, func, *args)
+
+        app = web.Application(middlewares=[virtool.http.accept.middleware])
+        app["run_in_thread"] = run_in_thread
+        app.router.add_get("/", handler)
+
+        return await aiohttp_client(app)
+
+    return func
+
+
+@pytest.mark.parametrize("accept", [True, False])
+@pytest.mark.parametrize("large", [True, False])
+async def test_middleware(accept, large, mocker, create_accept_client):
+    """
+    Test that JSON is compact when the client accepts it and pretty otherwise, and that large responses are streamed
+    with the same status, headers, and cookies.
+
+    """
+    mocker.patch("virtool.api.json.STREAM_THRESHOLD", 5 if large else 1000)
+    mocker.patch("virtool.http.accept.CHUNK_SIZE", 16)
+
+    data = {
+        "documents": [{"id": str(i), "name": f"Sample {i}"} for i in range(20)]
+    }
+
+    client = await create_accept_client(data)
+
+    headers = {"Accept": "application/json"} if accept else {"Accept": "text/html"}
+
+    resp = await client.get("/", headers=headers)
+
+    assert resp.status == 201
+    assert resp.headers["Content-Type"] == "application/json; charset=utf=8"
+    assert resp.cookies["session_id"].value == "foobar"
+
+    body = await resp.text()
+
+    assert json.loads(body) == data
+    assert ("\n" in body) is not accept
@@ -49,6 +49,7 @@ snapshots['test_find[uvloop] 1'] = {
     ],
     'found_count': 2,
     'modified_otu_count': 3,
+    'next_cursor': None,
     'page': 1,
     'page_count': 1,
     'per_page': 25,
@@ -466,6 +466,7 @@ async def test(error, spawn_client, resp_is):
 
     assert await resp.json() == {
         "found_count": 4,
+        "next_cursor": None,
         "page": 1,
         "page_count": 1,
         "per_page": 25,
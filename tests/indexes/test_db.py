@@ -111,6 +111,23 @@ async def test_processor(mocker, dbi):
     }
 
 
+async def test_batch_processor(dbi):
+    await dbi.history.insert_many([
+        {"_id": "foo.0", "index": {"id": "baz"}, "otu": {"id": "foo"}},
+        {"_id": "foo.1", "index": {"id": "baz"}, "otu": {"id": "foo"}},
+        {"_id": "bar.0", "index": {"id": "baz"}, "otu": {"id": "bar"}},
+        {"_id": "far.0", "index": {"id": "boo"}, "otu": {"id": "foo"}}
+    ])
+
+    documents = [{"_id": "baz", "version": 1}, {"_id": "boo", "version": 0}, {"_id": "bad", "version": 2}]
+
+    assert await virtool.indexes.db.batch_processor(dbi.motor_client, documents) == [
+        {"id": "baz", "version": 1, "change_count": 3, "modified_otu_count": 2},
+        {"id": "boo", "version": 0, "change_count": 1, "modified_otu_count": 1},
+        {"id": "bad", "version": 2, "change_count": 0, "modified_otu_count": 0}
+    ]
+
+
 async def test_tag_unbuilt_changes(dbi, create_mock_history):
     await create_mock_history(False)
 
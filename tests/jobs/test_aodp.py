@@ -90,11 +90,48 @@ def mock_job(tmpdir, mocker, request, dbs, test_db_connection_string, test_db_na
     return job
 
 
-def test_fetch_index(mock_job):
+def test_check_db(mock_job):
+    """
+    Test that the index FASTA is used in place from the index directory rather than copied into the analysis directory.
+
+    """
     mock_job.check_db()
-    mock_job.prepare_index()
 
-    assert filecmp.cmp(
-        TEST_REF_PATH,
-        mock_job.params["local_index_path"],
+    assert mock_job.params["index_path"] == os.path.join(
+        mock_job.settings["data_path"],
+        "references",
+        "foo_ref",
+        "foo_index",
+        "ref.fa"
+    )
+
+    assert filecmp.cmp(TEST_REF_PATH, mock_job.params["index_path"])
+    assert os.listdir(mock_job.params["analysis_path"]) == []
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 10000])
+def test_deduplicate_joined_fastq(block_size, mocker, tmpdir):
+    mocker.patch("virtool.jobs.aodp.FASTA_BLOCK_SIZE", block_size)
+
+    fastq_path = tmpdir.join("joined.fastq")
+
+    fastq_path.write(
+        "@a\nACGTACGT\n+\nIIIIIIII\n"
+        "@b\nGGGGCCCC\n+\nIIIIIIII\n"
+        "@c\nACGTACGT\n+\nIIIIIIII\n"
+        "@d\nTTTTAAAA\n+\nIIIIIIII\n"
+        "@e\nACGTACGT\n+\nIIIIIIII\n"
+        "@f\nTTTTAAAA\n+\nIIIIIIII\n"
     )
+
+    output_path = tmpdir.join("unique.fa")
+
+    counts = virtool.jobs.aodp.deduplicate_joined_fastq(str(fastq_path), str(output_path))
+
+    assert counts == {
+        "read_1": 3,
+        "read_2": 1,
+        "read_3": 2
+    }
+
+    assert output_path.read() == ">read_1\nACGTACGT\n>read_2\nGGGGCCCC\n>read_3\nTTTTAAAA\n"
@@ -7,6 +7,7 @@ import shutil
 import sys
 
 import virtool.bio
+import virtool.hmm.utils
 import virtool.jobs.nuvs
 
 TEST_FILES_PATH = os.path.join(sys.path[0], "tests", "test_files")
@@ -216,7 +217,8 @@ def test_process_fasta(mock_job):
     )
 
 
-def test_press_hmm(mock_job):
+@pytest.mark.parametrize("pressed", [True, False], ids=["pressed", "unpressed"])
+def test_press_hmm(pressed, mock_job):
     os.mkdir(mock_job.params["analysis_path"])
 
     hmm_path = os.path.join(mock_job.settings["data_path"], "hmm")
@@ -228,15 +230,78 @@ def test_press_hmm(mock_job):
         os.path.join(hmm_path, "profiles.hmm")
     )
 
+    if pressed:
+        virtool.hmm.utils.press_profiles(hmm_path)
+
     mock_job.prepare_hmm()
 
     listing = os.listdir(mock_job.params["analysis_path"])
 
+    if pressed:
+        # The profiles pressed at install time should be used directly without writing to the analysis directory.
+        assert mock_job.intermediate["profiles_path"] == os.path.join(hmm_path, "profiles.hmm")
+        assert listing == []
+        return
+
     # Check that all the pressed file were written to the analysis directory.
     assert all("profiles.hmm." + suffix in listing for suffix in ["h3p", "h3m", "h3f", "h3i"])
 
+    assert mock_job.intermediate["profiles_path"] == os.path.join(mock_job.params["analysis_path"], "profiles.hmm")
+
+
+def test_get_annotation_ids_by_cluster(dbs):
+    dbs.hmm.insert_many([
+        {
+            "_id": "foo",
+            "cluster": 2
+        },
+        {
+            "_id": "bar",
+            "cluster": 9
+        },
+        {
+            "_id": "baz",
+            "cluster": 2
+        }
+    ])
+
+    assert virtool.jobs.nuvs.get_annotation_ids_by_cluster(dbs) == {
+        2: "foo",
+        9: "bar"
+    }
+
+
+@pytest.mark.parametrize("proc,orf_count,expected", [
+    (1, 10, 1),
+    (2, 10, 1),
+    (8, 10, 4),
+    (9, 10, 4),
+    (8, 3, 3),
+    (8, 0, 1)
+])
+def test_get_hmmscan_shard_count(proc, orf_count, expected):
+    assert virtool.jobs.nuvs.get_hmmscan_shard_count(proc, orf_count) == expected
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 10])
+def test_split_orfs(count):
+    orfs = [(f"sequence_{i}.0", "M" * length) for i, length in enumerate([100, 50, 50, 100, 25, 75, 200])]
+
+    chunks = virtool.jobs.nuvs.split_orfs(orfs, count)
+
+    assert len(chunks) <= count
+
+    # Chunks must be contiguous so the merged hmmscan output matches an unsharded run.
+    assert [record for chunk in chunks for record in chunk] == orfs
+
+    if count == 2:
+        assert chunks == [orfs[:4], orfs[4:]]
+
+
+@pytest.mark.parametrize("proc", [2, 8], ids=["single", "sharded"])
+def test_vfam(proc, mock_job, dbs):
+    mock_job.proc = proc
 
-def test_vfam(mock_job, dbs):
     os.mkdir(mock_job.params["analysis_path"])
 
     dbs.hmm.insert_many([
@@ -0,0 +1,87 @@
+import gzip
+
+import pytest
+
+import virtool.jobs.qc
+
+FASTQ = "@r1\nACGT\n+\nIIII\n@r2\nGGCCN\n+\n#####\n"
+
+
+@pytest.fixture
+def expected():
+    sequences = [0] * 50
+    sequences[2] = 1
+    sequences[40] = 1
+
+    return {
+        "count": 2,
+        "encoding": "Sanger / Illumina 1.9",
+        "length": [4, 5],
+        "gc": 75.0,
+        "bases": [
+            [21, 2, 0, 2, 0, 2],
+            [21, 2, 0, 2, 0, 2],
+            [21, 2, 0, 2, 0, 2],
+            [21, 2, 0, 2, 0, 2],
+            [2, 0, 0, 0, 0, 0]
+        ],
+        "sequences": sequences,
+        "composition": [
+            [50, 50, 0, 0],
+            [50, 0, 0, 50],
+            [50, 0, 0, 50],
+            [0, 0, 50, 50],
+            [0, 0, 0, 0]
+        ]
+    }
+
+
+@pytest.mark.parametrize("compressed", [True, False], ids=["gzip", "uncompressed"])
+@pytest.mark.parametrize("block_lines", [4, 8, 4000])
+@pytest.mark.parametrize("chunk_size", [3, 1024])
+def test_calculate_file_qc(compressed, block_lines, chunk_size, expected, mocker, tmpdir):
+    """
+    Test that the result is the same regardless of how the file is split into chunks and blocks.
+
+    """
+    mocker.patch("virtool.jobs.qc.BLOCK_LINES", block_lines)
+    mocker.patch("virtool.jobs.qc.CHUNK_SIZE", chunk_size)
+
+    path = str(tmpdir.join("reads_1.fq.gz" if compressed else "reads_1.fq"))
+
+    with (gzip.open(path, "wt") if compressed else open(path, "w")) as f:
+        f.write(FASTQ)
+
+    assert virtool.jobs.qc.calculate_file_qc(path) == expected
+
+
+def test_calculate_qc_paired(expected, tmpdir):
+    paths = list()
+
+    for suffix in (1, 2):
+        path = tmpdir.join(f"reads_{suffix}.fq")
+        path.write(FASTQ)
+        paths.append(str(path))
+
+    result = virtool.jobs.qc.calculate_qc(paths, proc=2)
+
+    assert result == {
+        **expected,
+        "count": 4,
+        "sequences": [count * 2 for count in expected["sequences"]]
+    }
+
+
+@pytest.mark.parametrize("lowest,expected", [
+    (35, ("Sanger / Illumina 1.9", 33)),
+    (64, ("Illumina 1.3", 64)),
+    (66, ("Illumina 1.5", 64))
+])
+def test_get_encoding(lowest, expected):
+    assert virtool.jobs.qc.get_encoding(lowest) == expected
+
+
+@pytest.mark.parametrize("engine,expected", [("native", True), ("fastqc", False), (None, False)])
+def test_should_use_native(engine, expected):
+    settings = {"qc_engine": engine} if engine else dict()
+    assert virtool.jobs.qc.should_use_native(settings) is expected
@@ -1,7 +1,14 @@
+import gzip
+import hashlib
+import shutil
+
 import pytest
 
+import virtool.jobs.qc
 import virtool.jobs.utils
 
+FASTQ = b"@r1\nACGT\n+\nIIII\n@r2\nGGCCN\n+\n#####\n"
+
 
 @pytest.mark.parametrize("gzipped", [True, False])
 @pytest.mark.parametrize("proc", [2, 4])
@@ -26,6 +33,67 @@ def test_copy_or_compress(gzipped, proc, mocker):
     m_copyfile.assert_called_with(path, target)
 
 
+@pytest.mark.parametrize("paired,proc,expected", [
+    (False, 4, 4),
+    (True, 4, 2),
+    (True, 1, 1)
+])
+def test_ingest_files_to_sample(paired, proc, expected, mocker):
+    """
+    Test that each file is ingested to its own read path and that the pigz workers are split between paired files.
+
+    """
+    m_ingest_reads = mocker.patch("virtool.jobs.utils.ingest_reads", side_effect=lambda path, target, proc: path)
+
+    paths = ["/files/foo", "/files/bar"] if paired else ["/files/foo"]
+
+    assert virtool.jobs.utils.ingest_files_to_sample(paths, "/samples/baz", proc) == paths
+
+    assert sorted(call[0] for call in m_ingest_reads.call_args_list) == sorted(
+        (path, f"/samples/baz/reads_{index + 1}.fq.gz", expected) for index, path in enumerate(paths)
+    )
+
+
+@pytest.mark.parametrize("source", ["gzip", "multi_member", "uncompressed"])
+@pytest.mark.parametrize("use_pigz", [True, False])
+def test_ingest_reads(source, use_pigz, mocker, tmpdir):
+    """
+    Test that the written file decompresses to the original content and that the checksum and quality statistics
+    describe the uncompressed content for each kind of source file.
+
+    """
+    if use_pigz and shutil.which("pigz") is None:
+        pytest.skip("pigz is not installed")
+
+    mocker.patch("virtool.jobs.qc.CHUNK_SIZE", 16)
+    mocker.patch("virtool.utils.should_use_pigz", return_value=use_pigz)
+
+    path = tmpdir.join("reads.fq")
+
+    if source == "gzip":
+        path.write_binary(gzip.compress(FASTQ))
+    elif source == "multi_member":
+        path.write_binary(gzip.compress(FASTQ[:20]) + gzip.compress(FASTQ[20:]))
+    else:
+        path.write_binary(FASTQ)
+
+    plain = tmpdir.join("plain.fq")
+    plain.write_binary(FASTQ)
+
+    target = str(tmpdir.join("reads_1.fq.gz"))
+
+    result = virtool.jobs.utils.ingest_reads(str(path), target, 2)
+
+    with gzip.open(target, "rb") as f:
+        assert f.read() == FASTQ
+
+    assert result == {
+        "size": tmpdir.join("reads_1.fq.gz").size(),
+        "checksum": hashlib.sha256(FASTQ).hexdigest(),
+        "qc": virtool.jobs.qc.calculate_file_qc(str(plain))
+    }
+
+
 def test_get_sample_params(dbs):
 
     settings = {
@@ -159,6 +159,63 @@ async def test_create_manifest(dbi, test_otu):
     }
 
 
+async def test_batch_processor(dbi, static_time):
+    await dbi.indexes.insert_many([
+        {"_id": "a", "version": 0, "ready": True, "reference": {"id": "foo"}, "created_at": static_time.datetime,
+         "user": {"id": "bob"}, "has_files": True},
+        {"_id": "b", "version": 1, "ready": True, "reference": {"id": "foo"}, "created_at": static_time.datetime,
+         "user": {"id": "bob"}, "has_files": True},
+        {"_id": "c", "version": 2, "ready": False, "reference": {"id": "foo"}, "created_at": static_time.datetime,
+         "user": {"id": "bob"}, "has_files": True}
+    ])
+
+    await dbi.otus.insert_many([
+        {"_id": "otu_1", "reference": {"id": "foo"}},
+        {"_id": "otu_2", "reference": {"id": "foo"}},
+        {"_id": "otu_3", "reference": {"id": "bar"}}
+    ])
+
+    await dbi.history.insert_many([
+        {"_id": "otu_1.0", "reference": {"id": "foo"}, "index": {"id": "unbuilt"}},
+        {"_id": "otu_2.0", "reference": {"id": "foo"}, "index": {"id": "b"}},
+        {"_id": "otu_3.0", "reference": {"id": "bar"}, "index": {"id": "unbuilt"}}
+    ])
+
+    documents = [
+        {"_id": "foo", "name": "Foo", "updates": [{"name": "v1"}, {"name": "v2"}]},
+        {"_id": "bar", "name": "Bar"},
+        {"_id": "baz", "name": "Baz"}
+    ]
+
+    assert await virtool.references.db.batch_processor(dbi, documents) == [
+        {
+            "_id": "foo",
+            "id": "foo",
+            "name": "Foo",
+            "installed": {"name": "v2"},
+            "latest_build": {"id": "b", "version": 1, "created_at": static_time.datetime, "user": {"id": "bob"}},
+            "otu_count": 2,
+            "unbuilt_change_count": 1
+        },
+        {
+            "_id": "bar",
+            "id": "bar",
+            "name": "Bar",
+            "latest_build": None,
+            "otu_count": 1,
+            "unbuilt_change_count": 1
+        },
+        {
+            "_id": "baz",
+            "id": "baz",
+            "name": "Baz",
+            "latest_build": None,
+            "otu_count": 0,
+            "unbuilt_change_count": 0
+        }
+    ]
+
+
 class TestEdit:
 
     @pytest.mark.parametrize("control_exists", [True, False])
@@ -1,3 +1,6 @@
+import gzip
+import json
+
 import pytest
 
 import virtool.references.utils
@@ -175,6 +178,62 @@ def test_detect_duplicates(strict, test_merged_otu):
         ]
 
 
+@pytest.mark.parametrize("count", [0, 1, 3])
+@pytest.mark.parametrize("targets", [True, False])
+def test_export_encoder(count, targets, test_merged_otu):
+    header = {
+        "data_type": "genome",
+        "organism": "virus"
+    }
+
+    if targets:
+        header["targets"] = [{"name": "CPN60", "required": True}]
+
+    otus = [dict(test_merged_otu, _id=f"otu_{i}") for i in range(count)]
+
+    encoder = virtool.references.utils.ExportEncoder(header)
+
+    data = encoder.encode(otus[:1]) + encoder.encode(otus[1:]) + encoder.finish()
+
+    assert json.loads(gzip.decompress(data)) == dict(header, otus=otus)
+
+
+def test_get_export_digest():
+    header = {
+        "data_type": "genome",
+        "organism": "virus"
+    }
+
+    digest = virtool.references.utils.get_export_digest(header)
+
+    assert len(digest) == 16
+    assert digest == virtool.references.utils.get_export_digest(dict(reversed(list(header.items()))))
+    assert digest != virtool.references.utils.get_export_digest(dict(header, targets=list()))
+
+
+@pytest.mark.parametrize("targets", [True, False])
+def test_get_export_header(targets):
+    document = {
+        "_id": "foo",
+        "data_type": "barcode",
+        "name": "Foo",
+        "organism": "fungi"
+    }
+
+    if targets:
+        document["targets"] = [{"name": "ITS2"}]
+
+    expected = {
+        "data_type": "barcode",
+        "organism": "fungi"
+    }
+
+    if targets:
+        expected["targets"] = [{"name": "ITS2"}]
+
+    assert virtool.references.utils.get_export_header(document) == expected
+
+
 @pytest.mark.parametrize("require_meta", [True, False])
 def test_get_import_schema(require_meta):
     assert virtool.references.utils.get_import_schema(require_meta) == {
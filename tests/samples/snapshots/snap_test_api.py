@@ -217,6 +217,7 @@ snapshots['test_find[uvloop-fred-None-None-d_range5-meta5] 1'] = {
         }
     ],
     'found_count': 2,
+    'next_cursor': None,
     'page': 1,
     'page_count': 1,
     'per_page': 25,
@@ -283,6 +284,7 @@ snapshots['test_find[uvloop-None-None-None-d_range0-meta0] 1'] = {
         }
     ],
     'found_count': 3,
+    'next_cursor': None,
     'page': 1,
     'page_count': 1,
     'per_page': 25,
@@ -319,6 +321,7 @@ snapshots['test_find[uvloop-None-2-1-d_range1-meta1] 1'] = {
         }
     ],
     'found_count': 3,
+    'next_cursor': 'W3siJGRhdGUiOiAxNDQ0MTY1MjAwMDAwfSwgImJlYjFlYjEwIl0',
     'page': 1,
     'page_count': 2,
     'per_page': 2,
@@ -342,6 +345,7 @@ snapshots['test_find[uvloop-None-2-2-d_range2-meta2] 1'] = {
         }
     ],
     'found_count': 3,
+    'next_cursor': None,
     'page': 2,
     'page_count': 2,
     'per_page': 2,
@@ -378,6 +382,7 @@ snapshots['test_find[uvloop-gv-None-None-d_range3-meta3] 1'] = {
         }
     ],
     'found_count': 2,
+    'next_cursor': None,
     'page': 1,
     'page_count': 1,
     'per_page': 25,
@@ -401,6 +406,7 @@ snapshots['test_find[uvloop-sp-None-None-d_range4-meta4] 1'] = {
         }
     ],
     'found_count': 1,
+    'next_cursor': None,
     'page': 1,
     'page_count': 1,
     'per_page': 25,
@@ -496,6 +502,7 @@ snapshots['test_find_analyses[uvloop-None-None] 1'] = {
         }
     ],
     'found_count': 3,
+    'next_cursor': None,
     'page': 1,
     'page_count': 1,
     'per_page': 25,
@@ -529,6 +536,7 @@ snapshots['test_find_analyses[uvloop-bob-None] 1'] = {
         }
     ],
     'found_count': 1,
+    'next_cursor': None,
     'page': 1,
     'page_count': 1,
     'per_page': 25,
@@ -585,6 +593,7 @@ snapshots['test_find_analyses[uvloop-Baz-None] 1'] = {
         }
     ],
     'found_count': 2,
+    'next_cursor': None,
     'page': 1,
     'page_count': 1,
     'per_page': 25,
@@ -20,6 +20,10 @@ snapshots['test_schema 1'] = {
         'default': '',
         'type': 'string'
     },
+    'dispatch_broker': {
+        'default': 'local',
+        'type': 'string'
+    },
     'force_setup': {
         'coerce': GenericRepr('<function to_bool at 0x100000000>'),
         'default': False,
@@ -62,6 +66,10 @@ snapshots['test_schema 1'] = {
         'default': '',
         'type': 'string'
     },
+    'qc_engine': {
+        'default': 'fastqc',
+        'type': 'string'
+    },
     'sm_mem': {
         'coerce': GenericRepr("<class 'int'>"),
         'default': 4,
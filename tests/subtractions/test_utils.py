@@ -1,3 +1,9 @@
+import gzip
+import hashlib
+import os
+
+import pytest
+
 import virtool.subtractions.utils
 
 
@@ -9,3 +15,93 @@ def test_join_subtraction_path():
     path = virtool.subtractions.utils.join_subtraction_path(settings, "bar")
 
     assert path == "/foo/subtractions/bar"
+
+
+@pytest.mark.parametrize("compressed", [True, False], ids=["gzip", "uncompressed"])
+@pytest.mark.parametrize("chunk_size", [1, 7, 1024])
+def test_calculate_fasta_stats(compressed, chunk_size, mocker, tmpdir):
+    """
+    Test that the statistics are the same regardless of compression and how the file is split into chunks.
+
+    """
+    mocker.patch("virtool.subtractions.utils.CHUNK_SIZE", chunk_size)
+
+    content = b">seq_1 foo\nATGCatgc\nNN\r\n>seq_2\nGGGG\n>seq_3\n\n>seq_4 bar\nAAAARY"
+
+    path = tmpdir.join("subtraction.fa.gz" if compressed else "subtraction.fa")
+    path.write_binary(gzip.compress(content) if compressed else content)
+
+    assert virtool.subtractions.utils.calculate_fasta_stats(str(path)) == {
+        "gc": {
+            "a": 0.333,
+            "t": 0.111,
+            "g": 0.333,
+            "c": 0.111,
+            "n": 0.111
+        },
+        "count": 4,
+        "lengths": {
+            "min": 0,
+            "max": 10,
+            "mean": 5.0,
+            "n50": 10
+        }
+    }
+
+
+def test_get_length_distribution_empty():
+    assert virtool.subtractions.utils.get_length_distribution([]) == {
+        "min": 0,
+        "max": 0,
+        "mean": 0,
+        "n50": 0
+    }
+
+
+@pytest.mark.parametrize("compressed", [True, False], ids=["gzip", "uncompressed"])
+def test_unpack_fasta(compressed, tmpdir):
+    content = b">foo\nATGC\n>bar\nGGCC\n"
+
+    path = tmpdir.join("upload.fa")
+    path.write_binary(gzip.compress(content) if compressed else content)
+
+    target = tmpdir.join("subtraction.fa")
+
+    content_hash = virtool.subtractions.utils.unpack_fasta(str(path), str(target))
+
+    assert target.read_binary() == content
+    assert content_hash == hashlib.sha256(content).hexdigest()
+
+
+def test_link_subtraction_index(tmpdir):
+    existing = tmpdir.mkdir("existing")
+    nascent = tmpdir.mkdir("nascent")
+
+    for suffix in ("1.bt2", "2.bt2", "rev.1.bt2"):
+        existing.join(f"reference.{suffix}").write(suffix)
+
+    existing.join("subtraction.fa.gz").write("fasta")
+
+    linked = virtool.subtractions.utils.link_subtraction_index(
+        str(existing.join("reference")),
+        str(nascent.join("reference"))
+    )
+
+    assert linked == ["reference.1.bt2", "reference.2.bt2", "reference.rev.1.bt2"]
+    assert sorted(os.listdir(str(nascent))) == linked
+
+    # The linked files should remain when the existing subtraction is removed.
+    existing.remove()
+
+    assert nascent.join("reference.rev.1.bt2").read() == "rev.1.bt2"
+
+
+def test_link_subtraction_index_missing(tmpdir):
+    tmpdir.mkdir("existing")
+    tmpdir.mkdir("nascent")
+
+    with pytest.raises(FileNotFoundError):
+        virtool.subtractions.utils.link_subtraction_index(
+            str(tmpdir.join("existing", "reference")),
+            str(tmpdir.join("nascent", "reference"))
+        )
@@ -162,7 +162,9 @@ def test_reverse_complement():
     ("ATAGGGATTAGAGACACAGATAAGGAGAGATATAGAACATGTGACGTACGTACGATCTGAGCTA", "IGIRDTDKERYRTCDVRTI*A"),
     ("ATACCNATTAGAGACACAGATAAGGAGAGATATAGAACATGTGACGTACGTACGATCTGAGCTA", "IPIRDTDKERYRTCDVRTI*A"),
     ("ATNGGGATTAGAGACACAGATAAGGAGAGATATAGAACATGTGACGTACGTACGATCTGAGCTA", "XGIRDTDKERYRTCDVRTI*A"),
-], ids=["no_ambiguous", "ambiguous", "ambigous_x"])
+    ("atagggattagagacacagataaggagagatatagaacatgtgacgtacgtacgatctgagcta", "IGIRDTDKERYRTCDVRTI*A"),
+    ("ATRGGGATTAGAGACACAGATAAGGAGAGATATAGAACATGTGACGTACGTACGATCTGAGCTAG", "XGIRDTDKERYRTCDVRTI*A"),
+], ids=["no_ambiguous", "ambiguous", "ambigous_x", "lowercase", "invalid_x"])
 def test_translate(sequence, expected):
     """
     Test that translation works properly. Cases are standard, resolvable ambiguity, and non-resolvable ambiguity (X).
@@ -0,0 +1,155 @@
+import asyncio
+
+import pytest
+
+import virtool.broker
+from virtool.dispatcher import Dispatcher
+
+
+async def test_local(mocker):
+    broker = virtool.broker.LocalBroker()
+
+    deliver = mocker.stub()
+    broker.bind(deliver)
+
+    sequence = broker.sequence
+
+    await broker.start()
+    await broker.publish({"interface": "otus", "operation": "update", "data": {"id": "foo"}})
+
+    assert broker.sequence == sequence + 1
+
+    deliver.assert_called_once_with({
+        "interface": "otus",
+        "operation": "update",
+        "data": {"id": "foo"},
+        "sequence": sequence + 1
+    })
+
+
+async def test_mongo(mocker, test_motor):
+    """
+    Test that a message published by one process is delivered once in both processes and that sequence numbers are
+    shared.
+
+    """
+    mocker.patch("virtool.broker.MONGO_RETRY_INTERVAL", 0.05)
+
+    brokers = [virtool.broker.MongoBroker(test_motor) for _ in range(2)]
+    stubs = [mocker.stub() for _ in brokers]
+
+    for broker, stub in zip(brokers, stubs):
+        broker.bind(stub)
+        await broker.start()
+
+    await brokers[0].publish({"interface": "otus", "operation": "update", "data": {"id": "foo"}})
+    await brokers[1].publish({"interface": "otus", "operation": "update", "data": {"id": "bar"}})
+
+    for _ in range(40):
+        if all(stub.call_count == 2 for stub in stubs):
+            break
+
+        await asyncio.sleep(0.05)
+
+    for stub in stubs:
+        assert sorted((call[0][0]["sequence"], call[0][0]["data"]["id"]) for call in stub.call_args_list) == [
+            (1, "foo"),
+            (2, "bar")
+        ]
+
+    for broker in brokers:
+        assert broker.sequence == 2
+        await broker.close()
+
+
+async def test_mongo_idle(mocker):
+    """
+    Test that an idle tailing cursor is kept open when it returns empty batches and is only recreated once it dies.
+
+    """
+    mocker.patch("virtool.broker.MONGO_RETRY_INTERVAL", 0)
+
+    documents = [None, None, {"origin": "other", "sequence": 3, "message": {"sequence": 3}}, None]
+
+    class Cursor:
+
+        alive = True
+
+        @property
+        async def fetch_next(self):
+            await asyncio.sleep(0)
+
+            document = documents.pop(0)
+
+            if not documents:
+                self.alive = False
+
+            self.document = document
+
+            return document is not None
+
+        def next_object(self):
+            return self.document
+
+    collection = mocker.Mock()
+    collection.find.side_effect = lambda *args, **kwargs: Cursor()
+
+    broker = virtool.broker.MongoBroker({virtool.broker.MONGO_COLLECTION: collection})
+    broker.sequence = 2
+
+    stub = mocker.stub()
+    broker.bind(stub)
+
+    task = asyncio.ensure_future(broker._tail())
+
+    while collection.find.call_count < 2:
+        await asyncio.sleep(0)
+
+    task.cancel()
+
+    stub.assert_called_once_with({"sequence": 3})
+
+    assert [call[0][0] for call in collection.find.call_args_list] == [
+        {"sequence": {"$gt": 2}},
+        {"sequence": {"$gt": 0}}
+    ]
+
+
+@pytest.mark.parametrize("setting,expected", [
+    (None, virtool.broker.LocalBroker),
+    ("local", virtool.broker.LocalBroker),
+    ("mongo", virtool.broker.MongoBroker)
+])
+def test_create_broker(setting, expected):
+    settings = {"dispatch_broker": setting} if setting else dict()
+
+    broker = virtool.broker.create_broker(settings, None)
+
+    assert type(broker) is expected
+
+
+async def test_dispatcher(create_test_connection):
+    """
+    Test that a dispatcher delivers messages published by its broker on behalf of other processes.
+
+    """
+    dispatcher = Dispatcher()
+
+    connection = create_test_connection()
+    connection.user_id = "test"
+
+    dispatcher.add_connection(connection)
+
+    dispatcher.deliver({
+        "interface": "otus",
+        "operation": "update",
+        "data": {"id": "foo"},
+        "sequence": 5
+    })
+
+    connection.send_stub.assert_called_once_with({
+        "interface": "otus",
+        "operation": "update",
+        "data": {"id": "foo"},
+        "sequence": 5
+    })
@@ -1,6 +1,10 @@
+import asyncio
+
 import pytest
 
 import virtool.api.json
+import virtool.dispatcher
+import virtool.http.ws
 from virtool.dispatcher import Dispatcher
 
 
@@ -38,6 +42,32 @@ class TestConnection:
         await test_ws_connection.close()
 
         assert test_ws_connection._ws.close.stub.called
+        assert test_ws_connection.closed
+
+    async def test_put(self, test_ws_connection):
+        assert test_ws_connection.put('{"foo": "bar"}') is True
+        assert test_ws_connection.depth == 1
+
+        await asyncio.sleep(0)
+
+        test_ws_connection._ws.send_str.stub.assert_called_with('{"foo": "bar"}')
+
+        assert test_ws_connection.depth == 0
+        assert test_ws_connection.sent == 1
+        assert test_ws_connection.latency == test_ws_connection.max_latency >= 0
+
+        await test_ws_connection.close()
+
+        assert test_ws_connection.put('{"foo": "baz"}') is False
+
+    async def test_put_full(self, test_ws_connection):
+        test_ws_connection.queue_size = 2
+
+        assert test_ws_connection.put("1") is True
+        assert test_ws_connection.put("2") is True
+        assert test_ws_connection.put("3") is False
+
+        await test_ws_connection.close()
 
 
 def test_add_connection(mocker):
@@ -50,6 +80,97 @@ def test_add_connection(mocker):
     assert m in dispatcher.connections
 
 
+async def test_dispatch_serialize_once(mocker, create_test_connection):
+    """
+    Test that a message is serialized once no matter how many connections it is dispatched to.
+
+    """
+    dispatcher = Dispatcher()
+
+    m_dumps = mocker.spy(virtool.api.json, "dumps")
+
+    connections = [create_test_connection() for _ in range(3)]
+
+    for connection in connections:
+        connection.user_id = "test"
+        dispatcher.add_connection(connection)
+
+    await dispatcher.dispatch("otus", "update", {"test": True})
+
+    m_dumps.assert_called_once()
+
+    for connection in connections:
+        connection.send_stub.assert_called_with({
+            "interface": "otus",
+            "operation": "update",
+            "data": {
+                "test": True
+            },
+            "sequence": dispatcher.sequence
+        })
+
+    assert dispatcher.metrics["dispatched"] == 1
+
+
+async def test_dispatch_drop(create_test_connection):
+    """
+    Test that a connection that can not queue a message is removed and closed without affecting other connections.
+
+    """
+    dispatcher = Dispatcher()
+
+    m_slow = create_test_connection()
+    m_slow.user_id = "bob"
+    m_slow.put = lambda text: False
+
+    m_fast = create_test_connection()
+    m_fast.user_id = "fred"
+
+    dispatcher.add_connection(m_slow)
+    dispatcher.add_connection(m_fast)
+
+    await dispatcher.dispatch("otus", "update", {"test": True})
+
+    await asyncio.sleep(0)
+
+    assert dispatcher.connections == [m_fast]
+    assert dispatcher.metrics["dropped"] == 1
+
+    m_slow.close_stub.assert_called_once()
+    m_fast.send_stub.assert_called_once()
+
+
+async def test_get_metrics(test_ws_connection):
+    dispatcher = Dispatcher()
+
+    dispatcher.add_connection(test_ws_connection)
+
+    assert dispatcher.get_metrics() == {
+        "connections": 1,
+        "dispatched": 0,
+        "dropped": 0,
+        "max_latency": 0.0,
+        "max_queued": 0,
+        "mean_latency": 0.0,
+        "queued": 0,
+        "replayed": 0,
+        "sent": 0
+    }
+
+    await dispatcher.dispatch("otus", "update", {"test": True})
+
+    assert dispatcher.get_metrics()["queued"] == 1
+
+    await asyncio.sleep(0)
+
+    metrics = dispatcher.get_metrics()
+
+    assert metrics["queued"] == 0
+    assert metrics["sent"] == 1
+
+    await dispatcher.close()
+
+
 def test_remove_connection(mocker):
 
     dispatcher = Dispatcher()
@@ -85,7 +206,8 @@ async def test_dispatch_authorized(create_test_connection):
         "operation": "update",
         "data": {
             "test": True
-        }
+        },
+        "sequence": dispatcher.sequence
     })
 
 
@@ -131,7 +253,8 @@ async def test_dispatch_either(create_test_connection):
         "operation": "update",
         "data": {
             "test": True
-        }
+        },
+        "sequence": dispatcher.sequence
     })
 
     m_unauthorized.send_stub.assert_not_called()
@@ -329,3 +452,183 @@ async def test_writer_not_callable():
         await Dispatcher().dispatch("otus", "update", {"test": True}, writer="writer")
 
     assert "writer must be callable" in str(excinfo.value)
+
+
+@pytest.mark.parametrize("data,expected", [
+    ({"id": "foo", "name": "Foo"}, ["foo"]),
+    ({"name": "Foo"}, []),
+    (["foo", "bar"], ["foo", "bar"]),
+    ([{"id": "foo"}, {"id": "bar"}], ["foo", "bar"])
+])
+def test_get_ids(data, expected):
+    assert virtool.dispatcher.get_ids(data) == expected
+
+
+class TestSubscriptions:
+
+    @pytest.fixture
+    def connections(self, create_test_connection):
+        dispatcher = Dispatcher()
+
+        connections = dict()
+
+        for name in ("all", "samples", "foo", "bar"):
+            connection = create_test_connection()
+            connection.user_id = "test"
+            dispatcher.add_connection(connection)
+            connections[name] = connection
+
+        dispatcher.subscribe(connections["samples"], "samples")
+        dispatcher.subscribe(connections["foo"], "samples", ["foo"])
+        dispatcher.subscribe(connections["bar"], "samples", ["bar"])
+        dispatcher.subscribe(connections["bar"], "jobs", ["baz"])
+
+        return dispatcher, connections
+
+    @pytest.mark.parametrize("interface,data,expected", [
+        ("samples", {"id": "foo"}, {"all", "samples", "foo"}),
+        ("samples", ["foo", "bar"], {"all", "samples", "foo", "bar"}),
+        ("samples", {"id": "baz"}, {"all", "samples"}),
+        ("jobs", {"id": "baz"}, {"all", "bar"}),
+        ("otus", {"id": "foo"}, {"all"})
+    ])
+    async def test_dispatch(self, interface, data, expected, connections):
+        dispatcher, connections = connections
+
+        await dispatcher.dispatch(interface, "update", data)
+
+        assert {name for name, connection in connections.items() if connection.send_stub.called} == expected
+
+    async def test_unsubscribe(self, connections):
+        dispatcher, connections = connections
+
+        dispatcher.unsubscribe(connections["bar"], "samples", ["bar"])
+        dispatcher.unsubscribe(connections["foo"], "samples")
+        dispatcher.unsubscribe(connections["all"], "otus")
+
+        await dispatcher.dispatch("samples", "update", ["foo", "bar"])
+
+        assert {name for name, connection in connections.items() if connection.send_stub.called} == {"samples"}
+
+    def test_remove_connection(self, connections):
+        dispatcher, connections = connections
+
+        for connection in connections.values():
+            dispatcher.remove_connection(connection)
+
+        assert dispatcher.connections == []
+        assert dispatcher.get_subscribers("samples", ["foo", "bar"]) == []
+        assert not dispatcher._subscriptions["samples"]
+        assert not dispatcher._subscription_keys
+
+    def test_unknown_interface(self, connections):
+        dispatcher, connections = connections
+
+        with pytest.raises(ValueError) as excinfo:
+            dispatcher.subscribe(connections["all"], "foobar")
+
+        assert "Unknown dispatch interface: foobar" in str(excinfo.value)
+
+
+@pytest.mark.parametrize("text,subscribed", [
+    ('{"interface": "samples", "operation": "subscribe", "data": ["foo"]}', True),
+    ('{"interface": "samples", "operation": "subscribe"}', True),
+    ('{"interface": "samples", "operation": "delete"}', False),
+    ('{"interface": "foobar", "operation": "subscribe"}', False),
+    ('{"interface": "samples", "operation": "subscribe", "data": "foo"}', False),
+    ('["samples"]', False),
+    ("foo", False)
+])
+def test_handle_message(text, subscribed, create_test_connection):
+    dispatcher = Dispatcher()
+
+    connection = create_test_connection()
+    connection.user_id = "test"
+
+    dispatcher.add_connection(connection)
+
+    virtool.http.ws.handle_message(dispatcher, connection, text)
+
+    assert (connection in dispatcher.get_subscribers("samples", {"id": "foo"})) is True
+    assert (connection in dispatcher.get_subscribers("otus", {"id": "foo"})) is not subscribed
+
+
+class TestReplay:
+
+    @pytest.fixture
+    async def dispatcher(self, loop, mocker):
+        mocker.patch("virtool.dispatcher.REPLAY_BUFFER_SIZE", 3)
+
+        dispatcher = Dispatcher()
+
+        for i in range(5):
+            await dispatcher.dispatch("otus", "update", {"id": f"otu_{i}"})
+
+        return dispatcher
+
+    @pytest.mark.parametrize("missed", [0, 1, 3])
+    async def test(self, missed, dispatcher, create_test_connection):
+        connection = create_test_connection()
+        connection.user_id = "test"
+        connection.queue_size = 10
+
+        dispatcher.add_connection(connection, dispatcher.sequence - missed)
+
+        assert [call[0][0]["data"]["id"] for call in connection.send_stub.call_args_list] == [
+            f"otu_{i}" for i in range(5 - missed, 5)
+        ]
+
+        assert dispatcher.metrics["replayed"] == missed
+
+        await dispatcher.dispatch("otus", "update", {"id": "otu_5"})
+
+        assert connection.send_stub.call_args[0][0] == {
+            "interface": "otus",
+            "operation": "update",
+            "data": {
+                "id": "otu_5"
+            },
+            "sequence": dispatcher.sequence
+        }
+
+    @pytest.mark.parametrize("error", ["expired", "future", "full"])
+    async def test_resync(self, error, dispatcher, create_test_connection):
+        connection = create_test_connection()
+        connection.user_id = "test"
+        connection.queue_size = 2 if error == "full" else 10
+
+        sequence = {
+            "expired": dispatcher.sequence - 4,
+            "future": dispatcher.sequence + 1,
+            "full": dispatcher.sequence - 3
+        }[error]
+
+        dispatcher.add_connection(connection, sequence)
+
+        connection.send_stub.assert_called_once_with({
+            "operation": "resync",
+            "sequence": dispatcher.sequence
+        })
+
+    async def test_unauthorized(self, dispatcher, create_test_connection):
+        connection = create_test_connection()
+        connection.user_id = None
+
+        dispatcher.add_connection(connection, dispatcher.sequence - 1)
+
+        connection.send_stub.assert_not_called()
+
+    async def test_targeted(self, dispatcher, create_test_connection):
+        """
+        Test that messages dispatched to specific connections are not numbered or buffered.
+
+        """
+        connection = create_test_connection()
+        connection.user_id = "test"
+
+        sequence = dispatcher.sequence
+
+        await dispatcher.dispatch("otus", "update", {"id": "otu_5"}, connections=[connection])
+
+        assert dispatcher.sequence == sequence
+        assert "sequence" not in connection.send_stub.call_args[0][0]
@@ -19,10 +19,14 @@ async def test_calculate_gc(tmpdir):
         for line in lines:
             handle.write(line)
 
-    assert virtool.subtractions.utils.calculate_fasta_gc(path) == ({
+    result = virtool.subtractions.utils.calculate_fasta_stats(path)
+
+    assert result["gc"] == {
         "a": 0.149,
         "t": 0.345,
         "g": 0.253,
         "c": 0.241,
         "n": 0.011
-    }, 3)
+    }
+
+    assert result["count"] == 3
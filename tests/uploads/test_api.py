@@ -1,3 +1,4 @@
+import hashlib
 import os
 import pytest
 import sys
@@ -66,3 +67,137 @@ class TestUpload:
         resp = await client.post_form("/uploads/foobar", data=files)
 
         assert resp.status == 404
+
+
+class TestSessions:
+
+    @pytest.fixture
+    async def client(self, tmpdir, spawn_client):
+        client = await spawn_client(authorize=True, permissions=["upload_file"])
+        client.app["settings"]["data_path"] = str(tmpdir)
+
+        for name in ("blobs", "files", "uploads"):
+            tmpdir.mkdir(name)
+
+        return client
+
+    async def test(self, client, tmpdir):
+        """
+        Test that a file uploaded as chunks sent out of order is assembled and added as a ready file.
+
+        """
+        content = os.urandom(25)
+
+        resp = await client.post("/upload/sessions", {
+            "name": "Test.fq",
+            "type": "reads",
+            "size": len(content),
+            "chunk_size": 10
+        })
+
+        assert resp.status == 201
+
+        session = await resp.json()
+
+        assert session["chunk_count"] == 3
+
+        url = f"/upload/sessions/{session['id']}"
+
+        for index in (2, 0, 1):
+            resp = await client.put_bytes(f"{url}/chunks/{index}", content[index * 10:(index + 1) * 10])
+            assert resp.status == 204
+
+        resp = await client.get(url)
+
+        assert (await resp.json())["received"] == [0, 1, 2]
+
+        resp = await client.post(f"{url}/finalize", {
+            "checksum": hashlib.sha256(content).hexdigest()
+        })
+
+        assert resp.status == 201
+
+        file_id = (await resp.json())["id"]
+
+        assert tmpdir.join("files", file_id).read_binary() == content
+        assert os.listdir(str(tmpdir.join("uploads"))) == []
+
+        assert await client.db.files.find_one(file_id, ["hash", "ready", "size"]) == {
+            "_id": file_id,
+            "hash": hashlib.sha256(content).hexdigest(),
+            "ready": True,
+            "size": 25
+        }
+
+        assert await client.db.uploads.count_documents({}) == 0
+
+    async def test_wrong_chunk_size(self, client):
+        resp = await client.post("/upload/sessions", {
+            "name": "Test.fq",
+            "type": "reads",
+            "size": 25,
+            "chunk_size": 10
+        })
+
+        session = await resp.json()
+
+        resp = await client.put_bytes(f"/upload/sessions/{session['id']}/chunks/2", b"ACGT")
+
+        assert resp.status == 400
+
+    async def test_chunk_completing(self, client):
+        """
+        Test that a chunk can't be written to a session that is being completed.
+
+        """
+        resp = await client.post("/upload/sessions", {
+            "name": "Test.fq",
+            "type": "reads",
+            "size": 20,
+            "chunk_size": 10
+        })
+
+        session = await resp.json()
+
+        await client.db.uploads.update_one({"_id": session["id"]}, {
+            "$set": {
+                "completing": True
+            }
+        })
+
+        resp = await client.put_bytes(f"/upload/sessions/{session['id']}/chunks/0", b"ACGTACGTAC")
+
+        assert resp.status == 409
+
+        assert await client.db.uploads.find_one(session["id"], ["received", "writing"]) == {
+            "_id": session["id"],
+            "received": [],
+            "writing": 0
+        }
+
+    @pytest.mark.parametrize("error", ["missing", "checksum"])
+    async def test_finalize_error(self, error, client):
+        content = b"ACGTACGTACGTACGTACGT"
+
+        resp = await client.post("/upload/sessions", {
+            "name": "Test.fq",
+            "type": "reads",
+            "size": len(content),
+            "chunk_size": 10
+        })
+
+        url = f"/upload/sessions/{(await resp.json())['id']}"
+
+        await client.put_bytes(f"{url}/chunks/0", content[:10])
+
+        if error == "checksum":
+            await client.put_bytes(f"{url}/chunks/1", b"TTTTTTTTTT")
+
+        resp = await client.post(f"{url}/finalize", {
+            "checksum": hashlib.sha256(content).hexdigest()
+        })
+
+        assert resp.status == (409 if error == "missing" else 400)
+
+        # The session is kept and released so the upload can be resumed.
+        assert await client.db.uploads.count_documents({"completing": {"$exists": False}}) == 1
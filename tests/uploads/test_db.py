@@ -1,9 +1,17 @@
+import datetime
+import os
+
+import pytest
+from aiohttp.test_utils import make_mocked_coro
+
 import virtool.uploads.db
 
 
-async def test_finish_upload(mocker, dbi):
+@pytest.mark.parametrize("content_hash", [None, "abc123"])
+async def test_finish_upload(content_hash, mocker, dbi):
     app = {
         "db": dbi,
+        "run_in_thread": make_mocked_coro(),
         "settings": {
             "data_path": "/foo"
         }
@@ -20,7 +28,9 @@ async def test_finish_upload(mocker, dbi):
 
     mocker.patch("virtool.utils.file_stats", return_value=stats)
 
-    await virtool.uploads.db.finish_upload(app, "bar")
+    m_attach_blob = mocker.patch("virtool.files.db.attach_blob", make_mocked_coro(False))
+
+    await virtool.uploads.db.finish_upload(app, "bar", content_hash)
 
     assert await dbi.files.find_one() == {
         "_id": "bar",
@@ -28,4 +38,127 @@ async def test_finish_upload(mocker, dbi):
         "ready": True
     }
 
+    if content_hash:
+        m_attach_blob.assert_called_with(dbi, app["settings"], app["run_in_thread"], "bar", "abc123", 2048)
+    else:
+        m_attach_blob.assert_not_called()
+
+
+@pytest.mark.parametrize("state", [None, "completing", "writing", "missing"])
+async def test_claim_session(state, dbi):
+    """
+    Test that a session is only claimed when all of its chunks have been received, none are being written, and it is
+    not already being completed.
+
+    """
+    session = {
+        "_id": "foo",
+        "chunk_count": 3,
+        "received": [0, 2] if state == "missing" else [0, 1, 2],
+        "writing": 1 if state == "writing" else 0
+    }
+
+    if state == "completing":
+        session["completing"] = True
+
+    await dbi.uploads.insert_one(session)
+
+    assert await virtool.uploads.db.claim_session(dbi, session) is (state is None)
+
+    if state is None:
+        assert (await dbi.uploads.find_one("foo"))["completing"] is True
+
+        # A chunk can't be written to a claimed session.
+        assert await virtool.uploads.db.begin_chunk(dbi, "foo", 1) is False
+
+        await virtool.uploads.db.release_session(dbi, "foo")
+
+        assert await virtool.uploads.db.begin_chunk(dbi, "foo", 1) is True
+        assert await dbi.uploads.find_one("foo", ["received", "writing"]) == {
+            "_id": "foo",
+            "received": [0, 2],
+            "writing": 1
+        }
+
+
+@pytest.mark.parametrize("error", [None, "rename"])
+async def test_complete_session(error, tmpdir, mocker, dbi, static_time):
+    """
+    Test that the session is only removed once the staging file has been moved, and that a failed move leaves the
+    session and staging file in place so completion can be retried.
+
+    """
+    for name in ("files", "uploads"):
+        tmpdir.mkdir(name)
+
+    tmpdir.join("uploads", "foo").write("ACGT")
+
+    async def run_in_thread(func, *args):
+        return func(*args)
+
+    app = {
+        "db": dbi,
+        "run_in_thread": run_in_thread,
+        "settings": {
+            "data_path": str(tmpdir)
+        }
+    }
+
+    session = {
+        "_id": "foo",
+        "name": "Test.fq",
+        "type": "reads",
+        "user": {
+            "id": "bob"
+        },
+        "completing": True
+    }
+
+    await dbi.uploads.insert_one(session)
+
+    if error == "rename":
+        mocker.patch("os.rename", side_effect=OSError)
+
+        with pytest.raises(OSError):
+            await virtool.uploads.db.complete_session(app, session)
+
+        assert await dbi.uploads.find_one("foo", ["completing"]) == {"_id": "foo"}
+        assert await dbi.files.count_documents({}) == 0
+        assert os.listdir(str(tmpdir.join("uploads"))) == ["foo"]
+        return
+
+    document = await virtool.uploads.db.complete_session(app, session)
+
+    assert await dbi.uploads.count_documents({}) == 0
+    assert tmpdir.join("files", document["id"]).read() == "ACGT"
+
+
+async def test_remove_expired_sessions(tmpdir, dbi, static_time):
+    uploads = tmpdir.mkdir("uploads")
+
+    for name in ("expired", "current", "orphan", "new"):
+        uploads.join(name).write("data")
+
+    old = static_time.datetime.timestamp()
+    os.utime(str(uploads.join("orphan")), (old, old))
+
+    await dbi.uploads.insert_many([
+        {"_id": "expired", "expires_at": static_time.datetime - datetime.timedelta(seconds=1)},
+        {"_id": "current", "expires_at": static_time.datetime + datetime.timedelta(hours=1)}
+    ])
+
+    async def run_in_thread(func, *args):
+        return func(*args)
+
+    app = {
+        "db": dbi,
+        "run_in_thread": run_in_thread,
+        "settings": {
+            "data_path": str(tmpdir)
+        }
+    }
+
+    await virtool.uploads.db.remove_expired_sessions(app)
 
+    assert await dbi.uploads.distinct("_id") == ["current"]
+    assert sorted(os.listdir(str(uploads))) == ["current", "new"]
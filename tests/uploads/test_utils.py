@@ -0,0 +1,97 @@
+import concurrent.futures
+import os
+import shutil
+import time
+
+import pytest
+
+import virtool.uploads.utils
+
+
+def test_join_upload_path():
+    settings = {
+        "data_path": "/mnt/data"
+    }
+
+    assert virtool.uploads.utils.join_upload_path(settings, "foo") == "/mnt/data/uploads/foo"
+
+
+@pytest.mark.parametrize("free,expected", [(3 * 1024 ** 3, True), (2 * 1024 ** 3, False)])
+def test_has_space(free, expected, mocker):
+    m_disk_usage = mocker.patch("shutil.disk_usage", return_value=shutil._ntuple_diskusage(0, 0, free))
+
+    assert virtool.uploads.utils.has_space({"data_path": "/mnt/data"}, 1024 ** 3 + 1) is expected
+
+    m_disk_usage.assert_called_with("/mnt/data")
+
+
+@pytest.mark.parametrize("size,expected", [(0, 1), (1, 1), (10, 1), (11, 2), (30, 3)])
+def test_get_chunk_count(size, expected):
+    assert virtool.uploads.utils.get_chunk_count(size, 10) == expected
+
+
+@pytest.mark.parametrize("index,expected", [(0, (0, 10)), (1, (10, 10)), (2, (20, 5))])
+def test_get_chunk_range(index, expected):
+    assert virtool.uploads.utils.get_chunk_range(25, 10, index) == expected
+
+
+@pytest.mark.parametrize("size", [0, 4096])
+def test_preallocate(size, tmpdir):
+    path = str(tmpdir.join("uploads", "foo"))
+
+    virtool.uploads.utils.preallocate(path, size)
+
+    assert os.path.getsize(path) == size
+
+
+def test_write_at(tmpdir):
+    """
+    Test that chunks written concurrently and out of order are assembled correctly.
+
+    """
+    path = str(tmpdir.join("foo"))
+
+    content = os.urandom(100)
+
+    virtool.uploads.utils.preallocate(path, len(content))
+
+    fd = os.open(path, os.O_WRONLY)
+
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [
+                executor.submit(virtool.uploads.utils.write_at, fd, content[offset:offset + 10], offset)
+                for offset in reversed(range(0, 100, 10))
+            ]
+
+            for future in futures:
+                future.result()
+    finally:
+        os.close(fd)
+
+    with open(path, "rb") as f:
+        assert f.read() == content
+
+
+def test_get_stale_staging_files(tmpdir):
+    """
+    Test that only old staging files without a session are returned.
+
+    """
+    uploads = tmpdir.mkdir("uploads")
+
+    old = time.time() - 7200
+
+    for name in ("foo", "bar", "baz"):
+        uploads.join(name).write("data")
+
+    for name in ("foo", "bar"):
+        os.utime(str(uploads.join(name)), (old, old))
+
+    settings = {
+        "data_path": str(tmpdir)
+    }
+
+    assert virtool.uploads.utils.get_stale_staging_files(settings, {"bar"}, 3600) == ["foo"]
+
+    assert virtool.uploads.utils.get_stale_staging_files({"data_path": str(tmpdir.join("missing"))}, set(), 3600) == []
@@ -77,6 +77,7 @@ async def test_find(spawn_client, create_user, static_time):
             }
         ],
         "found_count": 3,
+        "next_cursor": None,
         "page": 1,
         "page_count": 1,
         "per_page": 25,
@@ -68,3 +68,61 @@ def test_check_password(password, hashed, result):
 
 def test_generate_base_permissions():
     assert virtool.users.utils.generate_base_permissions() == {p: False for p in virtool.users.utils.PERMISSIONS}
+
+
+class TestAuthCache:
+
+    @pytest.mark.parametrize("cached_token,token,hit", [
+        ("foo", "foo", True),
+        ("foo", "bar", False),
+        ("foo", None, False),
+        (None, None, True),
+        (None, "foo", False)
+    ])
+    def test_get_session(self, cached_token, token, hit):
+        """
+        Test that a cached session is only returned for the token it was cached with.
+
+        """
+        cache = virtool.users.utils.AuthCache()
+
+        document = {"_id": "foobar", "user": {"id": "bob"}}
+
+        cache.set_session("foobar", document, cached_token)
+
+        assert cache.get_session("foobar", token) == (document if hit else None)
+        assert cache.get_session("baz", token) is None
+
+    def test_expiry(self, mocker):
+        cache = virtool.users.utils.AuthCache()
+
+        mocker.patch("virtool.users.utils.AUTH_CACHE_TTL", -1)
+
+        cache.set_session("foobar", {"_id": "foobar"}, None)
+        cache.set_key("bob", "key", {"_id": "hashed"})
+
+        assert cache.get_session("foobar", None) is None
+        assert cache.get_key("bob", "key") is None
+
+    def test_remove(self):
+        cache = virtool.users.utils.AuthCache()
+
+        cache.set_session("foo", {"_id": "foo", "user": {"id": "bob"}}, "token")
+        cache.set_session("bar", {"_id": "bar", "user": {"id": "fred"}}, "token")
+        cache.set_session("baz", {"_id": "baz"}, None)
+
+        cache.set_key("bob", "key", {"_id": "hashed_1"})
+        cache.set_key("fred", "key", {"_id": "hashed_2"})
+
+        cache.remove_user("bob")
+
+        assert cache.get_session("foo", "token") is None
+        assert cache.get_key("bob", "key") is None
+
+        assert cache.get_session("bar", "token") == {"_id": "bar", "user": {"id": "fred"}}
+        assert cache.get_session("baz", None) == {"_id": "baz"}
+        assert cache.get_key("fred", "key") == {"_id": "hashed_2"}
+
+        cache.remove_session("baz")
+
+        assert cache.get_session("baz", None) is None
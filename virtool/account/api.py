@@ -247,6 +247,8 @@ async def update_api_key(req):
         }
     }, projection=API_KEY_PROJECTION)
 
+    db.auth_cache.remove_user(user_id)
+
     return json_response(document)
 
 
@@ -264,6 +266,8 @@ async def remove_api_key(req):
     if delete_result.deleted_count == 0:
         return not_found()
 
+    db.auth_cache.remove_user(user_id)
+
     return no_content()
 
 
@@ -273,7 +277,13 @@ async def remove_all_api_keys(req):
     Remove all API keys for the session account.
 
     """
-    await req.app["db"].keys.delete_many({"user.id": req["client"].user_id})
+    db = req.app["db"]
+    user_id = req["client"].user_id
+
+    await db.keys.delete_many({"user.id": user_id})
+
+    db.auth_cache.remove_user(user_id)
+
     return no_content()
 
 
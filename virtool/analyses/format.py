@@ -7,10 +7,12 @@ import asyncio
 import csv
 import io
 import json
-import statistics
 from collections import defaultdict
+from typing import AsyncIterator, Iterator, Tuple
 
 import aiofiles
+import numpy
+import openpyxl.cell
 import openpyxl.styles
 
 import virtool.analyses.db
@@ -31,6 +33,9 @@ CSV_HEADERS = (
     "Coverage"
 )
 
+#: The number of CSV rows to buffer before sending them as one chunk.
+CSV_CHUNK_ROWS = 1000
+
 
 def calculate_median_depths(document: dict) -> dict:
     """
@@ -40,12 +45,31 @@ def calculate_median_depths(document: dict) -> dict:
     :return: a dict of median depths keyed by hit (sequence) ids
 
     """
-    depths = dict()
+    return {hit["id"]: calculate_median(hit["align"]) for hit in document["results"]}
 
-    for hit in document["results"]:
-        depths[hit["id"]] = statistics.median(hit["align"])
 
-    return depths
+def calculate_median(values: list):
+    """
+    Calculate the median of a list of depths with the same result as :func:`statistics.median`. Only partially sorts
+    the values, which is much faster for long sequences. Returns ``0`` for an empty list.
+
+    :param values: the values to calculate the median for
+    :return: the median
+
+    """
+    count = len(values)
+
+    if count == 0:
+        return 0
+
+    middle = count // 2
+
+    if count % 2:
+        return numpy.partition(values, middle)[middle].item()
+
+    partitioned = numpy.partition(values, (middle - 1, middle))
+
+    return (partitioned[middle - 1].item() + partitioned[middle].item()) / 2
 
 
 async def create_pathoscope_coverage_cache(db, document):
@@ -142,6 +166,23 @@ async def format_aodp(app, document):
 
 
 async def format_pathoscope(app, document):
+    document = await format_pathoscope_results(app, document)
+
+    await ensure_pathoscope_coverage_cache(app["db"], document)
+
+    return document
+
+
+async def format_pathoscope_results(app, document):
+    """
+    Format the results of a Pathoscope analysis document. Unlike :func:`.format_pathoscope`, the coverage data is left
+    in its raw form.
+
+    :param app: the application object
+    :param document: the Pathoscope analysis document
+    :return: the formatted document
+
+    """
     document = await load_results(
         app["settings"],
         document
@@ -207,8 +248,6 @@ async def format_pathoscope(app, document):
                 sequence["id"] = sequence.pop("_id")
                 del sequence["sequence"]
 
-    await ensure_pathoscope_coverage_cache(app["db"], document)
-
     return document
 
 
@@ -232,31 +271,39 @@ async def format_nuvs(app, document):
     return document
 
 
-async def format_analysis_to_excel(app, document):
-    depths = calculate_median_depths(document)
+async def prepare_analysis_export(app, document: dict) -> Tuple[dict, dict]:
+    """
+    Format an analysis document for export and calculate the median depths for its hits. The coverage cache used by
+    the API is not needed for exports and is skipped.
 
-    formatted = await format_analysis(app, document)
+    :param app: the application object
+    :param document: the analysis document to export
+    :return: the formatted document and the median depths keyed by hit (sequence) ids
 
-    output = io.BytesIO()
+    """
+    document = await load_results(app["settings"], document)
 
-    wb = openpyxl.Workbook()
-    ws = wb.active
+    depths = await app["run_in_thread"](calculate_median_depths, document)
 
-    ws.title = f"Pathoscope for {document['sample']['id']}"
+    if "pathoscope" in document.get("workflow", ""):
+        return await format_pathoscope_results(app, document), depths
 
-    header_font = openpyxl.styles.Font(name="Calibri", bold=True)
+    return await format_analysis(app, document), depths
 
-    for index, header in enumerate(CSV_HEADERS):
-        col = index + 1
-        cell = ws.cell(column=col, row=1, value=header)
-        cell.font = header_font
 
-    rows = list()
+def iter_analysis_rows(formatted: dict, depths: dict) -> Iterator[list]:
+    """
+    Yield a row of export data for each sequence in a formatted analysis document. The rows match :data:`CSV_HEADERS`.
+
+    :param formatted: the formatted analysis document
+    :param depths: the median depths keyed by hit (sequence) ids
+    :return: an iterator of rows
 
+    """
     for otu in formatted["results"]:
         for isolate in otu["isolates"]:
             for sequence in isolate["sequences"]:
-                row = [
+                yield [
                     otu["name"],
                     virtool.otus.utils.format_isolate_name(isolate),
                     sequence["accession"],
@@ -266,24 +313,67 @@ async def format_analysis_to_excel(app, document):
                     sequence["coverage"]
                 ]
 
-                assert len(row) == len(CSV_HEADERS)
 
-                rows.append(row)
+def write_analysis_to_excel(path: str, title: str, rows: Iterator[list]):
+    """
+    Write the export `rows` to an Excel workbook at `path`. The workbook is created in write-only mode, so rows are
+    streamed to disk instead of being held in memory.
 
-    for row_index, row in enumerate(rows):
-        row_number = row_index + 2
-        for col_index, value in enumerate(row):
-            ws.cell(column=col_index + 1, row=row_number, value=value)
+    :param path: the path to write the workbook to
+    :param title: the title of the worksheet
+    :param rows: the rows to write
 
-    wb.save(output)
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(title)
 
-    return output.getvalue()
+    header_font = openpyxl.styles.Font(name="Calibri", bold=True)
+
+    header_cells = list()
+
+    for header in CSV_HEADERS:
+        cell = openpyxl.cell.WriteOnlyCell(ws, value=header)
+        cell.font = header_font
+        header_cells.append(cell)
+
+    ws.append(header_cells)
 
+    for row in rows:
+        ws.append(row)
 
-async def format_analysis_to_csv(app, document):
-    depths = calculate_median_depths(document)
+    wb.save(path)
 
-    formatted = await format_analysis(app, document)
+
+async def format_analysis_to_excel(app, document: dict, path: str):
+    """
+    Write the analysis `document` to an Excel workbook at `path`. The workbook is written in a thread.
+
+    :param app: the application object
+    :param document: the analysis document to export
+    :param path: the path to write the workbook to
+
+    """
+    formatted, depths = await prepare_analysis_export(app, document)
+
+    await app["run_in_thread"](
+        write_analysis_to_excel,
+        path,
+        f"Pathoscope for {document['sample']['id']}",
+        iter_analysis_rows(formatted, depths)
+    )
+
+
+async def format_analysis_to_csv(app, document: dict) -> AsyncIterator[str]:
+    """
+    Format the analysis `document` as CSV. The CSV is yielded in chunks of :data:`CSV_CHUNK_ROWS` rows so it can be
+    streamed to the client.
+
+    :param app: the application object
+    :param document: the analysis document to export
+    :return: an async iterator of CSV chunks
+
+    """
+    formatted, depths = await prepare_analysis_export(app, document)
 
     output = io.StringIO()
 
@@ -291,22 +381,20 @@ async def format_analysis_to_csv(app, document):
 
     writer.writerow(CSV_HEADERS)
 
-    for otu in formatted["results"]:
-        for isolate in otu["isolates"]:
-            for sequence in isolate["sequences"]:
-                row = [
-                    otu["name"],
-                    virtool.otus.utils.format_isolate_name(isolate),
-                    sequence["accession"],
-                    sequence["length"],
-                    sequence["pi"],
-                    depths.get(sequence["id"], 0),
-                    sequence["coverage"]
-                ]
+    for index, row in enumerate(iter_analysis_rows(formatted, depths), 1):
+        writer.writerow(row)
+
+        if index % CSV_CHUNK_ROWS == 0:
+            yield output.getvalue()
+
+            output.seek(0)
+            output.truncate()
 
-                writer.writerow(row)
+            # Let other requests run between chunks of a large report.
+            await asyncio.sleep(0)
 
-    return output.getvalue()
+    if output.tell():
+        yield output.getvalue()
 
 
 async def format_analysis(app, document: dict) -> dict:
@@ -1,6 +1,9 @@
 import datetime
 import json
 
+#: The number of JSON values in a response body above which it is encoded off the event loop and streamed.
+STREAM_THRESHOLD = 50000
+
 
 class CustomEncoder(json.JSONEncoder):
 
@@ -11,6 +14,10 @@ class CustomEncoder(json.JSONEncoder):
         return json.JSONEncoder.default(self, obj)
 
 
+#: An encoder that doesn't add whitespace. Shared so an encoder isn't created for every response.
+COMPACT_ENCODER = CustomEncoder(separators=(",", ":"))
+
+
 def isoformat(obj):
     return obj.replace(tzinfo=datetime.timezone.utc).isoformat().replace("+00:00", "Z")
 
@@ -40,3 +47,59 @@ def pretty_dumps(obj: object) -> str:
         indent=4,
         sort_keys=True
     )
+
+
+def compact_dumps(obj: object) -> str:
+    """
+    Encode `obj` as JSON without any whitespace. Used for clients that accept JSON responses.
+
+    :param obj: a JSON-serializable object
+    :return: a JSON string
+
+    """
+    return COMPACT_ENCODER.encode(obj)
+
+
+def encode(obj: object, pretty: bool = False) -> bytes:
+    """
+    Encode `obj` as UTF-8 JSON. The output is compact unless `pretty` is set.
+
+    :param obj: a JSON-serializable object
+    :param pretty: apply pretty formatting
+    :return: the encoded JSON
+
+    """
+    if pretty:
+        return pretty_dumps(obj).encode()
+
+    return compact_dumps(obj).encode()
+
+
+def is_large(obj: object, threshold: int = None) -> bool:
+    """
+    Check if `obj` contains more than `threshold` JSON values. Stops counting as soon as the threshold is passed, so
+    checking very large objects stays cheap.
+
+    :param obj: a JSON-serializable object
+    :param threshold: the number of values to allow (defaults to :data:`STREAM_THRESHOLD`)
+    :return: a boolean indicating if the object is large
+
+    """
+    remaining = STREAM_THRESHOLD if threshold is None else threshold
+
+    stack = [obj]
+
+    while stack:
+        value = stack.pop()
+
+        remaining -= 1
+
+        if remaining < 0:
+            return True
+
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+
+    return False
@@ -110,6 +110,21 @@ def conflict(message: str = "Conflict") -> web.Response:
     }, status=409)
 
 
+def insufficient_storage(message: str = "Insufficient storage") -> web.Response:
+    """
+    A shortcut for creating a :class:`~aiohttp.web.Response` object with a ``507`` status the JSON body
+    ``{"message": "Insufficient storage"}``.
+
+    :param message: text to send instead of 'Insufficient storage'
+    :return: the response
+
+    """
+    return json_response({
+        "id": "insufficient_storage",
+        "message": message
+    }, status=507)
+
+
 def invalid_input(errors: dict) -> web.Response:
     """
     A shortcut for creating a :class:`~aiohttp.web.Response` object with a ``422`` status the JSON body
@@ -1,6 +1,10 @@
 import asyncio
+import base64
 import math
 import re
+from typing import List, Union
+
+import bson.json_util
 
 import virtool.users.utils
 import virtool.utils
@@ -32,6 +36,106 @@ def compose_regex_query(term, fields):
     }
 
 
+def encode_cursor(values: list) -> str:
+    """
+    Encode the sort key `values` of the last document in a page as an opaque token that can be passed back to
+    :func:`.paginate` to get the next page.
+
+    :param values: the sort key values
+    :return: a URL-safe token
+
+    """
+    return base64.urlsafe_b64encode(bson.json_util.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Union[list, None]:
+    """
+    Decode a token created by :func:`.encode_cursor`. Returns ``None`` if the token is invalid.
+
+    :param token: the token
+    :return: the sort key values
+
+    """
+    try:
+        values = bson.json_util.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (ValueError, TypeError):
+        return None
+
+    if isinstance(values, list):
+        return values
+
+    return None
+
+
+def get_keyset_sort(sort: Union[List[tuple], None]) -> List[tuple]:
+    """
+    Return `sort` with ``_id`` added as a tiebreaker so every document has a unique position. Documents are sorted by
+    ``_id`` if `sort` is ``None``.
+
+    :param sort: a list of field and direction pairs
+    :return: the keyset sort
+
+    """
+    if not sort:
+        return [("_id", 1)]
+
+    if any(field == "_id" for field, _ in sort):
+        return list(sort)
+
+    return [*sort, ("_id", sort[-1][1])]
+
+
+def get_sort_values(document: dict, sort: List[tuple]) -> list:
+    """
+    Get the values of the fields in `sort` from a raw `document`. Dotted field names are followed into subdocuments and
+    numeric parts index into arrays.
+
+    :param document: the document
+    :param sort: a list of field and direction pairs
+    :return: the sort key values
+
+    """
+    values = list()
+
+    for field, _ in sort:
+        value = document
+
+        for key in field.split("."):
+            if isinstance(value, dict):
+                value = value.get(key)
+            elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+                value = value[int(key)]
+            else:
+                value = None
+
+        values.append(value)
+
+    return values
+
+
+def compose_keyset_query(sort: List[tuple], values: list) -> dict:
+    """
+    Compose a query that matches the documents that come after a document with the sort key `values` when sorted by
+    `sort`.
+
+    :param sort: a list of field and direction pairs
+    :param values: the sort key values of the last document in the previous page
+    :return: a MongoDB query
+
+    """
+    conditions = list()
+
+    for index, (field, direction) in enumerate(sort):
+        condition = {sort[i][0]: values[i] for i in range(index)}
+        condition[field] = {"$gt" if direction == 1 else "$lt": values[index]}
+
+        conditions.append(condition)
+
+    return {
+        "$or": conditions
+    }
+
+
 async def paginate(
         collection,
         db_query,
@@ -41,6 +145,25 @@ async def paginate(
         base_query=None,
         reverse=False
 ):
+    """
+    Get a page of documents from `collection` and the counts needed to describe the pagination.
+
+    Pages are requested by number with the ``page`` URL parameter or by passing the ``next_cursor`` token from the
+    previous page as the ``cursor`` parameter. Cursors don't skip over earlier documents, so they stay fast for pages
+    deep into large collections. The ``page`` field is ``None`` for pages requested with a cursor.
+
+    Counts are cached briefly by the collection. They can be left out by passing ``count=false``.
+
+    :param collection: the collection to get documents from
+    :param db_query: a query for the documents the client is searching for
+    :param url_query: the URL query parameters
+    :param sort: a field name or list of field and direction pairs to sort by
+    :param projection: a projection to apply to the documents
+    :param base_query: a query for all documents the client can see
+    :param reverse: sort descending if `sort` is a field name
+    :return: the page of documents and pagination information
+
+    """
     try:
         page = int(url_query["page"])
     except (KeyError, ValueError):
@@ -51,34 +174,67 @@ async def paginate(
     except (KeyError, ValueError):
         per_page = 25
 
+    count = virtool.utils.to_bool(url_query.get("count", True))
+
     base_query = base_query or {}
 
     if isinstance(sort, str):
         sort = [(sort, -1 if reverse else 1)]
 
+    sort = get_keyset_sort(sort)
+
     db_query = {
         "$and": [base_query, db_query]
     }
 
+    cursor_values = None
+
+    if "cursor" in url_query:
+        cursor_values = decode_cursor(url_query["cursor"])
+
+        if cursor_values is not None and len(cursor_values) != len(sort):
+            cursor_values = None
+
+    if cursor_values is None:
+        find_query = db_query
+    else:
+        page = None
+        find_query = {
+            "$and": [base_query, db_query, compose_keyset_query(sort, cursor_values)]
+        }
+
+    found_count = None
+    total_count = None
+    page_count = None
+
+    if count:
+        found_count, total_count = await asyncio.gather(
+            collection.count_documents_cached(db_query),
+            collection.count_documents_cached(base_query)
+        )
+
+        page_count = int(math.ceil(found_count / per_page))
+
     cursor = collection.find(
-        db_query,
+        find_query,
         projection,
         sort=sort
     )
 
-    found_count = await collection.count_documents(db_query)
-
-    page_count = int(math.ceil(found_count / per_page))
+    if page and page > 1:
+        cursor.skip((page - 1) * per_page)
 
-    documents = list()
+    # Get one extra document to find out if there is a next page. Cached counts can be out of date, so they aren't used
+    # to decide whether there are documents to get.
+    documents = await asyncio.shield(cursor.to_list(per_page + 1))
 
-    if found_count:
-        if page > 1:
-            cursor.skip((page - 1) * per_page)
+    next_cursor = None
 
-        documents = [await collection.apply_processor(d) for d in await asyncio.shield(cursor.to_list(per_page))]
+    if len(documents) > per_page:
+        documents = documents[:per_page]
+        next_cursor = encode_cursor(get_sort_values(documents[-1], sort))
 
-    total_count = await collection.count_documents(base_query)
+    documents = await collection.apply_processors(documents)
 
     return {
         "documents": documents,
@@ -86,7 +242,8 @@ async def paginate(
         "found_count": found_count,
         "page_count": page_count,
         "per_page": per_page,
-        "page": page
+        "page": page,
+        "next_cursor": next_cursor
     }
 
 
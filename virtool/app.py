@@ -12,6 +12,7 @@ from aiohttp import client, web
 from motor import motor_asyncio
 
 import virtool.app_routes
+import virtool.broker
 import virtool.config
 import virtool.db.core
 import virtool.db.migrate
@@ -35,6 +36,7 @@ import virtool.settings.db
 import virtool.settings.schema
 import virtool.setup.setup
 import virtool.software.db
+import virtool.uploads.db
 import virtool.utils
 import virtool.version
 
@@ -211,6 +213,23 @@ async def init_db(app):
         )
 
 
+async def init_broker(app):
+    """
+    An application ``on_startup`` callback that starts the broker used by the dispatcher to publish messages to all API
+    processes. The broker is chosen by the ``dispatch_broker`` setting.
+
+    :param app: the app object
+    :type app: :class:`aiohttp.web.Application`
+
+    """
+    if app["setup"] is None:
+        broker = virtool.broker.create_broker(app["settings"], app["db"].motor_client)
+
+        app["dispatcher"].set_broker(broker)
+
+        await app["dispatcher"].start()
+
+
 async def init_check_db(app):
     if app["setup"] is not None:
         return
@@ -239,6 +258,7 @@ async def init_check_db(app):
     await db.history.create_index("created_at")
     await db.history.create_index([("otu.name", 1)])
     await db.history.create_index([("otu.version", -1)])
+    await db.hmm.create_index("cluster")
     await db.indexes.drop_indexes()
     await db.indexes.create_index([("version", 1), ("reference.id", 1)], unique=True)
     await db.keys.create_index("id", unique=True)
@@ -253,6 +273,8 @@ async def init_check_db(app):
     await db.samples.create_index([("created_at", pymongo.DESCENDING)])
     await db.sequences.create_index("otu_id")
     await db.sequences.create_index("name")
+    await db.subtraction.create_index("hash")
+    await db.uploads.create_index("expires_at", expireAfterSeconds=0)
 
 
 async def init_client_path(app):
@@ -333,6 +355,7 @@ async def init_file_manager(app):
     app["file_manager"] = virtool.files.manager.Manager(
         app["executor"],
         app["db"],
+        app["settings"],
         files_path,
         watch_path,
         clean_interval=20
@@ -341,6 +364,22 @@ async def init_file_manager(app):
     scheduler = aiojobs.aiohttp.get_scheduler_from_app(app)
 
     await scheduler.spawn(app["file_manager"].run())
+    await scheduler.spawn(virtool.uploads.db.sweep(app))
+
+
+async def init_hmm(app):
+    """
+    An application ``on_startup`` callback that verifies the pressed HMM profiles in the background.
+
+    :param app: the application object
+
+    """
+    if app["setup"] is not None:
+        return
+
+    scheduler = aiojobs.aiohttp.get_scheduler_from_app(app)
+
+    await scheduler.spawn(virtool.hmm.db.check_pressed_profiles(app))
 
 
 async def init_paths(app):
@@ -445,12 +484,14 @@ def create_app(config):
         init_executors,
         init_dispatcher,
         init_db,
+        init_broker,
         init_settings,
         init_sentry,
         init_check_db,
         init_resources,
         init_job_manager,
         init_file_manager,
+        init_hmm,
         init_refresh
     ])
 
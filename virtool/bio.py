@@ -8,6 +8,7 @@ import zipfile
 from typing import Generator, List
 
 import aiohttp
+import numpy
 
 import virtool.analyses.db
 import virtool.errors
@@ -122,6 +123,28 @@ TRANSLATION_TABLE = {
     "GGN": "G"
 }
 
+#: Translates nucleotides to their complements with :meth:`str.translate`.
+COMPLEMENT_TRANSLATION = str.maketrans(COMPLEMENT_TABLE)
+
+#: Deletes all valid nucleotides with :meth:`str.translate`, leaving only invalid characters.
+NUCLEOTIDE_DELETION = str.maketrans("", "", "".join(COMPLEMENT_TABLE))
+
+#: Maps ASCII byte values to nucleotide indexes. Characters other than ACGTN (in either case) map to ``5``.
+NUCLEOTIDE_INDEXES = numpy.full(256, 5, dtype=numpy.uint8)
+NUCLEOTIDE_INDEXES[numpy.frombuffer(b"ACGTNacgtn", dtype=numpy.uint8)] = [0, 1, 2, 3, 4, 0, 1, 2, 3, 4]
+
+#: Maps nucleotide indexes to the indexes of their complements.
+COMPLEMENT_INDEXES = numpy.array([3, 2, 1, 0, 4, 5], dtype=numpy.uint8)
+
+#: Maps codon indexes (``36 * first + 6 * second + third``) to amino acid byte values. Codons that are not in
+#: :data:`TRANSLATION_TABLE` map to ``X``.
+CODON_TABLE = numpy.full(216, ord("X"), dtype=numpy.uint8)
+CODON_TABLE[
+    NUCLEOTIDE_INDEXES[numpy.frombuffer("".join(TRANSLATION_TABLE).encode(), dtype=numpy.uint8)]
+    .reshape(-1, 3)
+    .astype(numpy.intp) @ [36, 6, 1]
+] = numpy.frombuffer("".join(TRANSLATION_TABLE.values()).encode(), dtype=numpy.uint8)
+
 
 def read_fasta(path: str) -> List[tuple]:
     """
@@ -248,31 +271,50 @@ def reverse_complement(sequence: str) -> str:
     :param sequence: the sequence to transform
     :return: the reverse complement
     """
-    complement = [COMPLEMENT_TABLE[s] for s in sequence.upper()]
-    complement.reverse()
+    sequence = sequence.upper()
 
-    return "".join(complement)
+    invalid = sequence.translate(NUCLEOTIDE_DELETION)
 
+    if invalid:
+        raise KeyError(invalid[0])
 
-def translate(sequence: str) -> str:
+    return sequence.translate(COMPLEMENT_TRANSLATION)[::-1]
+
+
+def get_nucleotide_indexes(sequence: str) -> numpy.ndarray:
     """
-    Translate the passed nucleotide sequence to protein. Substitutes _X_ for invalid codons.
+    Convert the passed nucleotide sequence to an array of nucleotide indexes using :data:`NUCLEOTIDE_INDEXES`.
 
     :param sequence: the nucleotide sequence
+    :return: the nucleotide indexes
+
+    """
+    encoded = sequence.encode("ascii", "replace")
+    return NUCLEOTIDE_INDEXES[numpy.frombuffer(encoded, dtype=numpy.uint8)]
+
+
+def translate_indexes(indexes: numpy.ndarray) -> str:
+    """
+    Translate an array of nucleotide indexes to protein using :data:`CODON_TABLE`. Trailing nucleotides that do not
+    form a complete codon are ignored.
+
+    :param indexes: the nucleotide indexes
     :return: a translated protein sequence
 
     """
-    sequence = sequence.upper()
+    codons = indexes[:len(indexes) // 3 * 3].reshape(-1, 3).astype(numpy.intp)
+    return CODON_TABLE[codons[:, 0] * 36 + codons[:, 1] * 6 + codons[:, 2]].tobytes().decode()
 
-    protein = list()
 
-    for i in range(0, len(sequence) // 3):
-        codon = sequence[i * 3:(i + 1) * 3]
+def translate(sequence: str) -> str:
+    """
+    Translate the passed nucleotide sequence to protein. Substitutes _X_ for invalid codons.
 
-        # Translate to X if the codon matches no amino acid (taking into account ambiguous codons where possible)
-        protein.append(TRANSLATION_TABLE.get(codon, "X"))
+    :param sequence: the nucleotide sequence
+    :return: a translated protein sequence
 
-    return "".join(protein)
+    """
+    return translate_indexes(get_nucleotide_indexes(sequence))
 
 
 def find_orfs(sequence: str) -> List[dict]:
@@ -289,11 +331,19 @@ def find_orfs(sequence: str) -> List[dict]:
 
     # Only look for ORFs if the contig is at least 300 nucleotides long.
     if sequence_length > 300:
+        indexes = get_nucleotide_indexes(sequence)
+
+        # The reverse strand is translated from the complemented, reversed forward indexes.
+        strands = [
+            (+1, sequence, indexes),
+            (-1, reverse_complement(sequence), COMPLEMENT_INDEXES[indexes][::-1])
+        ]
+
         # Looks at both forward (+) and reverse (-) strands.
-        for strand, nuc in [(+1, sequence), (-1, reverse_complement(sequence))]:
+        for strand, nuc, nuc_indexes in strands:
             # Look in all three translation frames.
             for frame in range(3):
-                translation = translate(nuc[frame:])
+                translation = translate_indexes(nuc_indexes[frame:])
                 translation_length = len(translation)
 
                 aa_start = 0
@@ -0,0 +1,210 @@
+"""
+Brokers publish broadcast dispatches to every API process. Each process then delivers them to its own WebSocket
+connections through its :class:`~virtool.dispatcher.Dispatcher`.
+
+Brokers also assign the sequence numbers used by reconnecting clients to resume the event stream, so the numbers are
+consistent no matter which process a client connects to.
+
+"""
+import asyncio
+import logging
+import secrets
+import time
+from collections import deque
+from typing import Callable
+
+import pymongo
+import pymongo.errors
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+logger = logging.getLogger(__name__)
+
+#: The name of the capped collection used to pass messages between processes.
+MONGO_COLLECTION = "dispatches"
+
+#: The size in bytes of the capped collection used to pass messages between processes.
+MONGO_COLLECTION_SIZE = 32 * 1024 * 1024
+
+#: The number of sequence numbers before the last seen one to request again when the tailing cursor is recreated.
+#: Covers messages that were inserted out of sequence order by different processes.
+MONGO_REORDER_WINDOW = 100
+
+#: The number of seconds to wait before recreating a tailing cursor that has died.
+MONGO_RETRY_INTERVAL = 1
+
+
+class LocalBroker:
+    """
+    Delivers messages only within the current process. Used when a single API process is running.
+
+    """
+
+    def __init__(self):
+        #: The sequence number of the last published message. Starts at the current time in milliseconds so numbers
+        #: from before a restart are always older than those after it.
+        self.sequence = int(time.time() * 1000)
+
+        #: Called with each message that should be delivered to connections.
+        self._deliver = None
+
+    def bind(self, deliver: Callable[[dict], None]):
+        """
+        Set the function that is called with each message that should be delivered to the connections in this
+        process.
+
+        :param deliver: the delivery function
+
+        """
+        self._deliver = deliver
+
+    async def start(self):
+        pass
+
+    async def publish(self, message: dict):
+        """
+        Number a `message` and deliver it.
+
+        :param message: the message to publish
+
+        """
+        self.sequence += 1
+        message["sequence"] = self.sequence
+
+        self._deliver(message)
+
+    async def close(self):
+        pass
+
+
+class MongoBroker(LocalBroker):
+    """
+    Publishes messages to all API processes that use the same database.
+
+    Messages are inserted into a capped collection that every process tails. Sequence numbers are drawn from a counter
+    document. Messages published by a process are delivered to its own connections right away rather than waiting to
+    be read back.
+
+    :param db: the Motor database
+
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        super().__init__()
+
+        self._db = db
+
+        #: Identifies messages published by this process.
+        self.id = secrets.token_hex(8)
+
+        #: Sequence numbers that have recently been read from the collection. Used to skip messages that are read more
+        #: than once when the tailing cursor is recreated.
+        self._seen = set()
+        self._seen_order = deque()
+
+        #: The task that tails the capped collection.
+        self._task = None
+
+    async def start(self):
+        """
+        Create the capped collection if it does not exist and start tailing it for messages from other processes.
+
+        """
+        try:
+            await self._db.create_collection(MONGO_COLLECTION, capped=True, size=MONGO_COLLECTION_SIZE)
+        except pymongo.errors.CollectionInvalid:
+            pass
+
+        # Each tailing cursor starts with a query on sequence.
+        await self._db[MONGO_COLLECTION].create_index("sequence")
+
+        counter = await self._db.counters.find_one({"_id": MONGO_COLLECTION})
+
+        self.sequence = counter["sequence"] if counter else 0
+
+        self._task = asyncio.ensure_future(self._tail())
+
+    async def publish(self, message: dict):
+        counter = await self._db.counters.find_one_and_update(
+            {"_id": MONGO_COLLECTION},
+            {"$inc": {"sequence": 1}},
+            upsert=True,
+            return_document=pymongo.ReturnDocument.AFTER
+        )
+
+        sequence = counter["sequence"]
+
+        message["sequence"] = sequence
+
+        await self._db[MONGO_COLLECTION].insert_one({
+            "origin": self.id,
+            "sequence": sequence,
+            "message": message
+        })
+
+        self._mark_seen(sequence)
+        self._deliver(message)
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+
+    def _mark_seen(self, sequence: int) -> bool:
+        """
+        Record that the message with `sequence` has been handled. Returns ``False`` if it already had been.
+
+        """
+        if sequence in self._seen:
+            return False
+
+        self._seen.add(sequence)
+        self._seen_order.append(sequence)
+
+        if len(self._seen_order) > 10 * MONGO_REORDER_WINDOW:
+            self._seen.discard(self._seen_order.popleft())
+
+        self.sequence = max(self.sequence, sequence)
+
+        return True
+
+    async def _tail(self):
+        collection = self._db[MONGO_COLLECTION]
+
+        start = self.sequence
+
+        while True:
+            cursor = collection.find(
+                {"sequence": {"$gt": start}},
+                cursor_type=pymongo.CursorType.TAILABLE_AWAIT
+            )
+
+            try:
+                # A getMore that returns no documents resolves `fetch_next` to False, but the cursor stays alive and
+                # keeps waiting for new messages. Ending the loop there would recreate the cursor every few seconds.
+                while cursor.alive:
+                    if await cursor.fetch_next:
+                        document = cursor.next_object()
+
+                        if self._mark_seen(document["sequence"]) and document["origin"] != self.id:
+                            self._deliver(document["message"])
+            except pymongo.errors.PyMongoError as err:
+                logger.warning(f"Tailing dispatches failed: {err}")
+
+            # A tailing cursor dies if the collection is empty or it falls too far behind the capped collection.
+            start = max(0, self.sequence - MONGO_REORDER_WINDOW)
+
+            await asyncio.sleep(MONGO_RETRY_INTERVAL)
+
+
+def create_broker(settings: dict, db: AsyncIOMotorDatabase) -> LocalBroker:
+    """
+    Create the broker configured by the ``dispatch_broker`` setting.
+
+    :param settings: the application settings
+    :param db: the Motor database
+    :return: a broker
+
+    """
+    if settings.get("dispatch_broker") == "mongo":
+        return MongoBroker(db)
+
+    return LocalBroker()
@@ -69,6 +69,18 @@ SCHEMA = {
         "default": 4
     },
 
+    # Read quality
+    "qc_engine": {
+        "type": "string",
+        "default": "fastqc"
+    },
+
+    # Dispatch
+    "dispatch_broker": {
+        "type": "string",
+        "default": "local"
+    },
+
     # MongoDB
     "db_connection_string": {
         "type": "string",
@@ -221,6 +233,22 @@ def get_from_args():
         metavar="MEM"
     )
 
+    parser.add_argument(
+        "--qc-engine",
+        dest="qc_engine",
+        default=None,
+        choices=["fastqc", "native"],
+        help="the engine used to calculate read quality for samples and caches"
+    )
+
+    parser.add_argument(
+        "--dispatch-broker",
+        dest="dispatch_broker",
+        default=None,
+        choices=["local", "mongo"],
+        help="how WebSocket dispatches are shared between API processes"
+    )
+
     parser.add_argument(
         "--no-client",
         action="store_true",
@@ -1,8 +1,12 @@
+import asyncio
+import time
+
+import bson.json_util
 import motor.motor_asyncio
 import pymongo
 import pymongo.errors
 import pymongo.results
-from typing import Union
+from typing import List, Union
 
 import virtool.analyses.db
 import virtool.caches.db
@@ -17,10 +21,17 @@ import virtool.samples.db
 import virtool.settings.db
 import virtool.subtractions.db
 import virtool.users.db
+import virtool.users.utils
 import virtool.db.utils
 import virtool.errors
 import virtool.utils
 
+#: The number of seconds a cached document count is used for.
+COUNT_CACHE_TTL = 5
+
+#: The number of cached document counts kept for each collection. The cache is cleared when it is full.
+COUNT_CACHE_SIZE = 256
+
 
 class Collection:
     """
@@ -38,15 +49,24 @@ class Collection:
             dispatch: callable,
             processor: callable,
             projection: Union[None, list, dict],
-            silent: bool = False
+            silent: bool = False,
+            batch_processor: callable = None
     ):
         self.name = name
         self._collection = collection
         self.dispatch = dispatch
         self.processor = processor
+        self.batch_processor = batch_processor
         self.projection = projection
         self.silent = silent
 
+        #: Cached document counts and the times they expire keyed by serialized query.
+        self._counts = dict()
+
+        #: Incremented when documents are inserted or deleted through the collection so counts that were started
+        #: before the change are not cached.
+        self._count_generation = 0
+
         # No dispatches are necessary for these collection methods and they can be directly referenced instead of
         # wrapped.
         self.aggregate = self._collection.aggregate
@@ -59,7 +79,6 @@ class Collection:
         self.drop_indexes = self._collection.drop_indexes
         self.find_one = self._collection.find_one
         self.find = self._collection.find
-        self.insert_many = self._collection.insert_many
         self.rename = self._collection.rename
 
     def apply_projection(self, document: dict) -> dict:
@@ -82,6 +101,77 @@ class Collection:
 
         return virtool.utils.base_processor(document)
 
+    async def apply_processors(self, documents: List[dict]) -> List[dict]:
+        """
+        Apply the collection processor to a list of documents. The collection batch processor is used if it is defined,
+        so the data added to documents can be fetched for all of them at once. Otherwise, the documents are processed
+        concurrently.
+
+        :param documents: the documents to process
+        :return: the processed documents
+
+        """
+        if not documents:
+            return list()
+
+        if self.batch_processor:
+            return await self.batch_processor(self._collection.database, documents)
+
+        if self.processor:
+            return list(await asyncio.gather(*[self.apply_processor(document) for document in documents]))
+
+        return [virtool.utils.base_processor(document) for document in documents]
+
+    def is_silent(self, silent: bool) -> bool:
+        """
+        Check if a write should not be dispatched because the collection or the call is `silent`. Silent writes skip the
+        reads needed to build dispatches.
+
+        :param silent: the value of the call's ``silent`` parameter
+        :return: a boolean indicating if the write should not be dispatched
+
+        """
+        return silent or self.silent
+
+    async def count_documents_cached(self, query: dict) -> int:
+        """
+        Count the documents matching `query`. Counts are cached for :data:`COUNT_CACHE_TTL` seconds and invalidated
+        when documents are inserted or deleted through the collection.
+
+        :param query: a MongoDB query
+        :return: the number of matching documents
+
+        """
+        key = bson.json_util.dumps(query)
+
+        try:
+            expires_at, count = self._counts[key]
+
+            if expires_at > time.monotonic():
+                return count
+        except KeyError:
+            pass
+
+        generation = self._count_generation
+
+        count = await self._collection.count_documents(query)
+
+        if generation == self._count_generation:
+            if len(self._counts) >= COUNT_CACHE_SIZE:
+                self._counts.clear()
+
+            self._counts[key] = (time.monotonic() + COUNT_CACHE_TTL, count)
+
+        return count
+
+    def invalidate_counts(self):
+        """
+        Clear the cached document counts.
+
+        """
+        self._counts.clear()
+        self._count_generation += 1
+
     async def dispatch_conditionally(self, document: dict, operation: str, silent: bool):
         """
         Dispatch updates if the collection is not `silent` and the `silent` parameter is `False`. Applies the collection
@@ -109,16 +199,25 @@ class Collection:
         :return: the delete result
 
         """
+        if self.is_silent(silent):
+            delete_result = await self._collection.delete_many(query)
+            self.invalidate_counts()
+            return delete_result
+
         id_list = await self.distinct("_id", query)
 
+        if not id_list:
+            return pymongo.results.DeleteResult({"n": 0}, True)
+
         delete_result = await self._collection.delete_many(query)
 
-        if not silent and not self.silent and len(id_list):
-            await self.dispatch(self._collection.name, "delete", id_list)
+        self.invalidate_counts()
+
+        await self.dispatch(self._collection.name, "delete", id_list)
 
         return delete_result
 
-    async def delete_one(self, query: dict, silent: bool = False):
+    async def delete_one(self, query: dict, silent: bool = False) -> pymongo.results.DeleteResult:
         """
         Delete a single document based on the passed `query`.
 
@@ -127,15 +226,21 @@ class Collection:
         :return: the delete result
 
         """
-        document = await self._collection.find_one(query, ["_id"])
+        if self.is_silent(silent):
+            delete_result = await self._collection.delete_one(query)
+            self.invalidate_counts()
+            return delete_result
 
-        delete_result = await self._collection.delete_one(query)
+        document = await self._collection.find_one_and_delete(query, projection=["_id"])
 
-        if not silent and not self.silent and document:
-            id_list = [document["_id"]]
-            await self.dispatch(self._collection.name, "delete", id_list)
+        if document is None:
+            return pymongo.results.DeleteResult({"n": 0}, True)
 
-        return delete_result
+        self.invalidate_counts()
+
+        await self.dispatch(self._collection.name, "delete", [document["_id"]])
+
+        return pymongo.results.DeleteResult({"n": 1}, True)
 
     async def find_one_and_update(
             self,
@@ -188,15 +293,32 @@ class Collection:
 
         try:
             await self._collection.insert_one(document)
+            self.invalidate_counts()
             await self.dispatch_conditionally(document, "insert", silent)
             return document
         except pymongo.errors.DuplicateKeyError:
             if generate_id:
                 document.pop("_id")
-                return await self._collection.insert_one(document)
+                insert_result = await self._collection.insert_one(document)
+                self.invalidate_counts()
+                return insert_result
 
             raise
 
+    async def insert_many(self, documents: List[dict], *args, **kwargs) -> pymongo.results.InsertManyResult:
+        """
+        Insert many documents. No websocket messages are dispatched.
+
+        :param documents: the documents to insert
+        :return: the insert result
+
+        """
+        try:
+            return await self._collection.insert_many(documents, *args, **kwargs)
+        finally:
+            # Some documents may have been inserted even if the insert failed.
+            self.invalidate_counts()
+
     async def replace_one(self, query, replacement, upsert=False):
         document = await self._collection.find_one_and_replace(
             query,
@@ -205,6 +327,9 @@ class Collection:
             upsert=upsert
         )
 
+        if upsert:
+            self.invalidate_counts()
+
         if not self.silent:
             await self.dispatch(
                 self.name,
@@ -214,39 +339,91 @@ class Collection:
 
         return document
 
-    async def update_many(self, query, update, silent=False):
+    async def update_many(self, query, update, silent=False) -> pymongo.results.UpdateResult:
+        """
+        Update many documents based on the passed `query`.
+
+        :param query: a MongoDB query
+        :param update: a MongoDB update
+        :param silent: don't dispatch websocket messages for this operation
+        :return: the update result
+
+        """
+        if self.is_silent(silent):
+            return await self._collection.update_many(query, update)
+
         updated_ids = await self._collection.distinct("_id", query)
 
+        if not updated_ids:
+            return pymongo.results.UpdateResult({"n": 0, "nModified": 0}, True)
+
         update_result = await self._collection.update_many(query, update)
 
-        if not silent and not self.silent:
-            async for document in self._collection.find({"_id": {"$in": updated_ids}}, projection=self.projection):
-                await self.dispatch(
-                    self.name,
-                    "update",
-                    await self.apply_processor(document)
-                )
+        documents = await self._collection.find(
+            {"_id": {"$in": updated_ids}},
+            projection=self.projection
+        ).to_list(None)
+
+        for processed in await self.apply_processors(documents):
+            await self.dispatch(self.name, "update", processed)
 
         return update_result
 
-    async def update_one(self, query, update, upsert=False, silent=False):
-        document = await self.find_one(query, ["_id"])
+    async def update_one(self, query, update, upsert=False, silent=False) -> pymongo.results.UpdateResult:
+        """
+        Update a single document based on the passed `query`.
+
+        Dispatched updates are made with a ``findAndModify`` command so the updated document is returned with the
+        collection projection in the same round trip. The command does not report whether the matched document was
+        changed, so the ``modified_count`` of the returned result is ``None`` for dispatched updates.
+
+        :param query: a MongoDB query
+        :param update: a MongoDB update
+        :param upsert: insert a new document if the query doesn't match an existing document
+        :param silent: don't dispatch websocket messages for this operation
+        :return: the update result
+
+        """
+        if upsert:
+            self.invalidate_counts()
+
+        if self.is_silent(silent):
+            return await self._collection.update_one(query, update, upsert=upsert)
+
+        command = {
+            "query": query,
+            "update": update,
+            "new": True,
+            "upsert": upsert
+        }
+
+        if self.projection:
+            command["fields"] = self.projection
+
+            if isinstance(self.projection, (list, tuple)):
+                command["fields"] = {field: True for field in self.projection}
 
-        update_result = await self._collection.update_one(query, update, upsert=upsert)
+        response = await self._collection.database.command("findAndModify", self._collection.name, **command)
 
-        if document:
-            document = await self.find_one(document["_id"], projection=self.projection)
-        else:
-            document = await self.find_one(query, projection=self.projection)
+        last_error = response["lastErrorObject"]
 
-        if not silent and not self.silent and document:
+        raw_result = {
+            "n": last_error["n"]
+        }
+
+        if "upserted" in last_error:
+            raw_result["upserted"] = last_error["upserted"]
+
+        document = response.get("value")
+
+        if document is not None:
             await self.dispatch(
                 self.name,
                 "update",
                 await self.apply_processor(document)
             )
 
-        return update_result
+        return pymongo.results.UpdateResult(raw_result, True)
 
 
 class DB:
@@ -255,11 +432,19 @@ class DB:
         self.motor_client = client
         self.dispatch = dispatch
 
+        #: Caches the sessions and API keys used to authorize requests.
+        self.auth_cache = virtool.users.utils.AuthCache()
+
         self.analyses = self.bind_collection(
             "analyses",
             projection=virtool.analyses.db.PROJECTION
         )
 
+        self.blobs = self.bind_collection(
+            "blobs",
+            silent=True
+        )
+
         self.caches = self.bind_collection(
             "caches",
             projection=virtool.caches.db.PROJECTION
@@ -289,7 +474,9 @@ class DB:
 
         self.indexes = self.bind_collection(
             "indexes",
-            projection=virtool.indexes.db.PROJECTION
+            processor=virtool.indexes.db.processor,
+            projection=virtool.indexes.db.PROJECTION,
+            batch_processor=virtool.indexes.db.batch_processor
         )
 
         self.jobs = self.bind_collection(
@@ -320,7 +507,8 @@ class DB:
         self.references = self.bind_collection(
             "references",
             processor=virtool.references.db.processor,
-            projection=virtool.references.db.PROJECTION
+            projection=virtool.references.db.PROJECTION,
+            batch_processor=virtool.references.db.batch_processor
         )
 
         self.samples = self.bind_collection(
@@ -346,19 +534,25 @@ class DB:
             projection=virtool.subtractions.db.PROJECTION
         )
 
+        self.uploads = self.bind_collection(
+            "uploads",
+            silent=True
+        )
+
         self.users = self.bind_collection(
             "users",
             projection=virtool.users.db.PROJECTION
         )
 
-    def bind_collection(self, name, processor=None, projection=None, silent=False):
+    def bind_collection(self, name, processor=None, projection=None, silent=False, batch_processor=None):
         return Collection(
             name,
             self.motor_client[name],
             self.dispatch,
             processor,
             projection,
-            silent
+            silent,
+            batch_processor
         )
 
     def get_processor(self, collection_name):
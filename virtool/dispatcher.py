@@ -1,10 +1,13 @@
+import asyncio
 import logging
+from collections import defaultdict, deque
 from copy import deepcopy
-from typing import Union
+from typing import Iterable, List, Union
 
 import virtool.analyses.db
 import virtool.api
 import virtool.api.json
+import virtool.broker
 import virtool.files.db
 import virtool.groups.db
 import virtool.history.db
@@ -42,6 +45,13 @@ INTERFACES = (
     "users"
 )
 
+#: The number of serialized messages that can wait to be sent to a connection. Connections that fall this far behind
+#: are dropped.
+SEND_QUEUE_SIZE = 256
+
+#: The number of broadcast messages kept so reconnecting clients can receive the messages they missed.
+REPLAY_BUFFER_SIZE = 1000
+
 #: Allowed operations. Calls to :meth:`.Dispatcher.dispatch` will be validated against these operations.
 OPERATIONS = (
     "insert",
@@ -49,20 +59,126 @@ OPERATIONS = (
     "delete"
 )
 
+#: Operations that clients can send to manage their subscriptions.
+SUBSCRIPTION_OPERATIONS = (
+    "subscribe",
+    "unsubscribe"
+)
+
+
+def get_ids(data: Union[dict, list]) -> list:
+    """
+    Return the ids of the documents referred to by dispatch `data`. Data is either a single document, a list of
+    documents, or a list of ids.
+
+    :param data: the dispatch data
+    :return: the document ids
+
+    """
+    if isinstance(data, dict):
+        return [data["id"]] if "id" in data else list()
+
+    ids = list()
+
+    for item in data:
+        if isinstance(item, dict):
+            if "id" in item:
+                ids.append(item["id"])
+        else:
+            ids.append(item)
+
+    return ids
+
 
 class Connection:
 
-    def __init__(self, ws, session):
+    def __init__(self, ws, session, queue_size: int = SEND_QUEUE_SIZE):
         self._ws = ws
         self.ping = self._ws.ping
         self.user_id = session.user_id
         self.groups = session.groups
         self.permissions = session.permissions
 
+        #: The maximum number of messages that can wait to be sent.
+        self.queue_size = queue_size
+
+        #: Serialized messages waiting to be sent and the loop times they were queued at. Created along with the writer
+        #: task when the first message is queued.
+        self._queue = None
+
+        #: The task that sends queued messages.
+        self._writer = None
+
+        #: Set when the connection can no longer be written to.
+        self.closed = False
+
+        #: The number of queued messages that have been sent.
+        self.sent = 0
+
+        #: The total and longest time in seconds between queueing and sending a message.
+        self.latency = 0.0
+        self.max_latency = 0.0
+
+    @property
+    def depth(self) -> int:
+        """
+        The number of messages waiting to be sent.
+
+        """
+        return self._queue.qsize() if self._queue else 0
+
     async def send(self, message):
         await self._ws.send_json(message, dumps=virtool.api.json.dumps)
 
+    def put(self, text: str) -> bool:
+        """
+        Queue a serialized message to be sent by the connection's writer task. Never waits on the client.
+
+        Returns ``False`` if the connection is closed or its queue is full. The connection should be dropped in either
+        case.
+
+        :param text: the serialized message
+        :return: a boolean indicating if the message was queued
+
+        """
+        if self.closed:
+            return False
+
+        if self._writer is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._writer = asyncio.ensure_future(self._write())
+
+        try:
+            self._queue.put_nowait((text, asyncio.get_event_loop().time()))
+        except asyncio.QueueFull:
+            return False
+
+        return True
+
+    async def _write(self):
+        loop = asyncio.get_event_loop()
+
+        while True:
+            text, queued_at = await self._queue.get()
+
+            try:
+                await self._ws.send_str(text)
+            except (ConnectionError, RuntimeError):
+                self.closed = True
+                break
+
+            latency = loop.time() - queued_at
+
+            self.sent += 1
+            self.latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
     async def close(self):
+        self.closed = True
+
+        if self._writer is not None:
+            self._writer.cancel()
+
         await self._ws.close()
 
 
@@ -71,7 +187,8 @@ async def default_writer(connection: Connection, message: dict):
     The default writer for sending dispatch messages.
 
     Writers are used to modify messages based on the sending :class:`.Connection`. The default writer does not modify
-    the message.
+    the message. When it is used, :meth:`.Dispatcher.dispatch` serializes the message once and queues it for every
+    connection instead of calling the writer.
 
     :param connection: the connection to send the message through
     :param message: the message
@@ -81,21 +198,108 @@ async def default_writer(connection: Connection, message: dict):
 
 class Dispatcher:
 
-    def __init__(self):
+    def __init__(self, broker: virtool.broker.LocalBroker = None):
+        #: Publishes broadcast messages to every API process and numbers them.
+        self.broker = None
+        self.set_broker(broker or virtool.broker.LocalBroker())
+
         #: A dict of all active connections.
         self.connections = list()
+
+        #: Connections that receive every dispatch because they have not subscribed to anything.
+        self._unsubscribed = set()
+
+        #: Maps interfaces to the connections subscribed to them. Connections subscribed to a whole interface are stored
+        #: under ``None``. Connections subscribed to specific documents are stored under the document ids.
+        self._subscriptions = defaultdict(lambda: defaultdict(set))
+
+        #: The ``(interface, id)`` subscription keys held by each subscribed connection.
+        self._subscription_keys = dict()
+
+        #: The sequence numbers and serialized text of recent broadcast messages.
+        self._replay = deque(maxlen=REPLAY_BUFFER_SIZE)
+
+        #: Counts of dispatched messages, connections dropped for falling behind, and messages replayed to reconnecting
+        #: clients.
+        self.metrics = {
+            "dispatched": 0,
+            "dropped": 0,
+            "replayed": 0
+        }
+
         logging.debug("Initialized dispatcher")
 
-    def add_connection(self, connection: Connection):
+    @property
+    def sequence(self) -> int:
+        """
+        The sequence number of the last broadcast message.
+
+        """
+        return self.broker.sequence
+
+    def set_broker(self, broker: virtool.broker.LocalBroker):
+        """
+        Use `broker` to publish broadcast messages. Call :meth:`.start` afterwards to start the broker.
+
+        :param broker: the broker to use
+
+        """
+        self.broker = broker
+        self.broker.bind(self.deliver)
+
+    async def start(self):
+        """
+        Start the broker so messages published by other processes are delivered.
+
+        """
+        await self.broker.start()
+
+    def add_connection(self, connection: Connection, sequence: int = None):
         """
         Add a connection to the dispatcher.
 
+        If `sequence` is given, the broadcast messages dispatched after it are queued for the connection before it
+        starts receiving new messages. If the messages are no longer buffered, a ``resync`` message is queued instead.
+
         :param connection: the connection to add
+        :param sequence: the sequence number of the last message received by a reconnecting client
 
         """
+        if sequence is not None and connection.user_id:
+            self.replay(connection, sequence)
+
         self.connections.append(connection)
+        self._unsubscribed.add(connection)
         logging.debug(f'Added connection to dispatcher: {connection.user_id}')
 
+    def replay(self, connection: Connection, sequence: int):
+        """
+        Queue the buffered broadcast messages dispatched after `sequence` for `connection`.
+
+        A ``resync`` message is queued instead if any of the messages have left the buffer or there are more than the
+        connection can queue. The client should then refetch its data.
+
+        :param connection: the connection to replay messages to
+        :param sequence: the sequence number of the last message received by the client
+
+        """
+        oldest = self._replay[0][0] if self._replay else self.sequence + 1
+
+        missed = [text for message_sequence, text in self._replay if message_sequence > sequence]
+
+        if sequence > self.sequence or sequence < oldest - 1 or len(missed) >= connection.queue_size:
+            connection.put(virtool.api.json.dumps({
+                "operation": "resync",
+                "sequence": self.sequence
+            }))
+
+            return
+
+        for text in missed:
+            connection.put(text)
+
+        self.metrics["replayed"] += len(missed)
+
     def update_connections(self, user: dict):
         """
         Given a user document, updates the `groups` and `permissions` attributes for all active
@@ -118,12 +322,100 @@ class Dispatcher:
         :param connection: the connection to remove
 
         """
+        self._unsubscribed.discard(connection)
+
+        for interface, key in self._subscription_keys.pop(connection, set()):
+            self._discard_subscription(connection, interface, key)
+
         try:
             self.connections.remove(connection)
             logging.debug(f'Removed connection from dispatcher: {connection.user_id}')
         except ValueError:
             pass
 
+    def subscribe(self, connection: Connection, interface: str, ids: Iterable[str] = None):
+        """
+        Subscribe a connection to dispatches for an interface. Pass `ids` to only receive dispatches for those
+        documents.
+
+        A connection that has never subscribed receives every dispatch. Once it subscribes, it only receives dispatches
+        it is subscribed to.
+
+        :param connection: the connection to subscribe
+        :param interface: the interface to subscribe to
+        :param ids: the ids of the documents to subscribe to
+
+        """
+        if interface not in INTERFACES:
+            raise ValueError(f"Unknown dispatch interface: {interface}")
+
+        self._unsubscribed.discard(connection)
+
+        keys = self._subscription_keys.setdefault(connection, set())
+
+        for key in ([None] if ids is None else ids):
+            self._subscriptions[interface][key].add(connection)
+            keys.add((interface, key))
+
+    def unsubscribe(self, connection: Connection, interface: str, ids: Iterable[str] = None):
+        """
+        Unsubscribe a connection from dispatches for an interface. If `ids` is not given, all subscriptions to the
+        interface are removed.
+
+        :param connection: the connection to unsubscribe
+        :param interface: the interface to unsubscribe from
+        :param ids: the ids of the documents to unsubscribe from
+
+        """
+        if interface not in INTERFACES:
+            raise ValueError(f"Unknown dispatch interface: {interface}")
+
+        # A connection that unsubscribes from something before subscribing to anything no longer receives everything.
+        self._unsubscribed.discard(connection)
+
+        keys = self._subscription_keys.setdefault(connection, set())
+
+        if ids is None:
+            to_remove = {key for key in keys if key[0] == interface}
+        else:
+            to_remove = {(interface, key) for key in ids} & keys
+
+        for key in to_remove:
+            self._discard_subscription(connection, *key)
+
+        keys -= to_remove
+
+    def _discard_subscription(self, connection: Connection, interface: str, key: Union[str, None]):
+        subscribers = self._subscriptions[interface]
+
+        subscribers[key].discard(connection)
+
+        if not subscribers[key]:
+            del subscribers[key]
+
+    def get_subscribers(self, interface: str, data: Union[dict, list]) -> List[Connection]:
+        """
+        Return the connections that should receive a dispatch for `interface` and `data` based on their subscriptions.
+        This includes connections subscribed to the whole interface, connections subscribed to any of the documents in
+        `data`, and connections that have not subscribed to anything.
+
+        :param interface: the dispatch interface
+        :param data: the dispatch data
+        :return: the subscribed connections
+
+        """
+        subscribers = set(self._unsubscribed)
+
+        by_key = self._subscriptions.get(interface)
+
+        if by_key:
+            subscribers.update(by_key.get(None, ()))
+
+            for document_id in get_ids(data):
+                subscribers.update(by_key.get(document_id, ()))
+
+        return list(subscribers)
+
     async def dispatch(
             self,
             interface: str,
@@ -171,29 +463,47 @@ class Dispatcher:
             "data": data
         }
 
-        # If the connections parameter was not set, dispatch the message to all authorized connections. Authorized
-        # connections have assigned ``user_id`` properties.
-        connections = connections or [conn for conn in self.connections if conn.user_id]
+        if conn_filter and not callable(conn_filter):
+            raise TypeError("conn_filter must be callable")
 
-        if conn_filter:
-            if not callable(conn_filter):
-                raise TypeError("conn_filter must be callable")
+        if conn_modifier and not callable(conn_modifier):
+            raise TypeError("conn_modifier must be callable")
+
+        if writer and not callable(writer):
+            raise TypeError("writer must be callable")
 
+        # Messages sent to every subscribed connection are published to all API processes, numbered, and buffered so
+        # they can be replayed. Messages targeted at specific connections or modified for them are only sent by this
+        # process.
+        if not connections and conn_filter is None and conn_modifier is None and writer is default_writer:
+            return await self.broker.publish(message)
+
+        # If the connections parameter was not set, dispatch the message to all authorized connections subscribed to
+        # the message. Authorized connections have assigned ``user_id`` properties.
+        connections = connections or [conn for conn in self.get_subscribers(interface, data) if conn.user_id]
+
+        if conn_filter:
             connections = [conn for conn in connections if conn_filter(conn)]
 
         if conn_modifier:
-            if not callable(conn_modifier):
-                raise TypeError("conn_modifier must be callable")
-
             for connection in connections:
                 conn_modifier(connection)
 
-        if writer and not callable(writer):
-            raise TypeError("writer must be callable")
-
         connections_to_remove = list()
 
+        # Serialized once and shared by all connections that use the default writer.
+        text = None
+
         for connection in connections:
+            if writer is default_writer:
+                if text is None:
+                    text = virtool.api.json.dumps(message)
+
+                if not connection.put(text):
+                    connections_to_remove.append(connection)
+
+                continue
+
             try:
                 await writer(connection, deepcopy(message))
             except RuntimeError as err:
@@ -201,13 +511,76 @@ class Dispatcher:
                     connections_to_remove.append(connection)
 
         for connection in connections_to_remove:
-            self.remove_connection(connection)
+            self.drop_connection(connection)
+
+        self.metrics["dispatched"] += 1
 
         logging.debug(f"Dispatched {interface}.{operation}")
 
+    def deliver(self, message: dict):
+        """
+        Send a numbered broadcast `message` to the authorized connections subscribed to it and add it to the replay
+        buffer. Called by the broker for messages published by any process.
+
+        :param message: the message to deliver
+
+        """
+        text = virtool.api.json.dumps(message)
+
+        self._replay.append((message["sequence"], text))
+
+        connections = self.get_subscribers(message["interface"], message["data"])
+
+        for connection in connections:
+            if connection.user_id and not connection.put(text):
+                self.drop_connection(connection)
+
+        self.metrics["dispatched"] += 1
+
+        logging.debug(f"Delivered {message['interface']}.{message['operation']}")
+
+    def drop_connection(self, connection: Connection):
+        """
+        Remove a connection that can not keep up with dispatches and close it. The client is expected to reconnect and
+        refetch its data.
+
+        :param connection: the connection to drop
+
+        """
+        self.remove_connection(connection)
+        self.metrics["dropped"] += 1
+
+        asyncio.ensure_future(connection.close())
+
+        logging.debug(f"Dropped connection: {connection.user_id}")
+
+    def get_metrics(self) -> dict:
+        """
+        Return dispatch metrics including the send queue depth and send latency across all active connections.
+
+        :return: the metrics
+
+        """
+        depths = [connection.depth for connection in self.connections]
+
+        sent = sum(connection.sent for connection in self.connections)
+        latency = sum(connection.latency for connection in self.connections)
+
+        return {
+            **self.metrics,
+            "connections": len(self.connections),
+            "queued": sum(depths),
+            "max_queued": max(depths, default=0),
+            "sent": sent,
+            "mean_latency": latency / sent if sent else 0.0,
+            "max_latency": max((connection.max_latency for connection in self.connections), default=0.0)
+        }
+
     async def close(self):
         logging.debug("Closing dispatcher")
 
+        await self.broker.close()
+
         for connection in self.connections:
             await connection.close()
 
@@ -3,27 +3,31 @@ Provides request handlers for file downloads.
 
 """
 import os
-import gzip
-import json
+import tempfile
 
+import aiofiles
 from aiohttp import web
 
 import virtool.analyses.format
-import virtool.api.json
 import virtool.api.response
 import virtool.bio
 import virtool.analyses.db
 import virtool.db.utils
 import virtool.downloads.db
 import virtool.history.db
+import virtool.indexes.db
 import virtool.otus.db
 import virtool.references.db
+import virtool.references.utils
 import virtool.errors
 import virtool.http.routes
 import virtool.otus.utils
 import virtool.utils
 import virtool.samples.utils
 
+#: The number of bytes to send at a time when streaming a file.
+STREAM_CHUNK_SIZE = 1024 * 1024
+
 routes = virtool.http.routes.Routes()
 
 
@@ -36,24 +40,67 @@ async def download_analysis(req):
 
     document = await db.analyses.find_one(analysis_id)
 
-    if extension == "xlsx":
-        formatted = await virtool.analyses.format.format_analysis_to_excel(req.app, document)
+    if document is None:
+        return virtool.api.response.not_found()
 
+    if extension == "xlsx":
         headers = {
             "Content-Disposition": f"attachment; filename={analysis_id}.xlsx",
             "Content-Type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         }
 
-        return web.Response(body=formatted, headers=headers)
+        with tempfile.TemporaryDirectory() as temp_path:
+            path = os.path.join(temp_path, f"{analysis_id}.xlsx")
 
-    formatted = await virtool.analyses.format.format_analysis_to_csv(req.app, document)
+            await virtool.analyses.format.format_analysis_to_excel(req.app, document, path)
+
+            return await stream_file(req, path, headers)
 
     headers = {
         "Content-Disposition": f"attachment; filename={analysis_id}.csv",
         "Content-Type": "text/csv"
     }
 
-    return web.Response(text=formatted, headers=headers)
+    resp = web.StreamResponse(headers=headers)
+
+    await resp.prepare(req)
+
+    async for chunk in virtool.analyses.format.format_analysis_to_csv(req.app, document):
+        await resp.write(chunk.encode())
+
+    await resp.write_eof()
+
+    return resp
+
+
+async def stream_file(req, path: str, headers: dict) -> web.StreamResponse:
+    """
+    Send the file at `path` to the client in chunks.
+
+    :param req: the request
+    :param path: the path of the file to send
+    :param headers: headers to send with the response
+    :return: the response
+
+    """
+    resp = web.StreamResponse(headers=headers)
+
+    resp.content_length = os.path.getsize(path)
+
+    await resp.prepare(req)
+
+    async with aiofiles.open(path, "rb") as f:
+        while True:
+            chunk = await f.read(STREAM_CHUNK_SIZE)
+
+            if not chunk:
+                break
+
+            await resp.write(chunk)
+
+    await resp.write_eof()
+
+    return resp
 
 
 @routes.get(r"/download/samples/{sample_id}/{prefix}_{suffix}.{extension:(fq|fastq|fq\.gz|fastq\.gz)}")
@@ -151,6 +198,8 @@ async def download_reference(req):
     Export all otus and sequences for a given reference as a gzipped JSON string. Made available as a downloadable file
     named ``reference.json.gz``.
 
+    Exports are built from the latest ready index and cached on disk. The cache key is sent as an ``ETag``.
+
     """
     db = req.app["db"]
     ref_id = req.match_info["ref_id"]
@@ -160,33 +209,126 @@ async def download_reference(req):
     if document is None:
         return virtool.api.response.not_found()
 
-    otu_list = await virtool.references.db.export(
-        req.app,
-        ref_id
-    )
+    header = virtool.references.utils.get_export_header(document)
 
-    data = {
-        "otus": otu_list,
-        "data_type": document["data_type"],
-        "organism": document["organism"]
+    headers = {
+        "Content-Disposition": "attachment; filename=reference.json.gz",
+        "Content-Type": "application/gzip"
     }
 
+    index_id, _ = await virtool.indexes.db.get_current_id_and_version(db, ref_id)
+
+    if index_id is None:
+        return await stream_reference_export(req, ref_id, header, headers)
+
+    digest = virtool.references.utils.get_export_digest(header)
+
+    etag = f'"{index_id}-{digest}"'
+
+    headers["ETag"] = etag
+
+    if etag_matches(req, etag):
+        resp = virtool.api.response.not_modified()
+        resp.headers["ETag"] = etag
+        return resp
+
+    path = virtool.references.utils.join_export_path(req.app["settings"], ref_id, index_id, digest)
+
+    if os.path.isfile(path):
+        return await stream_file(req, path, headers)
+
+    return await stream_reference_export(req, ref_id, header, headers, path)
+
+
+def etag_matches(req, etag: str) -> bool:
+    """
+    Check if the ``If-None-Match`` header of the request matches `etag`.
+
+    :param req: the request
+    :param etag: the current ETag of the resource
+    :return: a boolean indicating if the client already has the current resource
+
+    """
+    value = req.headers.get("If-None-Match")
+
+    if not value:
+        return False
+
+    tags = [tag.strip() for tag in value.split(",")]
+
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+async def stream_reference_export(req, ref_id: str, header: dict, headers: dict, path: str = None):
+    """
+    Stream the export of the reference with `ref_id` to the client as it is built.
+
+    If `path` is given, the export is also written to a temporary file that is moved to `path` once the export is
+    complete. Other cached exports in the same directory are then removed.
+
+    :param req: the request
+    :param ref_id: the id of the reference to export
+    :param header: the fields other than ``otus`` to include in the export
+    :param headers: headers to send with the response
+    :param path: the path to cache the export at
+    :return: the response
+
+    """
+    resp = web.StreamResponse(headers=headers)
+    resp.enable_chunked_encoding()
+
+    await resp.prepare(req)
+
+    if path is None:
+        async for chunk in virtool.references.db.iter_export(req.app, ref_id, header):
+            await resp.write(chunk)
+
+        await resp.write_eof()
+
+        return resp
+
+    directory = os.path.dirname(path)
+
+    await req.app["run_in_thread"](os.makedirs, directory, 0o755, True)
+
+    fd, temp_path = await req.app["run_in_thread"](tempfile.mkstemp, ".tmp", "reference.", directory)
+    os.close(fd)
+
     try:
-        data["targets"] = document["targets"]
-    except KeyError:
-        pass
+        async with aiofiles.open(temp_path, "wb") as f:
+            async for chunk in virtool.references.db.iter_export(req.app, ref_id, header):
+                await resp.write(chunk)
+                await f.write(chunk)
+
+        await req.app["run_in_thread"](os.replace, temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            await req.app["run_in_thread"](os.remove, temp_path)
 
-    # Convert the list of OTUs to a JSON-formatted string.
-    json_string = json.dumps(data, cls=virtool.api.json.CustomEncoder)
+    await req.app["run_in_thread"](remove_stale_exports, path)
+
+    await resp.write_eof()
+
+    return resp
+
+
+def remove_stale_exports(path: str):
+    """
+    Remove cached reference exports other than the one at `path` from its directory.
+
+    :param path: the path of the current export
+
+    """
+    directory, name = os.path.split(path)
 
-    # Compress the JSON string with gzip.
-    body = await req.app["run_in_process"](gzip.compress, bytes(json_string, "utf-8"))
+    prefix, suffix = virtool.references.utils.EXPORT_FILENAME.split("{}")
 
-    return web.Response(
-        headers={"Content-Disposition": f"attachment; filename=reference.json.gz"},
-        content_type="application/gzip",
-        body=body
-    )
+    for other in os.listdir(directory):
+        if other != name and other.startswith(prefix) and other.endswith(suffix):
+            try:
+                os.remove(os.path.join(directory, other))
+            except FileNotFoundError:
+                pass
 
 
 @routes.get("/download/sequences/{sequence_id}")
@@ -100,6 +100,8 @@ async def remove(db, settings: dict, run_in_thread: callable, file_id: str):
     :return: the number of deleted files
 
     """
+    content_hash = await virtool.db.utils.get_one_field(db.files, "hash", file_id)
+
     delete_result = await db.files.delete_one({"_id": file_id})
 
     path = virtool.files.utils.join_file_path(settings, file_id)
@@ -109,9 +111,81 @@ async def remove(db, settings: dict, run_in_thread: callable, file_id: str):
     except FileNotFoundError:
         pass
 
+    if content_hash and delete_result.deleted_count:
+        await release_blob(db, settings, run_in_thread, content_hash)
+
     return delete_result.deleted_count
 
 
+async def attach_blob(db, settings: dict, run_in_thread: callable, file_id: str, content_hash: str, size: int) -> bool:
+    """
+    Store the file with `file_id` in the content-addressed blob store and increment the reference count of its blob.
+
+    The file id remains an alias for the blob, so the file can still be used as before.
+
+    :param db: the application database object
+    :param settings: the application settings
+    :param run_in_thread: the application thread running function
+    :param file_id: the id of a completely written file
+    :param content_hash: the SHA-256 hex digest of the file content
+    :param size: the size of the file in bytes
+    :return: `True` if the file was deduplicated against an existing blob
+
+    """
+    deduplicated = await run_in_thread(virtool.files.utils.link_blob, settings, file_id, content_hash)
+
+    await db.blobs.update_one({"_id": content_hash}, {
+        "$inc": {
+            "count": 1
+        },
+        "$set": {
+            "size": size
+        }
+    }, upsert=True)
+
+    await db.files.update_one({"_id": file_id}, {
+        "$set": {
+            "hash": content_hash
+        }
+    })
+
+    if deduplicated:
+        logger.debug(f"Deduplicated file {file_id} against blob {content_hash}")
+
+    return deduplicated
+
+
+async def release_blob(db, settings: dict, run_in_thread: callable, content_hash: str):
+    """
+    Decrement the reference count of the blob with `content_hash`. The blob is removed when it is no longer referenced
+    by any file.
+
+    Files are hard links to their blobs, so removing a blob never affects the data of files that are still using it.
+
+    :param db: the application database object
+    :param settings: the application settings
+    :param run_in_thread: the application thread running function
+    :param content_hash: the SHA-256 hex digest of the blob content
+
+    """
+    document = await db.blobs.find_one_and_update({"_id": content_hash}, {
+        "$inc": {
+            "count": -1
+        }
+    })
+
+    if document is None or document["count"] > 0:
+        return
+
+    delete_result = await db.blobs.delete_one({"_id": content_hash, "count": {"$lte": 0}})
+
+    if delete_result.deleted_count:
+        try:
+            await run_in_thread(virtool.utils.rm, virtool.files.utils.join_blob_path(settings, content_hash))
+        except FileNotFoundError:
+            pass
+
+
 async def reserve(db, file_ids: list):
     """
     Reserve the files identified in `file_ids` by setting the `reserved` field to `True`.
@@ -1,8 +1,8 @@
 import asyncio
+import functools
 import logging
 import os
 import re
-import shutil
 import sys
 
 try:
@@ -10,6 +10,7 @@ try:
 except (ImportError, OSError):
     aionotify = None
 
+import virtool.db.utils
 import virtool.files.db
 import virtool.files.utils
 import virtool.utils
@@ -75,13 +76,36 @@ def handle_watch_error(err: Exception):
 
 class Manager:
 
-    def __init__(self, executor, db, files_path, watch_path, clean_interval=20):
+    def __init__(self, executor, db, settings, files_path, watch_path, clean_interval=20, scan_interval=300):
         self.loop = asyncio.get_event_loop()
         self.executor = executor
         self.db = db
+        self.settings = settings
+
+        #: Runs a function in the executor. Passed to the blob store functions in :mod:`virtool.files.db`.
+        self.run_in_thread = functools.partial(self.loop.run_in_executor, self.executor)
         self.files_path = files_path
         self.watch_path = watch_path
         self.clean_interval = clean_interval
+        self.scan_interval = scan_interval
+
+        #: The names of the files in the files path. Populated by full scans and kept current with inotify events
+        #: between them.
+        self.present = set()
+
+        #: Files reported by inotify while a full scan is running. ``None`` when no scan is running.
+        self.added = None
+
+        #: The loop time of the last full scan of the files path.
+        self.last_scan = None
+
+        #: Running totals describing the work done by :meth:`.reconcile`.
+        self.metrics = {
+            "scans": 0,
+            "scanned": 0,
+            "removed": 0,
+            "reconciled": 0
+        }
 
         try:
             self.watcher = aionotify.Watcher()
@@ -107,35 +131,105 @@ class Manager:
         return await asyncio.gather(*coros)
 
     async def clean(self):
+        """
+        Reconcile the files path and the database every `clean_interval` seconds.
+
+        """
         try:
             while True:
-                dir_list = os.listdir(self.files_path)
-                db_list = await self.db.files.distinct("_id")
+                await self.reconcile()
+                await asyncio.sleep(self.clean_interval)
+        except asyncio.CancelledError:
+            pass
+
+    async def reconcile(self):
+        """
+        Remove files that have no database document and remove the documents of created files that no longer exist.
 
-                for filename in dir_list:
-                    if filename not in db_list:
-                        await self.loop.run_in_executor(
-                            self.executor,
-                            os.remove,
-                            os.path.join(self.files_path, filename)
-                        )
+        The files path is fully scanned every `scan_interval` seconds. Passes in between use the set of present files
+        maintained from inotify events.
 
-                db_created_list = await self.db.files.find({"created": True}).distinct("_id")
+        """
+        now = self.loop.time()
 
-                await self.db.files.delete_many({
-                    "_id": {
-                        "$in": [filename for filename in db_created_list if filename not in dir_list]
-                    }
-                })
+        if self.last_scan is None or now - self.last_scan >= self.scan_interval:
+            self.added = set()
 
-                count = 0
-                threshold = self.clean_interval / 0.3
+            scanned = await self.loop.run_in_executor(
+                self.executor,
+                virtool.files.utils.scan_files,
+                self.files_path
+            )
 
-                while count < threshold:
-                    await asyncio.sleep(0.3)
+            # Keep files reported by inotify while the scan was running.
+            self.present = scanned | self.added
+            self.added = None
 
-        except asyncio.CancelledError:
-            pass
+            self.last_scan = now
+
+            self.metrics["scans"] += 1
+            self.metrics["scanned"] += len(scanned)
+
+        # Documents are always created before their files are written. Taking the snapshot before querying the
+        # database makes sure new files are never seen without their documents.
+        present = set(self.present)
+
+        untracked = present - set(await self.db.files.distinct("_id"))
+
+        if untracked:
+            self.metrics["removed"] += await self.loop.run_in_executor(
+                self.executor,
+                virtool.files.utils.remove_files,
+                self.files_path,
+                untracked
+            )
+
+            self.present -= untracked
+
+        # Compare with the live set so that files created since the snapshot are not considered missing.
+        missing = set(await self.db.files.distinct("_id", {"created": True})) - self.present
+
+        if missing:
+            query = {
+                "_id": {
+                    "$in": list(missing)
+                }
+            }
+
+            hashes = [document.get("hash") async for document in self.db.files.find(query, ["hash"])]
+
+            delete_result = await self.db.files.delete_many(query)
+
+            await self.release_blobs(hashes)
+
+            self.metrics["reconciled"] += delete_result.deleted_count
+
+        if untracked or missing:
+            logger.debug(f"Reconciled files path (removed={len(untracked)}, reconciled={len(missing)})")
+
+    async def release_blobs(self, hashes: list):
+        """
+        Release the blobs used by removed file documents. Files that were never added to the blob store have no hash
+        and are skipped.
+
+        :param hashes: the content hashes of the removed files
+
+        """
+        for content_hash in hashes:
+            if content_hash:
+                await virtool.files.db.release_blob(self.db, self.settings, self.run_in_thread, content_hash)
+
+    def add_present(self, filename: str):
+        """
+        Record that the file `filename` exists in the files path.
+
+        :param filename: the name of the file
+
+        """
+        self.present.add(filename)
+
+        if self.added is not None:
+            self.added.add(filename)
 
     async def watch(self):
         logging.debug("Started file manager")
@@ -174,34 +268,56 @@ class Manager:
         """
         Handle the writing or moving of a file to the watch path.
 
+        Read files are moved into the files path. Files on the same device are renamed instead of copied. Files that
+        have to be copied are hashed during the copy and added to the blob store.
+
         :param filename: the name of the written or moved file
         :type filename: str
 
         """
         path = os.path.join(self.watch_path, filename)
 
-        is_read_file = virtool.files.utils.has_read_extension(filename)
-
-        if is_read_file:
-            document = await virtool.files.db.create(self.db, filename, "reads")
-
+        if not virtool.files.utils.has_read_extension(filename):
             await self.loop.run_in_executor(
                 self.executor,
-                shutil.copy,
-                path,
-                os.path.join(self.files_path, document["id"])
+                os.remove,
+                path
             )
 
-            logging.debug("Retrieved file from watch path: " + filename)
+            logging.debug("Removed invalid read file from watch path: " + filename)
+
+            return
 
-        await self.loop.run_in_executor(
+        document = await virtool.files.db.create(self.db, filename, "reads")
+
+        file_id = document["id"]
+
+        result = await self.loop.run_in_executor(
             self.executor,
-            os.remove,
-            path
+            virtool.files.utils.move_file,
+            path,
+            os.path.join(self.files_path, file_id)
         )
 
-        if not is_read_file:
-            logging.debug("Removed invalid read file from watch path: " + filename)
+        if result["hash"]:
+            await virtool.files.db.attach_blob(
+                self.db,
+                self.settings,
+                self.run_in_thread,
+                file_id,
+                result["hash"],
+                result["size"]
+            )
+
+        # Renamed files do not produce a close event, so the file is marked as ready here.
+        await self.db.files.update_one({"_id": file_id}, {
+            "$set": {
+                "size": result["size"],
+                "ready": True
+            }
+        })
+
+        logging.debug("Retrieved file from watch path: " + filename)
 
     async def handle_close(self, filename):
         """
@@ -214,6 +330,8 @@ class Manager:
         """
         path = os.path.join(self.files_path, filename)
 
+        self.add_present(filename)
+
         size = virtool.utils.file_stats(path)["size"]
 
         update_result = await self.db.files.update_one({"_id": filename}, {
@@ -230,6 +348,8 @@ class Manager:
                 path
             )
 
+            self.present.discard(filename)
+
             logging.debug("Removed untracked file from files path: " + filename)
 
         else:
@@ -243,6 +363,8 @@ class Manager:
         :type filename: str
 
         """
+        self.add_present(filename)
+
         await self.db.files.update_one({"_id": filename}, {
             "$set": {
                 "created": True
@@ -259,4 +381,11 @@ class Manager:
         :type filename: str
 
         """
-        await self.db.files.delete_one({"_id": filename})
+        self.present.discard(filename)
+
+        content_hash = await virtool.db.utils.get_one_field(self.db.files, "hash", filename)
+
+        delete_result = await self.db.files.delete_one({"_id": filename})
+
+        if delete_result.deleted_count:
+            await self.release_blobs([content_hash])
@@ -1,4 +1,7 @@
+import errno
+import hashlib
 import os
+from typing import Iterable, Set
 
 try:
     import aionotify
@@ -6,6 +9,9 @@ except (ImportError, OSError):
     aionotify = None
 
 
+#: The number of bytes copied at a time when a file cannot be moved by renaming it.
+COPY_BUFFER_SIZE = 4 * 1024 * 1024
+
 #: Files with these extensions will be consumed from the watch folder and be entered into Virtool's file manager.
 FILE_EXTENSION_FILTER = (
     ".fq.gz",
@@ -27,6 +33,59 @@ def join_file_path(settings: dict, file_id: str) -> str:
     return os.path.join(settings["data_path"], "files", file_id)
 
 
+def join_blob_path(settings: dict, content_hash: str) -> str:
+    """
+    Return the path to the content-addressed blob with the hash `content_hash`.
+
+    :param settings: the application settings
+    :param content_hash: the SHA-256 hex digest of the blob content
+    :return: the path for the blob
+
+    """
+    return os.path.join(settings["data_path"], "blobs", content_hash)
+
+
+def link_blob(settings: dict, file_id: str, content_hash: str) -> bool:
+    """
+    Make the file with `file_id` an alias of the blob with `content_hash`.
+
+    Files and blobs are hard links to the same data. If the blob does not exist yet, it is created as a link to the
+    file. Otherwise, the file is replaced with a link to the existing blob and the duplicate data is freed. The file
+    path remains valid throughout so jobs and the file manager are unaffected.
+
+    :param settings: the application settings
+    :param file_id: the id of a file that has been completely written
+    :param content_hash: the SHA-256 hex digest of the file content
+    :return: `True` if the file was deduplicated against an existing blob
+
+    """
+    path = join_file_path(settings, file_id)
+    blob_path = join_blob_path(settings, content_hash)
+
+    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+
+    while True:
+        try:
+            os.link(path, blob_path)
+            return False
+        except FileExistsError:
+            pass
+
+        # Link to a temporary name next to the blob and move the link over the file. The file is never missing, so
+        # the file manager does not mistake the replacement for a deletion.
+        temp_path = f"{blob_path}.{file_id}"
+
+        try:
+            os.link(blob_path, temp_path)
+        except FileNotFoundError:
+            # The blob was removed after the first attempt. Try to create it again.
+            continue
+
+        os.replace(temp_path, path)
+
+        return True
+
+
 def get_event_type(event):
     """
     Get a simplified event type from :package:`aionotify` flags.
@@ -49,3 +108,88 @@ def get_event_type(event):
 
 def has_read_extension(filename):
     return any(filename.endswith(ext) for ext in FILE_EXTENSION_FILTER)
+
+
+def scan_files(path: str) -> Set[str]:
+    """
+    Return the names of the regular files in the directory at `path`.
+
+    :param path: the directory to scan
+    :return: the filenames
+
+    """
+    with os.scandir(path) as it:
+        return {entry.name for entry in it if entry.is_file(follow_symlinks=False)}
+
+
+def remove_files(path: str, filenames: Iterable[str]) -> int:
+    """
+    Remove the files with `filenames` from the directory at `path`. Files that no longer exist are ignored.
+
+    :param path: the directory containing the files
+    :param filenames: the names of the files to remove
+    :return: the number of files removed
+
+    """
+    removed = 0
+
+    for filename in filenames:
+        try:
+            os.remove(os.path.join(path, filename))
+            removed += 1
+        except FileNotFoundError:
+            pass
+
+    return removed
+
+
+def move_file(path: str, target: str) -> dict:
+    """
+    Move the file at `path` to `target`.
+
+    If both paths are on the same device, the file is renamed atomically without copying any data. Otherwise, the file
+    is copied in large blocks while its size and SHA-256 hash are calculated, and the original is removed.
+
+    :param path: the path to the file to move
+    :param target: the path to move the file to
+    :return: the size of the file and its hash, which is `None` if the file was renamed
+
+    """
+    if os.stat(path).st_dev == os.stat(os.path.dirname(target)).st_dev:
+        try:
+            os.rename(path, target)
+
+            return {
+                "size": os.stat(target).st_size,
+                "hash": None
+            }
+        except OSError as err:
+            # Bind mounts can share a device number but still not support renaming between them.
+            if err.errno != errno.EXDEV:
+                raise
+
+    digest = hashlib.sha256()
+
+    size = 0
+
+    buffer = bytearray(COPY_BUFFER_SIZE)
+    view = memoryview(buffer)
+
+    with open(path, "rb") as f_in, open(target, "wb") as f_out:
+        while True:
+            count = f_in.readinto(buffer)
+
+            if not count:
+                break
+
+            digest.update(view[:count])
+            f_out.write(view[:count])
+
+            size += count
+
+    os.remove(path)
+
+    return {
+        "size": size,
+        "hash": digest.hexdigest()
+    }
@@ -8,6 +8,7 @@ import virtool.db.utils
 import virtool.errors
 import virtool.github
 import virtool.hmm.db
+import virtool.hmm.utils
 import virtool.http.routes
 import virtool.processes.db
 import virtool.utils
@@ -158,13 +159,15 @@ async def purge(req):
 
     await virtool.hmm.db.purge(db, req.app["settings"])
 
-    hmm_path = os.path.join(req.app["settings"]["data_path"], "hmm/profiles.hmm")
+    hmm_path = os.path.join(req.app["settings"]["data_path"], "hmm")
 
     try:
-        await req.app["run_in_thread"](virtool.utils.rm, hmm_path)
+        await req.app["run_in_thread"](virtool.utils.rm, os.path.join(hmm_path, "profiles.hmm"))
     except FileNotFoundError:
         pass
 
+    await req.app["run_in_thread"](virtool.hmm.utils.remove_pressed_profiles, hmm_path)
+
     await db.status.find_one_and_update({"_id": "hmm"}, {
         "$set": {
             "installed": None,
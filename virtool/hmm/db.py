@@ -3,6 +3,7 @@ import json
 import logging
 import os
 import shutil
+import subprocess
 
 import pymongo.results
 import aiofiles
@@ -222,6 +223,7 @@ async def install(app, process_id, release, user_id):
         - downloads the official profiles.hmm.gz file
         - decompresses the vthmm.tar.gz file
         - moves the file to the correct data path
+        - presses the profiles with ``hmmpress`` so NuVs jobs can use them directly
         - downloads the official annotations.json.gz file
         - imports the annotations into the database
 
@@ -300,10 +302,14 @@ async def install(app, process_id, release, user_id):
 
         decompressed_path = os.path.join(temp_path, "hmm")
 
-        install_path = os.path.join(app["settings"]["data_path"], "hmm", "profiles.hmm")
+        hmm_path = os.path.join(app["settings"]["data_path"], "hmm")
+
+        install_path = os.path.join(hmm_path, "profiles.hmm")
 
         await app["run_in_thread"](shutil.move, os.path.join(decompressed_path, "profiles.hmm"), install_path)
 
+        await press_profiles(app, hmm_path)
+
         await virtool.processes.db.update(
             db,
             process_id,
@@ -372,6 +378,50 @@ async def purge(db, settings: dict):
     })
 
 
+async def press_profiles(app, hmm_path: str):
+    """
+    Press the installed HMM profiles in `hmm_path` and verify the pressed files against their manifest. The pressed
+    files are removed if pressing or verification fails.
+
+    NuVs jobs press the profiles themselves if there is no manifest for pressed profiles.
+
+    :param app: the application object
+    :param hmm_path: the path to the HMM data directory
+
+    """
+    try:
+        await app["run_in_thread"](virtool.hmm.utils.press_profiles, hmm_path)
+    except (subprocess.CalledProcessError, FileNotFoundError) as err:
+        logger.warning(f"Could not press HMM profiles: {err}")
+        return await app["run_in_thread"](virtool.hmm.utils.remove_pressed_profiles, hmm_path)
+
+    if await app["run_in_thread"](virtool.hmm.utils.check_pressed_profiles, hmm_path):
+        return logger.debug("Pressed HMM profiles")
+
+    logger.warning("Pressed HMM profiles do not match their manifest")
+    await app["run_in_thread"](virtool.hmm.utils.remove_pressed_profiles, hmm_path)
+
+
+async def check_pressed_profiles(app):
+    """
+    Verify the checksums of the pressed HMM profiles when the server starts. The profiles are pressed again if the
+    pressed files are corrupt or stale.
+
+    :param app: the application object
+
+    """
+    hmm_path = os.path.join(app["settings"]["data_path"], "hmm")
+
+    if await app["run_in_thread"](virtool.hmm.utils.read_pressed_manifest, hmm_path) is None:
+        return
+
+    if await app["run_in_thread"](virtool.hmm.utils.check_pressed_profiles, hmm_path):
+        return logger.debug("Verified pressed HMM profiles")
+
+    logger.warning("Pressed HMM profiles do not match their manifest. Pressing again.")
+    await press_profiles(app, hmm_path)
+
+
 async def refresh(app):
     try:
         logging.debug("Started HMM refresher")
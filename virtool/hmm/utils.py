@@ -1,5 +1,17 @@
+import json
+import os
+import subprocess
+from typing import Optional
+
 import semver
 import virtool.github
+import virtool.utils
+
+#: The file extensions of the binary files written by ``hmmpress``.
+PRESSED_SUFFIXES = ("h3f", "h3i", "h3m", "h3p")
+
+#: The name of the manifest file describing the pressed HMM profiles.
+PRESSED_MANIFEST = "profiles.json"
 
 
 def format_hmm_release(updated, release, installed):
@@ -18,3 +30,116 @@ def format_hmm_release(updated, release, installed):
     )
 
     return formatted
+
+
+def read_pressed_manifest(hmm_path: str) -> Optional[dict]:
+    """
+    Read the manifest written by :func:`.press_profiles` in `hmm_path`. Return `None` if it does not exist or can't be
+    parsed.
+
+    :param hmm_path: the path to the HMM data directory
+    :return: the manifest or `None`
+
+    """
+    try:
+        with open(os.path.join(hmm_path, PRESSED_MANIFEST), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def get_pressed_profiles_path(hmm_path: str) -> Optional[str]:
+    """
+    Return the path to the installed ``profiles.hmm`` file if it has been pressed at install time and the sizes of all
+    of the pressed files match the manifest written by :func:`.press_profiles`. Return `None` otherwise.
+
+    Only the sizes are checked so the check is cheap enough to run for every job. Checksums are verified by
+    :func:`.check_pressed_profiles` at install time and when the server starts.
+
+    :param hmm_path: the path to the HMM data directory
+    :return: the path to the pressed profiles or `None`
+
+    """
+    manifest = read_pressed_manifest(hmm_path)
+
+    try:
+        for filename, entry in manifest["files"].items():
+            if os.path.getsize(os.path.join(hmm_path, filename)) != entry["size"]:
+                return None
+    except (FileNotFoundError, KeyError, TypeError):
+        return None
+
+    return os.path.join(hmm_path, "profiles.hmm")
+
+
+def check_pressed_profiles(hmm_path: str) -> bool:
+    """
+    Check that the sizes and checksums of all of the pressed files in `hmm_path` match the manifest written by
+    :func:`.press_profiles`.
+
+    :param hmm_path: the path to the HMM data directory
+    :return: a boolean indicating if the pressed profiles can be used
+
+    """
+    if get_pressed_profiles_path(hmm_path) is None:
+        return False
+
+    manifest = read_pressed_manifest(hmm_path)
+
+    for filename, entry in manifest["files"].items():
+        if virtool.utils.calculate_checksum(os.path.join(hmm_path, filename)) != entry["checksum"]:
+            return False
+
+    return True
+
+
+def press_profiles(hmm_path: str) -> dict:
+    """
+    Run ``hmmpress`` on the ``profiles.hmm`` file in `hmm_path` and write a manifest containing the sizes and
+    checksums of the profiles and the pressed files. The manifest is only written if pressing succeeds.
+
+    The pressed files are made read-only so they can be shared safely by all NuVs jobs.
+
+    :param hmm_path: the path to the HMM data directory
+    :return: the manifest
+
+    """
+    profiles_path = os.path.join(hmm_path, "profiles.hmm")
+
+    remove_pressed_profiles(hmm_path)
+
+    subprocess.run(["hmmpress", profiles_path], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+    files = dict()
+
+    for filename in ["profiles.hmm"] + [f"profiles.hmm.{suffix}" for suffix in PRESSED_SUFFIXES]:
+        path = os.path.join(hmm_path, filename)
+        os.chmod(path, 0o444)
+
+        files[filename] = {
+            "size": os.path.getsize(path),
+            "checksum": virtool.utils.calculate_checksum(path)
+        }
+
+    manifest = {
+        "files": files
+    }
+
+    with open(os.path.join(hmm_path, PRESSED_MANIFEST), "w") as f:
+        json.dump(manifest, f)
+
+    return manifest
+
+
+def remove_pressed_profiles(hmm_path: str):
+    """
+    Remove the pressed HMM files and their manifest from `hmm_path`. Files that do not exist are ignored.
+
+    :param hmm_path: the path to the HMM data directory
+
+    """
+    for filename in [PRESSED_MANIFEST] + [f"profiles.hmm.{suffix}" for suffix in PRESSED_SUFFIXES]:
+        try:
+            os.remove(os.path.join(hmm_path, filename))
+        except FileNotFoundError:
+            pass
@@ -2,12 +2,17 @@ import aiohttp.web
 
 import virtool.api.json
 
+#: The number of bytes written to the client at a time when streaming a JSON response.
+CHUNK_SIZE = 64 * 1024
+
 
 @aiohttp.web.middleware
 async def middleware(req, handler):
     """
     Formats JSON if 'application/json' content type was not in request 'Accept' header.
 
+    Large responses are encoded in a thread so the event loop isn't blocked and are streamed to the client in chunks.
+
     """
     accepts_json = False
 
@@ -23,9 +28,41 @@ async def middleware(req, handler):
 
         resp.headers["Content-Type"] = "application/json; charset=utf=8"
 
+        if virtool.api.json.is_large(json_data):
+            body = await req.app["run_in_thread"](virtool.api.json.encode, json_data, not accepts_json)
+            return await stream_body(req, resp, body)
+
         if accepts_json:
-            resp.body = virtool.api.json.dumps(json_data)
+            resp.body = virtool.api.json.compact_dumps(json_data)
         else:
             resp.body = virtool.api.json.pretty_dumps(json_data)
 
     return resp
+
+
+async def stream_body(req: aiohttp.web.Request, resp: aiohttp.web.Response, body: bytes) -> aiohttp.web.StreamResponse:
+    """
+    Send `body` to the client in chunks using the status, headers, and cookies of `resp`. Each chunk is sent once the
+    previous one has been flushed, so a slow client doesn't cause the whole body to be buffered again.
+
+    :param req: the request
+    :param resp: the response the body belongs to
+    :param body: the response body
+    :return: the prepared stream response
+
+    """
+    stream = aiohttp.web.StreamResponse(status=resp.status, reason=resp.reason, headers=resp.headers)
+
+    stream.cookies.update(resp.cookies)
+    stream.content_length = len(body)
+
+    await stream.prepare(req)
+
+    view = memoryview(body)
+
+    for offset in range(0, len(body), CHUNK_SIZE):
+        await stream.write(view[offset:offset + CHUNK_SIZE])
+
+    await stream.write_eof()
+
+    return stream
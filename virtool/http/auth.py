@@ -103,13 +103,18 @@ async def authorize_with_api_key(req, handler):
     except virtool.errors.AuthError:
         return bad_request("Malformed Authorization header")
 
-    document = await db.keys.find_one({
-        "_id": virtool.users.utils.hash_api_key(key),
-        "user.id": user_id
-    }, AUTHORIZATION_PROJECTION)
+    document = db.auth_cache.get_key(user_id, key)
 
-    if not document:
-        return bad_request("Invalid Authorization header")
+    if document is None:
+        document = await db.keys.find_one({
+            "_id": virtool.users.utils.hash_api_key(key),
+            "user.id": user_id
+        }, AUTHORIZATION_PROJECTION)
+
+        if not document:
+            return bad_request("Invalid Authorization header")
+
+        db.auth_cache.set_key(user_id, key, document)
 
     req["client"].authorize(document, True)
 
@@ -144,7 +149,7 @@ async def middleware(req, handler):
 
     resp = await handler(req)
 
-    if req.path != "/api/account/reset":
+    if req.path != "/api/account/reset" and "reset_code" in session:
         await virtool.users.sessions.clear_reset_code(db, session["_id"])
 
     virtool.http.utils.set_session_id_cookie(resp, req["client"].session_id)
@@ -62,7 +62,8 @@ def protect(route_decorator, admin, permission, public, schema):
 
             content_type = req.headers.get("Content-type", "")
 
-            if "multipart/form-data" not in content_type:
+            # Multipart and binary request bodies are streamed by the handler.
+            if "multipart/form-data" not in content_type and "application/octet-stream" not in content_type:
                 try:
                     data = await req.json()
                 except (json.decoder.JSONDecodeError, UnicodeDecodeError):
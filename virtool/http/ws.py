@@ -1,3 +1,4 @@
+import json
 import logging
 
 from aiohttp import web
@@ -18,11 +19,18 @@ async def root(req):
 
     connection = virtool.dispatcher.Connection(ws, req["client"])
 
-    req.app["dispatcher"].add_connection(connection)
+    # Reconnecting clients pass the sequence number of the last message they received to get the messages they missed.
+    try:
+        sequence = int(req.query["sequence"])
+    except (KeyError, ValueError):
+        sequence = None
+
+    req.app["dispatcher"].add_connection(connection, sequence)
 
     try:
-        async for _ in ws:
-            pass
+        async for msg in ws:
+            if msg.type == web.WSMsgType.TEXT:
+                handle_message(req.app["dispatcher"], connection, msg.data)
     except RuntimeError as err:
         if "TCPTransport" not in str(err):
             raise
@@ -31,4 +39,41 @@ async def root(req):
 
     req.app["dispatcher"].remove_connection(connection)
 
+    # Stops the connection's writer task.
+    await connection.close()
+
     return ws
+
+
+def handle_message(dispatcher: virtool.dispatcher.Dispatcher, connection: virtool.dispatcher.Connection, text: str):
+    """
+    Handle a message sent by a WebSocket client. Clients manage their subscriptions with messages like:
+
+    .. code-block:: json
+
+        {"interface": "samples", "operation": "subscribe", "data": ["foo", "bar"]}
+
+    Omitting ``data`` subscribes to, or unsubscribes from, the whole interface. Invalid messages are logged and
+    ignored.
+
+    :param dispatcher: the application dispatcher
+    :param connection: the connection the message was received on
+    :param text: the message text
+
+    """
+    try:
+        message = json.loads(text)
+
+        interface = message["interface"]
+        operation = message["operation"]
+        ids = message.get("data")
+
+        if operation not in virtool.dispatcher.SUBSCRIPTION_OPERATIONS:
+            raise ValueError(f"Unknown operation: {operation}")
+
+        if ids is not None and (not isinstance(ids, list) or not all(isinstance(i, str) for i in ids)):
+            raise ValueError("Data must be a list of ids")
+
+        getattr(dispatcher, operation)(connection, interface, ids)
+    except (KeyError, TypeError, ValueError) as err:
+        logger.debug(f"Ignored invalid WebSocket message: {err}")
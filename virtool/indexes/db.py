@@ -1,6 +1,5 @@
-import asyncio
 import pymongo
-from typing import Union
+from typing import List, Union
 
 import virtool.api.utils
 import virtool.history.db
@@ -30,22 +29,41 @@ async def processor(db, document):
     :return: the processed document
 
     """
-    document = virtool.utils.base_processor(document)
+    processed = await batch_processor(db, [document])
+    return processed[0]
 
-    query = {
-        "index.id": document["id"]
-    }
 
-    change_count, otu_ids = await asyncio.gather(
-        db.history.count_documents(query),
-        db.history.distinct("otu.id", query)
-    )
+async def batch_processor(db, documents: List[dict]) -> List[dict]:
+    """
+    A batch processor for index documents. Adds computed data about the indexes using a single aggregation on the
+    history collection.
 
-    return {
-        **document,
-        "change_count": change_count,
-        "modified_otu_count": len(otu_ids)
-    }
+    :param db: the application database client
+    :param documents: the documents to be processed
+    :return: the processed documents
+
+    """
+    documents = [virtool.utils.base_processor(document) for document in documents]
+
+    counts = dict()
+
+    pipeline = [
+        {"$match": {"index.id": {"$in": [document["id"] for document in documents]}}},
+        {"$group": {"_id": "$index.id", "change_count": {"$sum": 1}, "otu_ids": {"$addToSet": "$otu.id"}}}
+    ]
+
+    async for result in db.history.aggregate(pipeline):
+        counts[result["_id"]] = {
+            "change_count": result["change_count"],
+            "modified_otu_count": len(result["otu_ids"])
+        }
+
+    return [
+        {
+            **document,
+            **counts.get(document["id"], {"change_count": 0, "modified_otu_count": 0})
+        } for document in documents
+    ]
 
 
 async def find(db, req_query, ref_id=None):
@@ -66,8 +84,6 @@ async def find(db, req_query, ref_id=None):
         sort="version"
     )
 
-    data["documents"] = [await processor(db, d) for d in data["documents"]]
-
     data.update(await get_unbuilt_stats(db, ref_id))
 
     return data
@@ -10,6 +10,7 @@ import virtool.db
 import virtool.db.sync
 import virtool.jobs.fastqc
 import virtool.jobs.job
+import virtool.jobs.qc
 import virtool.jobs.utils
 import virtool.samples.db
 import virtool.samples.utils
@@ -236,23 +237,26 @@ class Job(virtool.jobs.job.Job):
         return local_paths
 
     def _run_cache_qc(self, cache_id, temp_path):
-        fastqc_path = os.path.join(temp_path, "fastqc")
-
-        os.makedirs(fastqc_path)
-
         read_paths = [os.path.join(temp_path, "reads_1.fq.gz")]
 
         if self.params["paired"]:
             read_paths.append(os.path.join(temp_path, "reads_2.fq.gz"))
 
-        virtool.jobs.fastqc.run_fastqc(
-            self.run_subprocess,
-            self.proc,
-            read_paths,
-            fastqc_path
-        )
+        if virtool.jobs.qc.should_use_native(self.settings):
+            qc = virtool.jobs.qc.calculate_qc(read_paths, self.proc)
+        else:
+            fastqc_path = os.path.join(temp_path, "fastqc")
+
+            os.makedirs(fastqc_path)
+
+            virtool.jobs.fastqc.run_fastqc(
+                self.run_subprocess,
+                self.proc,
+                read_paths,
+                fastqc_path
+            )
 
-        qc = virtool.jobs.fastqc.parse_fastqc(fastqc_path, self.params["sample_path"])
+            qc = virtool.jobs.fastqc.parse_fastqc(fastqc_path, self.params["sample_path"])
 
         self.db.caches.update_one({"_id": cache_id}, {
             "$set": {
@@ -1,11 +1,6 @@
+import hashlib
 import os
-import shutil
 import sys
-from collections import defaultdict
-
-from Bio import SeqIO
-from Bio.SeqRecord import SeqRecord
-
 
 import virtool.jobs.analysis
 import virtool.utils
@@ -13,6 +8,9 @@ import virtool.utils
 AODP_MAX_HOMOLOGY = 0
 AODP_OLIGO_SIZE = 8
 
+#: The number of unique reads to buffer before writing them to the deduplicated FASTA file.
+FASTA_BLOCK_SIZE = 10000
+
 
 class Job(virtool.jobs.analysis.Job):
 
@@ -21,7 +19,6 @@ class Job(virtool.jobs.analysis.Job):
 
         self._stage_list = [
             self.make_analysis_dir,
-            self.prepare_index,
             self.prepare_reads,
             self.join_reads,
             self.deduplicate_reads,
@@ -34,9 +31,10 @@ class Job(virtool.jobs.analysis.Job):
     def check_db(self):
         super().check_db()
 
-        self.params["local_index_path"] = os.path.join(self.params["analysis_path"], "reference.fa")
         self.params["aodp_output_path"] = os.path.join(self.params["analysis_path"], "aodp.out")
 
+        # The index FASTA is shared by all analyses that use the index. AODP only reads it, so it is used in place
+        # rather than copied into the analysis directory.
         self.params["index_path"] = os.path.join(
             self.settings["data_path"],
             "references",
@@ -45,12 +43,6 @@ class Job(virtool.jobs.analysis.Job):
             "ref.fa"
         )
 
-    def prepare_index(self):
-        shutil.copy(
-            self.params["index_path"],
-            self.params["local_index_path"]
-        )
-
     def join_reads(self):
         max_overlap = round(0.65 * self.params["sample_read_length"])
         output_prefix = os.path.join(self.params["analysis_path"], "flash")
@@ -80,23 +72,17 @@ class Job(virtool.jobs.analysis.Job):
         Remove duplicate reads. Store the counts for unique reads.
 
         """
-        counts = defaultdict(int)
-
         joined_path = os.path.join(self.params["analysis_path"], "flash.extendedFrags.fastq")
         output_path = os.path.join(self.params["analysis_path"], "unique.fa")
 
-        with open(output_path, "w") as f:
-            for record in parse_joined_fastq(joined_path, counts):
-                SeqIO.write(record, f, format="fasta")
-
-        self.intermediate["sequence_counts"] = counts
+        self.intermediate["sequence_counts"] = deduplicate_joined_fastq(joined_path, output_path)
 
     def aodp(self):
         cwd = self.params["analysis_path"]
 
         aodp_output_path = self.params["aodp_output_path"]
         base_name = os.path.join(self.params["analysis_path"], "aodp")
-        local_index_path = self.params["local_index_path"]
+        index_path = self.params["index_path"]
         target_path = os.path.join(self.params["analysis_path"], "unique.fa")
 
         if cwd[0] != "/":
@@ -104,7 +90,7 @@ class Job(virtool.jobs.analysis.Job):
 
             aodp_output_path = os.path.join(sys.path[0], aodp_output_path)
             base_name = os.path.join(sys.path[0], base_name)
-            local_index_path = os.path.join(sys.path[0], self.params["local_index_path"])
+            index_path = os.path.join(sys.path[0], index_path)
             target_path = os.path.join(sys.path[0], target_path)
 
         command = [
@@ -115,7 +101,7 @@ class Job(virtool.jobs.analysis.Job):
             f"--match={target_path}",
             f"--match-output={aodp_output_path}",
             f"--max-homolo={AODP_MAX_HOMOLOGY}",
-            local_index_path
+            index_path
         ]
 
         self.run_subprocess(command, cwd=cwd)
@@ -179,19 +165,43 @@ class Job(virtool.jobs.analysis.Job):
         self.dispatch("samples", "update", [sample_id])
 
 
-def parse_joined_fastq(path: str, counts: defaultdict):
-    sequence_id_map = dict()
+def deduplicate_joined_fastq(path: str, output_path: str) -> dict:
+    """
+    Stream the four-line FASTQ file at `path` and write each unique sequence to the FASTA file at `output_path`.
+
+    Sequences are identified by a compact digest rather than kept in memory. Unique reads are named ``read_1``,
+    ``read_2``, and so on in the order they are first seen and are written in blocks of :data:`FASTA_BLOCK_SIZE`.
+
+    :param path: the path to the joined FASTQ file
+    :param output_path: the path to write the deduplicated FASTA file to
+    :return: the number of copies of each unique read keyed by read id
+
+    """
+    indexes = dict()
+    counts = list()
+    block = list()
+
+    with open(path, "rb") as f, open(output_path, "wb") as output:
+        for _, sequence, _, _ in zip(f, f, f, f):
+            sequence = sequence.rstrip()
+
+            digest = hashlib.blake2b(sequence, digest_size=16).digest()
+
+            try:
+                counts[indexes[digest]] += 1
+            except KeyError:
+                indexes[digest] = len(counts)
+                counts.append(1)
+
+                block.append(b">read_%d\n%s\n" % (len(counts), sequence))
 
-    for record in SeqIO.parse(path, format="fastq"):
-        try:
-            sequence_id = sequence_id_map[str(record.seq)]
-        except KeyError:
-            sequence_id = f"read_{len(sequence_id_map) + 1}"
-            sequence_id_map[str(record.seq)] = sequence_id
+                if len(block) == FASTA_BLOCK_SIZE:
+                    output.write(b"".join(block))
+                    block = list()
 
-            yield SeqRecord(record.seq, id=sequence_id)
+        output.write(b"".join(block))
 
-        counts[sequence_id] += 1
+    return {f"read_{i + 1}": count for i, count in enumerate(counts)}
 
 
 def parse_flash_hist(path):
@@ -30,11 +30,11 @@ async def find(req):
         db.jobs,
         db_query,
         req.query,
+        # Jobs are created with a single status entry, so the first status timestamp is the creation time.
+        sort=[("status.0.timestamp", 1)],
         projection=virtool.jobs.db.PROJECTION
     )
 
-    data["documents"].sort(key=lambda d: d["created_at"])
-
     return json_response(data)
 
 
@@ -116,37 +116,6 @@ class Job(virtool.jobs.job.Job):
         Replaces the old index with the newly generated one.
 
         """
-        # Tell the client the index is ready to be used and to no longer show it as building.
-        self.db.indexes.find_one_and_update({"_id": self.params["index_id"]}, {
-            "$set": {
-                "ready": True
-            }
-        })
-
-        self.dispatch("indexes", "update", [self.params["index_id"]])
-
-        active_indexes = virtool.db.sync.get_active_index_ids(self.db, self.params["ref_id"])
-
-        remove_unused_index_files(self.params["reference_path"], active_indexes)
-
-        query = {
-            "_id": {
-                "$not": {
-                    "$in": active_indexes
-                }
-            }
-        }
-
-        self.db.indexes.update_many(query, {
-            "$set": {
-                "has_files": False
-            }
-        })
-
-        id_list = self.db.indexes.distinct("_id", query)
-
-        self.dispatch("indexes", "update", id_list)
-
         # Find OTUs with changes.
         pipeline = [
             {"$project": {
@@ -177,6 +146,39 @@ class Job(virtool.jobs.job.Job):
                 }
             })
 
+        # Tell the client the index is ready to be used and to no longer show it as building. This must happen after
+        # the OTUs are updated. Reference exports are built from the last indexed OTU versions and cached under the id
+        # of the latest ready index.
+        self.db.indexes.find_one_and_update({"_id": self.params["index_id"]}, {
+            "$set": {
+                "ready": True
+            }
+        })
+
+        self.dispatch("indexes", "update", [self.params["index_id"]])
+
+        active_indexes = virtool.db.sync.get_active_index_ids(self.db, self.params["ref_id"])
+
+        remove_unused_index_files(self.params["reference_path"], active_indexes)
+
+        query = {
+            "_id": {
+                "$not": {
+                    "$in": active_indexes
+                }
+            }
+        }
+
+        self.db.indexes.update_many(query, {
+            "$set": {
+                "has_files": False
+            }
+        })
+
+        id_list = self.db.indexes.distinct("_id", query)
+
+        self.dispatch("indexes", "update", id_list)
+
     def cleanup(self):
         """
         Cleanup if the job fails.
@@ -5,6 +5,7 @@ import virtool.files.db
 import virtool.samples.db
 import virtool.jobs.fastqc
 import virtool.jobs.job
+import virtool.jobs.qc
 import virtool.jobs.utils
 import virtool.samples.utils
 import virtool.utils
@@ -34,13 +35,15 @@ class Job(virtool.jobs.job.Job):
     def make_sample_dir(self):
         """
         Make a data directory for the sample and a subdirectory for analyses. Read files, quality data from FastQC, and
-        analysis data will be stored here.
+        analysis data will be stored here. The FastQC subdirectory is not made if the native quality engine is enabled.
 
         """
         try:
             os.makedirs(self.params["sample_path"])
             os.makedirs(self.params["analysis_path"])
-            os.makedirs(self.params["fastqc_path"])
+
+            if not virtool.jobs.qc.should_use_native(self.settings):
+                os.makedirs(self.params["fastqc_path"])
         except OSError:
             # If the path already exists, remove it and try again.
             shutil.rmtree(self.params["sample_path"])
@@ -50,17 +53,34 @@ class Job(virtool.jobs.job.Job):
         """
         Copy the files from the files directory to the nascent sample directory.
 
+        If the native quality engine is enabled, the files are compressed, counted, checksummed, and quality checked in
+        a single pass.
+
         """
         files = self.params["files"]
         sample_id = self.params["sample_id"]
 
         paths = [os.path.join(self.settings["data_path"], "files", file["id"]) for file in files]
 
-        sizes = virtool.jobs.utils.copy_files_to_sample(
-            paths,
-            self.params["sample_path"],
-            self.proc
-        )
+        checksums = None
+
+        if virtool.jobs.qc.should_use_native(self.settings):
+            results = virtool.jobs.utils.ingest_files_to_sample(
+                paths,
+                self.params["sample_path"],
+                self.proc
+            )
+
+            sizes = [result["size"] for result in results]
+            checksums = [result["checksum"] for result in results]
+
+            self.intermediate["qc"] = virtool.jobs.qc.combine_qc([result["qc"] for result in results])
+        else:
+            sizes = virtool.jobs.utils.copy_files_to_sample(
+                paths,
+                self.params["sample_path"],
+                self.proc
+            )
 
         raw = list()
 
@@ -75,6 +95,9 @@ class Job(virtool.jobs.job.Job):
                 "raw": True
             })
 
+            if checksums:
+                raw[index]["checksum"] = checksums[index]
+
         self.db.samples.update_one({"_id": sample_id}, {
             "$set": {
                 "files": raw
@@ -85,7 +108,13 @@ class Job(virtool.jobs.job.Job):
         """
         Runs FastQC on the renamed, trimmed read files.
 
+        Nothing is done if the quality data was already calculated by the native quality engine in
+        :meth:`.copy_files`.
+
         """
+        if "qc" in self.intermediate:
+            return
+
         read_paths = virtool.samples.utils.join_read_paths(self.params["sample_path"], self.params["paired"])
 
         virtool.jobs.fastqc.run_fastqc(
@@ -101,7 +130,10 @@ class Job(virtool.jobs.job.Job):
         in the main run() method
 
         """
-        qc = virtool.jobs.fastqc.parse_fastqc(self.params["fastqc_path"], self.params["sample_path"])
+        qc = self.intermediate.get("qc")
+
+        if qc is None:
+            qc = virtool.jobs.fastqc.parse_fastqc(self.params["fastqc_path"], self.params["sample_path"])
 
         self.db.samples.update_one({"_id": self.params["sample_id"]}, {
             "$set": {
@@ -115,9 +147,15 @@ class Job(virtool.jobs.job.Job):
     def clean_watch(self):
         """ Remove the original read files from the files directory """
         file_ids = [f["id"] for f in self.params["files"]]
+
+        hashes = [d["hash"] for d in self.db.files.find({"_id": {"$in": file_ids}, "hash": {"$exists": True}}, ["hash"])]
+
         self.db.files.delete_many({"_id": {"$in": file_ids}})
         self.dispatch("files", "delete", self.params["files"])
 
+        for content_hash in hashes:
+            virtool.jobs.utils.release_blob(self.db, self.settings, content_hash)
+
     def cleanup(self):
         for file_id in self.params["files"]:
             self.db.files.update_many({"_id": file_id}, {
@@ -1,3 +1,4 @@
+import concurrent.futures
 import os
 
 import pymongo
@@ -21,8 +22,8 @@ class Job(virtool.jobs.job.Job):
         self._stage_list = [
             self.make_subtraction_dir,
             self.unpack,
-            self.set_stats,
             self.bowtie_build,
+            self.set_stats,
             self.compress
         ]
 
@@ -66,37 +67,63 @@ class Job(virtool.jobs.job.Job):
 
     def unpack(self):
         """
-        Unpack the FASTA file if it is gzipped.
+        Unpack the FASTA file if it is gzipped and calculate a hash of its content.
+
+        If a ready subtraction was created from identical FASTA content, it is recorded so its index can be reused in
+        :meth:`.bowtie_build`.
 
         """
-        virtool.jobs.utils.copy_or_decompress(
+        content_hash = virtool.subtractions.utils.unpack_fasta(
             self.params["file_path"],
-            self.params["fasta_path"],
-            self.proc
+            self.params["fasta_path"]
         )
 
-    def set_stats(self):
-        """
-        Generate some stats for the FASTA file associated with this job. These numbers include nucleotide distribution,
-        length distribution, and sequence count.
-
-        """
-        gc, count = virtool.subtractions.utils.calculate_fasta_gc(self.params["fasta_path"])
-
-        self.db.subtraction.find_one_and_update({"_id": self.params["subtraction_id"]}, {
-            "$set": {
-                "gc": gc,
-                "count": count
-            }
-        }, return_document=pymongo.ReturnDocument.AFTER, projection=virtool.subtractions.db.PROJECTION)
+        self.intermediate["hash"] = content_hash
 
-        self.dispatch("subtraction", "update", [self.params["subtraction_id"]])
+        self.intermediate["existing"] = self.db.subtraction.find_one({
+            "_id": {
+                "$ne": self.params["subtraction_id"]
+            },
+            "hash": content_hash,
+            "deleted": False,
+            "ready": True
+        }, ["_id"])
 
     def bowtie_build(self):
         """
         Call *bowtie2-build* using :meth:`~.Job.run_process` to build a Bowtie2 index for the host.
 
+        The build is skipped if the index of an existing subtraction with identical FASTA content can be linked instead.
+
+        The FASTA statistics are calculated from the uploaded file in a separate thread while the index is built. They
+        are stored by :meth:`.set_stats`.
+
         """
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+        self.intermediate["stats"] = executor.submit(
+            virtool.subtractions.utils.calculate_fasta_stats,
+            self.params["file_path"]
+        )
+
+        executor.shutdown(wait=False)
+
+        existing = self.intermediate["existing"]
+
+        if existing:
+            existing_index_path = virtool.subtractions.utils.join_subtraction_index_path(
+                self.settings,
+                existing["_id"]
+            )
+
+            try:
+                virtool.subtractions.utils.link_subtraction_index(existing_index_path, self.params["index_path"])
+                self.add_log(f"Linked index from existing subtraction {existing['_id']}")
+                return
+            except OSError:
+                # The existing subtraction may have been deleted since it was found.
+                self.add_log(f"Could not link index from existing subtraction {existing['_id']}")
+
         command = [
             "bowtie2-build",
             "-f",
@@ -107,11 +134,21 @@ class Job(virtool.jobs.job.Job):
 
         self.run_subprocess(command)
 
+    def set_stats(self):
+        """
+        Store the stats calculated for the FASTA file associated with this job and mark the subtraction as ready. These
+        numbers include nucleotide distribution, length distribution, and sequence count.
+
+        """
+        stats = self.intermediate["stats"].result()
+
         self.db.subtraction.find_one_and_update({"_id": self.params["subtraction_id"]}, {
             "$set": {
+                **stats,
+                "hash": self.intermediate["hash"],
                 "ready": True
             }
-        })
+        }, return_document=pymongo.ReturnDocument.AFTER, projection=virtool.subtractions.db.PROJECTION)
 
         self.dispatch("subtraction", "update", [self.params["subtraction_id"]])
 
@@ -129,11 +129,10 @@ class IntegratedManager:
 
         collection = getattr(self.db, interface)
 
-        projection = self.db.get_projection(interface)
-        apply_processor = self.db.get_processor(interface)
+        documents = await collection.find({"_id": {"$in": id_list}}, projection=collection.projection).to_list(None)
 
-        async for document in collection.find({"_id": {"$in": id_list}}, projection=projection):
-            await self._dispatch(interface, operation, await apply_processor(document))
+        for processed in await collection.apply_processors(documents):
+            await self._dispatch(interface, operation, processed)
 
     async def cancel(self, job_id):
         """
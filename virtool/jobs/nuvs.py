@@ -6,17 +6,85 @@ import collections
 import os
 import shlex
 import shutil
+import subprocess
 import tempfile
 
 import virtool.bio
 import virtool.db.sync
+import virtool.hmm.utils
 import virtool.jobs.analysis
+import virtool.jobs.job
+
+#: The number of worker threads given to each ``hmmscan`` process when ORF searches are sharded.
+HMMSCAN_SHARD_CPU = 1
 
 
 class SubprocessError(Exception):
     pass
 
 
+def get_hmmscan_shard_count(proc: int, orf_count: int) -> int:
+    """
+    Get the number of ``hmmscan`` processes to run concurrently for a job with `proc` cores and `orf_count` ORFs.
+
+    Each sharded process runs :const:`HMMSCAN_SHARD_CPU` worker threads and a master thread. A return value of ``1``
+    means a single unsharded ``hmmscan`` process should be used.
+
+    :param proc: the core limit for the job
+    :param orf_count: the number of ORFs that will be searched
+    :return: the number of shards
+
+    """
+    return max(1, min(proc // (HMMSCAN_SHARD_CPU + 1), orf_count))
+
+
+def split_orfs(orfs: list, count: int) -> list:
+    """
+    Split a list of ORF FASTA records into at most `count` contiguous chunks containing a similar number of residues.
+
+    Chunks are contiguous so that concatenating the ``hmmscan`` results for the chunks in order gives the same output
+    as a single ``hmmscan`` run on all of the records.
+
+    :param orfs: a list of ``(header, sequence)`` tuples
+    :param count: the maximum number of chunks to create
+    :return: a list of lists of records
+
+    """
+    total = sum(len(sequence) for _, sequence in orfs)
+
+    chunks = [[]]
+
+    residues = 0
+
+    for record in orfs:
+        if chunks[-1] and residues >= total * len(chunks) / count:
+            chunks.append([])
+
+        chunks[-1].append(record)
+        residues += len(record[1])
+
+    return chunks
+
+
+def get_annotation_ids_by_cluster(db) -> dict:
+    """
+    Get a :class:`dict` mapping vFam cluster numbers to HMM annotation ids using a single query.
+
+    If more than one annotation exists for a cluster, the first one returned by the database is used. This matches the
+    behaviour of calling ``find_one`` for the cluster.
+
+    :param db: the job database client
+    :return: a map of cluster numbers to annotation ids
+
+    """
+    annotation_ids = dict()
+
+    for document in db.hmm.find({}, ["_id", "cluster"]):
+        annotation_ids.setdefault(document["cluster"], document["_id"])
+
+    return annotation_ids
+
+
 class Job(virtool.jobs.analysis.Job):
     """
     A job class for NuVs, a custom workflow used for identifying potential viral sequences from sample libraries. The
@@ -51,6 +119,9 @@ class Job(virtool.jobs.analysis.Job):
         # Contigs that contain at least one acceptable ORF.
         self.results = list()
 
+        # The running processes when ``hmmscan`` is sharded. Killed if the job is cancelled or fails.
+        self._shard_processes = list()
+
     def eliminate_otus(self):
         """
         Maps reads to the main otu reference using ``bowtie2``. Bowtie2 is set to use the search parameter
@@ -209,24 +280,41 @@ class Job(virtool.jobs.analysis.Job):
                     f.write(f">sequence_{entry['index']}.{orf['index']}\n{orf['pro']}\n")
 
     def prepare_hmm(self):
+        """
+        Use the HMM profiles pressed at install time if they are available. The pressed files are shared read-only by
+        all NuVs jobs.
+
+        Fall back to copying ``profiles.hmm`` into the analysis directory and pressing it there if the installed
+        profiles have not been pressed.
+
+        """
+        hmm_path = os.path.join(self.settings["data_path"], "hmm")
 
-        shutil.copy(os.path.join(self.settings["data_path"], "hmm", "profiles.hmm"), self.params["analysis_path"])
+        profiles_path = virtool.hmm.utils.get_pressed_profiles_path(hmm_path)
 
-        hmm_path = os.path.join(self.params["analysis_path"], "profiles.hmm")
+        if profiles_path:
+            self.intermediate["profiles_path"] = profiles_path
+            return
+
+        shutil.copy(os.path.join(hmm_path, "profiles.hmm"), self.params["analysis_path"])
+
+        profiles_path = os.path.join(self.params["analysis_path"], "profiles.hmm")
 
         command = [
             "hmmpress",
-            hmm_path
+            profiles_path
         ]
 
         self.run_subprocess(command)
 
-        os.remove(hmm_path)
+        os.remove(profiles_path)
+
+        self.intermediate["profiles_path"] = profiles_path
 
     def vfam(self):
         """
         Searches for viral motifs in ORF translations generated by :meth:`.process_fasta`. Calls ``hmmscan`` and
-        searches against ``candidates.fa`` using the profile HMMs in ``data_path/hmm/vFam.hmm``.
+        searches against ``candidates.fa`` using the pressed profile HMMs found by :meth:`.prepare_hmm`.
 
         Saves two files:
 
@@ -238,19 +326,36 @@ class Job(virtool.jobs.analysis.Job):
         # The path to output the hmmer results to.
         tsv_path = os.path.join(self.params["analysis_path"], "hmm.tsv")
 
-        command = [
-            "hmmscan",
-            "--tblout", tsv_path,
-            "--noali",
-            "--cpu", str(self.proc - 1),
-            os.path.join(self.params["analysis_path"], "profiles.hmm"),
-            os.path.join(self.params["analysis_path"], "orfs.fa")
-        ]
+        profiles_path = self.intermediate.get(
+            "profiles_path",
+            os.path.join(self.params["analysis_path"], "profiles.hmm")
+        )
 
-        self.run_subprocess(command)
+        orfs_path = os.path.join(self.params["analysis_path"], "orfs.fa")
+
+        orfs = virtool.bio.read_fasta(orfs_path)
+
+        shard_count = get_hmmscan_shard_count(self.proc, len(orfs))
+
+        if shard_count > 1:
+            self.run_sharded_hmmscan(profiles_path, orfs, tsv_path, shard_count)
+        else:
+            command = [
+                "hmmscan",
+                "--tblout", tsv_path,
+                "--noali",
+                "--cpu", str(self.proc - 1),
+                profiles_path,
+                orfs_path
+            ]
+
+            self.run_subprocess(command)
 
         hits = collections.defaultdict(lambda: collections.defaultdict(list))
 
+        # Resolve every vFam cluster to an HMM annotation id up front so parsing needs no further database access.
+        annotation_ids = get_annotation_ids_by_cluster(self.db)
+
         # Go through the raw HMMER results and annotate the HMM hits with data from the database.
         with open(tsv_path, "r") as hmm_file:
             for line in hmm_file:
@@ -258,7 +363,7 @@ class Job(virtool.jobs.analysis.Job):
                     line = line.split()
 
                     cluster_id = int(line[0].split("_")[1])
-                    annotation_id = (self.db.hmm.find_one({"cluster": int(cluster_id)}, {"_id": True}))["_id"]
+                    annotation_id = annotation_ids[cluster_id]
 
                     # Expecting sequence_0.0
                     sequence_index, orf_index = (int(x) for x in line[2].split("_")[1].split("."))
@@ -273,14 +378,86 @@ class Job(virtool.jobs.analysis.Job):
                         "best_score": float(line[9])
                     })
 
-        for sequence_index in hits:
-            for orf_index in hits[sequence_index]:
-                self.results[sequence_index]["orfs"][orf_index]["hits"] = hits[sequence_index][orf_index]
+        # Indexes of sequences that were hit but ended up with no ORF hits. These are dropped from the results.
+        discarded = set()
 
+        for sequence_index in hits:
             sequence = self.results[sequence_index]
 
+            for orf_index in hits[sequence_index]:
+                sequence["orfs"][orf_index]["hits"] = hits[sequence_index][orf_index]
+
             if all(len(o["hits"]) == 0 for o in sequence["orfs"]):
-                self.results.remove(sequence)
+                discarded.add(sequence_index)
+
+        if discarded:
+            self.results = [s for i, s in enumerate(self.results) if i not in discarded]
+
+    def run_sharded_hmmscan(self, profiles_path: str, orfs: list, tsv_path: str, shard_count: int):
+        """
+        Split the ORFs into `shard_count` contiguous chunks and search them with concurrent ``hmmscan`` processes.
+
+        The ``--tblout`` output for each chunk is concatenated in chunk order and written to `tsv_path`. The result is
+        equivalent to a single ``hmmscan`` run on all ORFs.
+
+        :param profiles_path: the path to the pressed HMM profiles
+        :param orfs: the ORF FASTA records
+        :param tsv_path: the path to write the merged results to
+        :param shard_count: the number of concurrent ``hmmscan`` processes to use
+
+        """
+        commands = list()
+        shard_paths = list()
+
+        for i, chunk in enumerate(split_orfs(orfs, shard_count)):
+            fasta_path = os.path.join(self.params["analysis_path"], f"orfs.{i}.fa")
+            shard_tsv_path = os.path.join(self.params["analysis_path"], f"hmm.{i}.tsv")
+
+            with open(fasta_path, "w") as f:
+                for header, sequence in chunk:
+                    f.write(f">{header}\n{sequence}\n")
+
+            commands.append([
+                "hmmscan",
+                "--tblout", shard_tsv_path,
+                "--noali",
+                "--cpu", str(HMMSCAN_SHARD_CPU),
+                profiles_path,
+                fasta_path
+            ])
+
+            shard_paths.append((fasta_path, shard_tsv_path))
+
+        for command in commands:
+            self.add_log(f"Command: {' '.join(command)}")
+
+        self._shard_processes = [
+            subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE) for command in commands
+        ]
+
+        failed = list()
+
+        for command, process in zip(commands, self._shard_processes):
+            _, stderr = process.communicate()
+
+            for line in stderr.decode().splitlines():
+                self.add_log(line, indent=1)
+
+            if process.returncode != 0:
+                failed.append(command)
+
+        self._shard_processes = list()
+
+        if failed:
+            raise virtool.jobs.job.SubprocessError(f"Command failed: {' '.join(failed[0])}. Check job log.")
+
+        with open(tsv_path, "w") as f:
+            for fasta_path, shard_tsv_path in shard_paths:
+                with open(shard_tsv_path, "r") as shard_file:
+                    shutil.copyfileobj(shard_file, f)
+
+                os.remove(fasta_path)
+                os.remove(shard_tsv_path)
 
     def import_results(self):
         """
@@ -308,6 +485,9 @@ class Job(virtool.jobs.analysis.Job):
     def cleanup(self):
         super().cleanup()
 
+        for process in self._shard_processes:
+            process.kill()
+
         try:
             self.temp_dir.cleanup()
         except AttributeError:
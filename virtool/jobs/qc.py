@@ -0,0 +1,363 @@
+"""
+A native read quality engine that can be used instead of FastQC.
+
+The engine makes a single streaming pass over each FASTQ file and accumulates counts for each block of reads using
+NumPy. It produces the same fields as :func:`virtool.jobs.fastqc.parse_fastqc`.
+
+"""
+import concurrent.futures
+import gzip
+from typing import List
+
+import numpy
+
+import virtool.utils
+
+#: The number of FASTQ lines to accumulate at a time. Must be a multiple of four.
+BLOCK_LINES = 4 * 50000
+
+#: The number of bytes to read from a FASTQ file at a time.
+CHUNK_SIZE = 1024 * 1024
+
+#: The number of quality character values tracked. Higher characters are counted as ``127``.
+QUALITY_RANGE = 128
+
+#: The number of per-sequence quality score bins. Higher scores are counted in the last bin.
+SEQUENCE_QUALITY_BINS = 50
+
+#: Maps ASCII byte values to composition indexes in the order G, A, T, C. All other characters map to ``4``.
+COMPOSITION_INDEXES = numpy.full(256, 4, dtype=numpy.uint8)
+COMPOSITION_INDEXES[numpy.frombuffer(b"GATCgatc", dtype=numpy.uint8)] = [0, 1, 2, 3, 0, 1, 2, 3]
+
+#: The percentiles reported for per-base quality in the order used by FastQC: median, lower quartile, upper quartile,
+#: 10th percentile, and 90th percentile.
+PERCENTILES = (50, 25, 75, 10, 90)
+
+
+class QualityCounter:
+    """
+    Accumulates quality statistics for blocks of FASTQ reads.
+
+    """
+
+    def __init__(self):
+        #: The number of reads seen.
+        self.count = 0
+
+        #: The shortest and longest read lengths seen.
+        self.min_length = None
+        self.max_length = 0
+
+        #: The lowest quality character value seen. Used to detect the quality encoding.
+        self.lowest = QUALITY_RANGE - 1
+
+        #: Counts of each quality character value at each read position.
+        self.quality_counts = numpy.zeros((0, QUALITY_RANGE), dtype=numpy.int64)
+
+        #: Counts of G, A, T, C, and other characters at each read position.
+        self.base_counts = numpy.zeros((0, 5), dtype=numpy.int64)
+
+        #: Counts of reads by their mean raw quality character value.
+        self.mean_counts = numpy.zeros(QUALITY_RANGE, dtype=numpy.int64)
+
+        #: Complete lines passed to :meth:`feed` that have not been accumulated yet.
+        self._lines = list()
+
+        #: An incomplete trailing line passed to :meth:`feed`.
+        self._partial = b""
+
+    def feed(self, data: bytes):
+        """
+        Accumulate statistics for a chunk of raw FASTQ data. Chunks do not need to end on line or record boundaries.
+
+        Call :meth:`finish` after the last chunk has been fed.
+
+        :param data: a chunk of FASTQ data
+
+        """
+        lines = (self._partial + data).split(b"\n")
+
+        self._partial = lines.pop()
+        self._lines += lines
+
+        if len(self._lines) >= BLOCK_LINES:
+            self._add_lines()
+
+    def finish(self):
+        """
+        Accumulate any data remaining from calls to :meth:`feed`.
+
+        """
+        if self._partial:
+            self._lines.append(self._partial)
+            self._partial = b""
+
+        self._add_lines()
+
+    def _add_lines(self):
+        complete = len(self._lines) // 4 * 4
+
+        self.add(
+            [line.rstrip() for line in self._lines[1:complete:4]],
+            [line.rstrip() for line in self._lines[3:complete:4]]
+        )
+
+        del self._lines[:complete]
+
+    def add(self, sequences: List[bytes], qualities: List[bytes]):
+        """
+        Accumulate the statistics for a block of reads.
+
+        :param sequences: the read sequences without line endings
+        :param qualities: the read quality strings without line endings
+
+        """
+        if not sequences:
+            return
+
+        lengths = numpy.fromiter(map(len, sequences), dtype=numpy.int64, count=len(sequences))
+
+        nucleotides = numpy.frombuffer(b"".join(sequences), dtype=numpy.uint8)
+        quality = numpy.frombuffer(b"".join(qualities), dtype=numpy.uint8)
+
+        if len(nucleotides) != len(quality):
+            raise ValueError("FASTQ sequence and quality lengths do not match")
+
+        quality = numpy.minimum(quality, QUALITY_RANGE - 1)
+
+        self.count += len(lengths)
+        self.max_length = max(self.max_length, int(lengths.max()))
+
+        if self.min_length is None:
+            self.min_length = int(lengths.min())
+        else:
+            self.min_length = min(self.min_length, int(lengths.min()))
+
+        size = self.max_length
+
+        if size > len(self.quality_counts):
+            self.quality_counts = _grow(self.quality_counts, size)
+            self.base_counts = _grow(self.base_counts, size)
+
+        if len(quality) == 0:
+            return
+
+        self.lowest = min(self.lowest, int(quality.min()))
+
+        length = int(lengths[0])
+
+        if (lengths == length).all():
+            # Reads in a block usually share a length, so read positions can be broadcast rather than calculated for
+            # every base.
+            positions = numpy.arange(length)
+
+            quality = quality.reshape(-1, length)
+
+            quality_indexes = positions * QUALITY_RANGE + quality
+            composition_indexes = positions * 5 + COMPOSITION_INDEXES[nucleotides].reshape(-1, length)
+
+            means = quality.sum(axis=1, dtype=numpy.int64) // length
+        else:
+            starts = numpy.cumsum(lengths) - lengths
+
+            # The zero-based position of every base within its read.
+            positions = numpy.arange(len(quality)) - numpy.repeat(starts, lengths)
+
+            quality_indexes = positions * QUALITY_RANGE + quality
+            composition_indexes = positions * 5 + COMPOSITION_INDEXES[nucleotides]
+
+            non_empty = lengths > 0
+
+            means = numpy.add.reduceat(quality.astype(numpy.int64), starts[non_empty]) // lengths[non_empty]
+
+        self.quality_counts[:size] += numpy.bincount(
+            quality_indexes.ravel(),
+            minlength=size * QUALITY_RANGE
+        ).reshape(size, QUALITY_RANGE)
+
+        self.base_counts[:size] += numpy.bincount(
+            composition_indexes.ravel(),
+            minlength=size * 5
+        ).reshape(size, 5)
+
+        self.mean_counts += numpy.bincount(means, minlength=QUALITY_RANGE)
+
+    def to_dict(self) -> dict:
+        """
+        Return the accumulated statistics in the format returned by :func:`virtool.jobs.fastqc.parse_fastqc`.
+
+        :return: the quality statistics
+
+        """
+        encoding, offset = get_encoding(self.lowest)
+
+        size = self.max_length
+
+        # Per-base quality. Character values below the encoding offset are ignored like they are in FastQC.
+        quality_counts = self.quality_counts[:size, offset:]
+        cumulative = quality_counts.cumsum(axis=1)
+        totals = cumulative[:, -1] if size else numpy.zeros(0, dtype=numpy.int64)
+
+        means = (quality_counts @ numpy.arange(quality_counts.shape[1])) / numpy.maximum(totals, 1)
+
+        columns = [means.astype(numpy.int64)]
+
+        for percentile in PERCENTILES:
+            threshold = totals * percentile // 100
+            columns.append((cumulative >= threshold[:, None]).argmax(axis=1))
+
+        bases = numpy.stack(columns, axis=1).tolist() if size else list()
+
+        # Per-base sequence content as percentages of G, A, T, and C.
+        base_counts = self.base_counts[:size, :4]
+        base_totals = base_counts.sum(axis=1)
+
+        composition = (base_counts * 100 // numpy.maximum(base_totals, 1)[:, None]).tolist()
+
+        g_count, a_count, t_count, c_count = (int(n) for n in self.base_counts[:, :4].sum(axis=0))
+        acgt_count = g_count + a_count + t_count + c_count
+
+        gc = float((g_count + c_count) * 100 // acgt_count) if acgt_count else 0.0
+
+        sequences = [0] * SEQUENCE_QUALITY_BINS
+
+        for mean, count in enumerate(self.mean_counts.tolist()):
+            if count:
+                sequences[min(max(mean - offset, 0), SEQUENCE_QUALITY_BINS - 1)] += count
+
+        return {
+            "count": self.count,
+            "encoding": encoding,
+            "length": [self.min_length or 0, self.max_length],
+            "gc": gc,
+            "bases": bases,
+            "sequences": sequences,
+            "composition": composition
+        }
+
+
+def _grow(counts: numpy.ndarray, size: int) -> numpy.ndarray:
+    """
+    Return a copy of the per-position `counts` array extended with zeroed rows to `size` positions.
+
+    """
+    grown = numpy.zeros((size, counts.shape[1]), dtype=counts.dtype)
+    grown[:len(counts)] = counts
+    return grown
+
+
+def get_encoding(lowest: int) -> tuple:
+    """
+    Get the quality encoding name and offset given the `lowest` quality character value in a FASTQ file. Uses the same
+    rules as FastQC.
+
+    :param lowest: the lowest quality character value
+    :return: the encoding name and offset
+
+    """
+    if lowest < 33:
+        raise ValueError(f"No known quality encoding with lowest character {lowest}")
+
+    if lowest < 64:
+        return "Sanger / Illumina 1.9", 33
+
+    if lowest == 64:
+        return "Illumina 1.3", 64
+
+    return "Illumina 1.5", 64
+
+
+def calculate_file_qc(path: str) -> dict:
+    """
+    Calculate quality statistics for the FASTQ file at `path` in a single streaming pass. Both uncompressed and
+    gzip-compressed files are accepted.
+
+    :param path: the path to the FASTQ file
+    :return: the quality statistics
+
+    """
+    counter = QualityCounter()
+
+    opener = gzip.open if virtool.utils.is_gzipped(path) else open
+
+    with opener(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            counter.feed(chunk)
+
+    counter.finish()
+
+    return counter.to_dict()
+
+
+def merge_qc(left: dict, right: dict) -> dict:
+    """
+    Merge the quality statistics for a pair of read files the same way :func:`virtool.jobs.fastqc.parse_fastqc`
+    merges FastQC reports for paired data.
+
+    :param left: the quality statistics for the left reads
+    :param right: the quality statistics for the right reads
+    :return: the merged quality statistics
+
+    """
+    merged = {
+        "count": left["count"] + right["count"],
+        "encoding": left["encoding"],
+        "length": [
+            min(left["length"][0], right["length"][0]),
+            max(left["length"][1], right["length"][1])
+        ],
+        "gc": (left["gc"] + right["gc"]) / 2,
+        "sequences": [a + b for a, b in zip(left["sequences"], right["sequences"])]
+    }
+
+    for key in ("bases", "composition"):
+        merged[key] = [
+            virtool.utils.average_list(a, b) for a, b in zip(left[key], right[key])
+        ] + left[key][len(right[key]):] + right[key][len(left[key]):]
+
+    return merged
+
+
+def calculate_qc(read_paths: List[str], proc: int = 1) -> dict:
+    """
+    Calculate quality statistics for one or two FASTQ files. Paired files are processed in parallel if `proc` allows.
+
+    The returned `dict` has the same fields as the one returned by :func:`virtool.jobs.fastqc.parse_fastqc`.
+
+    :param read_paths: the paths to the read files
+    :param proc: the number of processors available
+    :return: the quality statistics
+
+    """
+    workers = max(1, min(len(read_paths), proc))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(calculate_file_qc, read_paths))
+
+    return combine_qc(results)
+
+
+def combine_qc(results: List[dict]) -> dict:
+    """
+    Combine the quality statistics for the files in a sample. Statistics for paired files are merged with
+    :func:`.merge_qc`.
+
+    :param results: the quality statistics for each read file
+    :return: the sample quality statistics
+
+    """
+    if len(results) == 1:
+        return results[0]
+
+    return merge_qc(*results)
+
+
+def should_use_native(settings: dict) -> bool:
+    """
+    Decides whether the native engine should be used instead of FastQC based on the ``qc_engine`` setting.
+
+    :param settings: the application settings
+    :return: a boolean indicating if the native engine should be used
+
+    """
+    return settings.get("qc_engine") == "native"
@@ -5,6 +5,7 @@ import virtool.files.db
 import virtool.samples.db
 import virtool.jobs.fastqc
 import virtool.jobs.job
+import virtool.jobs.qc
 import virtool.jobs.utils
 import virtool.samples.utils
 import virtool.utils
@@ -35,7 +36,8 @@ class Job(virtool.jobs.job.Job):
         """
         Copy the replacement files from the files directory to the sample directory.
 
-        The files are named replacement_reads_<suffix>.fq.gz. They will be compressed if necessary.
+        The files are named replacement_reads_<suffix>.fq.gz. They will be compressed if necessary. If the native
+        quality engine is enabled, the files are compressed, counted, checksummed, and quality checked in a single pass.
 
         """
         files = self.params["files"]
@@ -43,11 +45,25 @@ class Job(virtool.jobs.job.Job):
 
         paths = [os.path.join(self.settings["data_path"], "files", file["replacement"]["id"]) for file in files]
 
-        sizes = virtool.jobs.utils.copy_files_to_sample(
-            paths,
-            self.params["sample_path"],
-            self.proc
-        )
+        checksums = None
+
+        if virtool.jobs.qc.should_use_native(self.settings):
+            results = virtool.jobs.utils.ingest_files_to_sample(
+                paths,
+                self.params["sample_path"],
+                self.proc
+            )
+
+            sizes = [result["size"] for result in results]
+            checksums = [result["checksum"] for result in results]
+
+            self.intermediate["qc"] = virtool.jobs.qc.combine_qc([result["qc"] for result in results])
+        else:
+            sizes = virtool.jobs.utils.copy_files_to_sample(
+                paths,
+                self.params["sample_path"],
+                self.proc
+            )
 
         raw = list()
 
@@ -61,13 +77,22 @@ class Job(virtool.jobs.job.Job):
                 "from": file
             })
 
+            if checksums:
+                raw[index]["checksum"] = checksums[index]
+
         self.intermediate["raw"] = raw
 
     def fastqc(self):
         """
         Runs FastQC on the replacement read files.
 
+        Nothing is done if the quality data was already calculated by the native quality engine in
+        :meth:`.copy_files`.
+
         """
+        if "qc" in self.intermediate:
+            return
+
         fastq_path = self.params["fastqc_path"]
 
         try:
@@ -95,6 +120,9 @@ class Job(virtool.jobs.job.Job):
         in the main run() method
 
         """
+        if "qc" in self.intermediate:
+            return
+
         self.intermediate["qc"] = virtool.jobs.fastqc.parse_fastqc(
             self.params["fastqc_path"],
             self.params["sample_path"],
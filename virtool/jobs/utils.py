@@ -1,9 +1,18 @@
+import concurrent.futures
+import gzip
+import hashlib
 import os
 import shutil
+import subprocess
 import time
+import zlib
 from typing import Union
 
+import pymongo
+
 import virtool.caches.db
+import virtool.files.utils
+import virtool.jobs.qc
 import virtool.samples.db
 import virtool.samples.utils
 import virtool.utils
@@ -43,6 +52,118 @@ def copy_or_compress(path: str, target: str, proc: int):
         virtool.utils.compress_file(path, target, processes=proc)
 
 
+def ingest_files_to_sample(paths: list, sample_path: str, proc: int) -> list:
+    """
+    Ingest the read files at `paths` into the sample directory at `sample_path` using :func:`.ingest_reads`. Paired
+    files are ingested in parallel if `proc` allows, with the pigz workers split between them.
+
+    :param paths: the paths to the read files
+    :param sample_path: the path to the sample directory
+    :param proc: the number of processors available
+    :return: the size, checksum, and quality statistics for each file
+
+    """
+    workers = max(1, min(len(paths), proc))
+
+    targets = [virtool.samples.utils.join_read_path(sample_path, index + 1) for index in range(len(paths))]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(ingest_reads, paths, targets, [max(1, proc // workers)] * len(paths)))
+
+
+def ingest_reads(path: str, target: str, proc: int) -> dict:
+    """
+    Copy the read file at `path` to a gzip-compressed file at `target` while calculating its quality statistics and a
+    SHA-256 checksum of its uncompressed content. The source file is only read once.
+
+    Files that are already compressed are copied as-is and decompressed in memory for the statistics. Uncompressed
+    files are compressed on-the-fly, using `pigz` if `proc` allows.
+
+    :param path: the path to the read file
+    :param target: the path to write the compressed file to
+    :param proc: the number of worker processes to allow for pigz
+    :return: the size of the written file, the checksum, and the quality statistics
+
+    """
+    counter = virtool.jobs.qc.QualityCounter()
+    digest = hashlib.sha256()
+
+    def consume(data: bytes):
+        digest.update(data)
+        counter.feed(data)
+
+    with open(path, "rb") as f, open(target, "wb") as output:
+        chunks = iter(lambda: f.read(virtool.jobs.qc.CHUNK_SIZE), b"")
+
+        if virtool.utils.is_gzipped(path):
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+            for chunk in chunks:
+                output.write(chunk)
+
+                # Handle files containing multiple gzip members.
+                while chunk:
+                    consume(decompressor.decompress(chunk))
+
+                    chunk = b""
+
+                    if decompressor.eof:
+                        chunk = decompressor.unused_data
+                        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+        elif virtool.utils.should_use_pigz(proc):
+            process = subprocess.Popen(["pigz", "-p", str(proc), "--stdout"], stdin=subprocess.PIPE, stdout=output)
+
+            for chunk in chunks:
+                process.stdin.write(chunk)
+                consume(chunk)
+
+            process.stdin.close()
+
+            if process.wait() != 0:
+                raise subprocess.CalledProcessError(process.returncode, "pigz")
+
+        else:
+            with gzip.GzipFile(fileobj=output, mode="wb", compresslevel=6) as compressed:
+                for chunk in chunks:
+                    compressed.write(chunk)
+                    consume(chunk)
+
+    counter.finish()
+
+    return {
+        "size": virtool.utils.file_stats(target)["size"],
+        "checksum": digest.hexdigest(),
+        "qc": counter.to_dict()
+    }
+
+
+def release_blob(db, settings: dict, content_hash: str):
+    """
+    Decrement the reference count of the blob with `content_hash` and remove the blob if it is no longer referenced.
+    A synchronous counterpart of :func:`virtool.files.db.release_blob` for use in jobs.
+
+    :param db: the job database client
+    :param settings: the application settings
+    :param content_hash: the SHA-256 hex digest of the blob content
+
+    """
+    document = db.blobs.find_one_and_update({"_id": content_hash}, {
+        "$inc": {
+            "count": -1
+        }
+    }, return_document=pymongo.ReturnDocument.AFTER)
+
+    if document is None or document["count"] > 0:
+        return
+
+    if db.blobs.delete_one({"_id": content_hash, "count": {"$lte": 0}}).deleted_count:
+        try:
+            virtool.utils.rm(virtool.files.utils.join_blob_path(settings, content_hash))
+        except FileNotFoundError:
+            pass
+
+
 def copy_or_decompress(path: str, target: str, proc: int):
     if virtool.utils.is_gzipped(path):
         virtool.utils.decompress_file(path, target, proc)
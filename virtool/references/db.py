@@ -2,7 +2,7 @@ import asyncio
 import json.decoder
 import logging
 import os
-from typing import List, Union
+from typing import AsyncGenerator, Dict, List, Union
 
 import aiohttp
 import aiojobs.aiohttp
@@ -24,6 +24,9 @@ import virtool.references.utils
 import virtool.users.db
 import virtool.utils
 
+#: The number of OTUs patched concurrently when exporting a reference.
+EXPORT_BATCH_SIZE = 20
+
 PROJECTION = [
     "_id",
     "remotes_from",
@@ -442,31 +445,47 @@ async def processor(db, document: dict) -> dict:
     :return: the processed document
 
     """
-    try:
-        ref_id = document["_id"]
-    except KeyError:
-        ref_id = document["id"]
+    processed = await batch_processor(db, [document])
+    return processed[0]
+
+
+async def batch_processor(db, documents: List[dict]) -> List[dict]:
+    """
+    Process a list of reference documents. The derived fields are fetched for all of the references at once with one
+    aggregation per collection.
+
+    :param db: the application database client
+    :param documents: the documents to process
+    :return: the processed documents
+
+    """
+    ref_ids = [document.get("_id", document.get("id")) for document in documents]
 
-    latest_build, otu_count, unbuilt_count = await asyncio.gather(
-        virtool.references.db.get_latest_build(db, ref_id),
-        virtool.references.db.get_otu_count(db, ref_id),
-        virtool.references.db.get_unbuilt_count(db, ref_id)
+    latest_builds, otu_counts, unbuilt_counts = await asyncio.gather(
+        get_latest_builds(db, ref_ids),
+        count_by_reference(db.otus, ref_ids),
+        count_by_reference(db.history, ref_ids, {"index.id": "unbuilt"})
     )
 
-    document.update({
-        "latest_build": latest_build,
-        "otu_count": otu_count,
-        "unbuilt_change_count": unbuilt_count
-    })
+    processed = list()
 
-    try:
-        document["installed"] = document.pop("updates")[-1]
-    except (KeyError, IndexError):
-        pass
+    for ref_id, document in zip(ref_ids, documents):
+        document.update({
+            "latest_build": latest_builds.get(ref_id),
+            "otu_count": otu_counts.get(ref_id, 0),
+            "unbuilt_change_count": unbuilt_counts.get(ref_id, 0)
+        })
 
-    document["id"] = ref_id
+        try:
+            document["installed"] = document.pop("updates")[-1]
+        except (KeyError, IndexError):
+            pass
 
-    return document
+        document["id"] = ref_id
+
+        processed.append(document)
+
+    return processed
 
 
 async def add_group_or_user(db, ref_id, field, data):
@@ -837,6 +856,53 @@ async def get_latest_build(db, ref_id: str) -> Union[dict, None]:
     return virtool.utils.base_processor(latest_build)
 
 
+async def get_latest_builds(db, ref_ids: List[str]) -> Dict[str, dict]:
+    """
+    Return the latest index builds for multiple references using a single aggregation.
+
+    :param db: the application database client
+    :param ref_ids: the ids of the references to get the latest builds for
+    :return: subsets of fields for the latest builds keyed by reference id
+
+    """
+    pipeline = [
+        {"$match": {"reference.id": {"$in": ref_ids}, "ready": True}},
+        {"$sort": {"version": pymongo.DESCENDING}},
+        {"$group": {
+            "_id": "$reference.id",
+            "latest_build": {
+                "$first": {
+                    "id": "$_id",
+                    "created_at": "$created_at",
+                    "version": "$version",
+                    "user": "$user"
+                }
+            }
+        }}
+    ]
+
+    return {result["_id"]: result["latest_build"] async for result in db.indexes.aggregate(pipeline)}
+
+
+async def count_by_reference(collection, ref_ids: List[str], query: dict = None) -> Dict[str, int]:
+    """
+    Count the documents in `collection` that belong to each of the references in `ref_ids` using a single aggregation.
+    Pass `query` to only count matching documents.
+
+    :param collection: the collection to count documents in
+    :param ref_ids: the ids of the references to count documents for
+    :param query: an additional query documents must match
+    :return: document counts keyed by reference id
+
+    """
+    pipeline = [
+        {"$match": {**(query or {}), "reference.id": {"$in": ref_ids}}},
+        {"$group": {"_id": "$reference.id", "count": {"$sum": 1}}}
+    ]
+
+    return {result["_id"]: result["count"] async for result in collection.aggregate(pipeline)}
+
+
 async def get_official_installed(db) -> bool:
     """
     Return a boolean indicating whether the official plant virus reference is installed.
@@ -1106,10 +1172,24 @@ async def edit(db, ref_id: str, data: dict) -> dict:
 
 
 async def export(app, ref_id):
-    db = app["db"]
-
     otu_list = list()
 
+    async for batch in iter_export_batches(app, ref_id):
+        otu_list += batch
+
+    return otu_list
+
+
+async def iter_export_batches(app, ref_id: str) -> AsyncGenerator[list, None]:
+    """
+    Yield the cleaned OTUs in an export of the reference with `ref_id` in batches of :data:`EXPORT_BATCH_SIZE`. Each OTU
+    is patched to its last indexed version. The OTUs in a batch are patched concurrently.
+
+    :param app: the application object
+    :param ref_id: the id of the reference to export
+    :return: lists of cleaned OTUs
+
+    """
     query = {
         "reference.id": ref_id,
         "last_indexed_version": {
@@ -1117,16 +1197,56 @@ async def export(app, ref_id):
         }
     }
 
-    async for document in db.otus.find(query):
-        _, joined, _ = await virtool.history.db.patch_to_version(
-            app,
-            document["_id"],
-            document["last_indexed_version"]
-        )
+    batch = list()
+
+    async for document in app["db"].otus.find(query, ["last_indexed_version"]):
+        batch.append(document)
+
+        if len(batch) == EXPORT_BATCH_SIZE:
+            yield await patch_export_batch(app, batch)
+            batch = list()
+
+    if batch:
+        yield await patch_export_batch(app, batch)
 
-        otu_list.append(joined)
 
-    return virtool.references.utils.clean_export_list(otu_list)
+async def iter_export(app, ref_id: str, header: dict) -> AsyncGenerator[bytes, None]:
+    """
+    Yield the export of the reference with `ref_id` as chunks of gzip-compressed JSON. OTUs are encoded as they are
+    patched, so the whole reference is never held in memory.
+
+    :param app: the application object
+    :param ref_id: the id of the reference to export
+    :param header: the fields other than ``otus`` to include in the export
+    :return: compressed export data
+
+    """
+    encoder = virtool.references.utils.ExportEncoder(header)
+
+    async for batch in iter_export_batches(app, ref_id):
+        chunk = await app["run_in_thread"](encoder.encode, batch)
+
+        if chunk:
+            yield chunk
+
+    yield encoder.finish()
+
+
+async def patch_export_batch(app, documents: List[dict]) -> List[dict]:
+    """
+    Patch the OTU `documents` to their last indexed versions and clean them for export.
+
+    :param app: the application object
+    :param documents: OTU documents with ``last_indexed_version`` fields
+    :return: the cleaned OTUs
+
+    """
+    patched = await asyncio.gather(*[
+        virtool.history.db.patch_to_version(app, document["_id"], document["last_indexed_version"])
+        for document in documents
+    ])
+
+    return [virtool.references.utils.clean_export_otu(joined) for _, joined, _ in patched]
 
 
 async def finish_remote(app, release, ref_id: str, created_at: str, process_id: str, user_id: str):
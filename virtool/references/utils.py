@@ -1,9 +1,13 @@
 import gzip
+import hashlib
 import json
+import os
+import zlib
 
 from cerberus import Validator
 from operator import itemgetter
 
+import virtool.api.json
 import virtool.otus.utils
 
 ISOLATE_KEYS = [
@@ -19,6 +23,9 @@ OTU_KEYS = [
     "schema"
 ]
 
+#: The name of cached reference exports. Formatted with a digest of the export header.
+EXPORT_FILENAME = "reference.{}.json.gz"
+
 RIGHTS = [
     "build",
     "modify",
@@ -34,6 +41,61 @@ SEQUENCE_KEYS = [
 ]
 
 
+class ExportEncoder:
+    """
+    Incrementally encodes a reference export as gzip-compressed JSON. The encoded export has the same structure as the
+    one produced by :func:`json.dumps`, so it can be read with :func:`.load_reference_file`.
+
+    :param header: the fields other than ``otus`` to include in the export
+
+    """
+
+    def __init__(self, header: dict):
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+        #: The header encoded as a JSON object that is left open so the OTU list can be appended.
+        self._prefix = json.dumps(header, cls=virtool.api.json.CustomEncoder)[:-1].rstrip()
+
+        if header:
+            self._prefix += ", "
+
+        self._prefix += '"otus": ['
+
+        #: Has the first OTU been encoded.
+        self._started = False
+
+    def encode(self, otus: list) -> bytes:
+        """
+        Encode and compress a batch of cleaned `otus`. The returned data may be empty if the compressor is buffering.
+
+        :param otus: the OTUs to encode
+        :return: compressed data
+
+        """
+        parts = list()
+
+        for otu in otus:
+            if self._started:
+                parts.append(", ")
+            else:
+                parts.append(self._prefix)
+                self._started = True
+
+            parts.append(json.dumps(otu, cls=virtool.api.json.CustomEncoder))
+
+        return self._compressor.compress("".join(parts).encode())
+
+    def finish(self) -> bytes:
+        """
+        Close the OTU list and return the remaining compressed data.
+
+        :return: compressed data
+
+        """
+        data = ("]}" if self._started else self._prefix + "]}").encode()
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
 def check_import_data(import_data, strict=True, verify=True):
     errors = detect_duplicates(import_data["otus"])
 
@@ -111,27 +173,30 @@ def check_will_change(old, imported):
 
 
 def clean_export_list(otus):
-    cleaned = list()
+    return [clean_export_otu(otu) for otu in otus]
 
-    otu_keys = OTU_KEYS + ["_id"]
-    sequence_keys = SEQUENCE_KEYS + ["_id"]
 
-    for otu in otus:
-        try:
-            otu["_id"] = otu["remote"]["id"]
-        except KeyError:
-            pass
+def clean_export_otu(otu):
+    """
+    Clean a joined OTU for export. Remote ids are used as the ids of OTUs and sequences that have them.
 
-        for isolate in otu["isolates"]:
-            for sequence in isolate["sequences"]:
-                try:
-                    sequence["_id"] = sequence["remote"]["id"]
-                except KeyError:
-                    pass
+    :param otu: the joined OTU
+    :return: the cleaned OTU
 
-        cleaned.append(clean_otu(otu, otu_keys, sequence_keys))
+    """
+    try:
+        otu["_id"] = otu["remote"]["id"]
+    except KeyError:
+        pass
 
-    return cleaned
+    for isolate in otu["isolates"]:
+        for sequence in isolate["sequences"]:
+            try:
+                sequence["_id"] = sequence["remote"]["id"]
+            except KeyError:
+                pass
+
+    return clean_otu(otu, OTU_KEYS + ["_id"], SEQUENCE_KEYS + ["_id"])
 
 
 def clean_otu(otu, otu_keys=None, sequence_keys=None):
@@ -305,6 +370,40 @@ def detect_duplicates(otus, strict=True):
     return errors
 
 
+def get_export_digest(header: dict) -> str:
+    """
+    Return a short digest of an export `header`. Cached exports are keyed on the digest so changes to the reference
+    that do not require a new index, like editing targets, still invalidate them.
+
+    :param header: the fields other than ``otus`` included in the export
+    :return: a hex digest
+
+    """
+    encoded = json.dumps(header, cls=virtool.api.json.CustomEncoder, sort_keys=True).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def get_export_header(document: dict) -> dict:
+    """
+    Return the fields other than ``otus`` that are included in an export of the reference `document`.
+
+    :param document: the reference document
+    :return: the export header
+
+    """
+    header = {
+        "data_type": document["data_type"],
+        "organism": document["organism"]
+    }
+
+    try:
+        header["targets"] = document["targets"]
+    except KeyError:
+        pass
+
+    return header
+
+
 def get_import_schema(require_meta=True):
     return {
         "data_type": {
@@ -398,6 +497,21 @@ def get_sequence_schema(require_id):
     }
 
 
+def join_export_path(settings: dict, ref_id: str, index_id: str, digest: str) -> str:
+    """
+    Return the path to the cached export of a reference at the version built into the index with `index_id`. Exports
+    are kept in the index directory so they are removed along with unused indexes.
+
+    :param settings: the application settings
+    :param ref_id: the id of the reference
+    :param index_id: the id of the index the export was built from
+    :param digest: the digest of the export header
+    :return: the export path
+
+    """
+    return os.path.join(settings["data_path"], "references", ref_id, index_id, EXPORT_FILENAME.format(digest))
+
+
 def load_reference_file(path):
     """
     Load a list of merged otus documents from a file associated with a Virtool reference file.
@@ -50,8 +50,8 @@ async def delete(app, subtraction_id):
 
     await unlink_default_subtractions(db, subtraction_id)
 
-    if update_result.modified_count:
+    if update_result.matched_count:
         path = virtool.subtractions.utils.join_subtraction_path(settings, subtraction_id)
         await app["run_in_thread"](shutil.rmtree, path, True)
 
-    return update_result.modified_count
+    return update_result.matched_count
@@ -1,34 +1,229 @@
+import gzip
+import hashlib
 import logging
 import os
+from typing import List, Optional
+
+import numpy
+
+import virtool.utils
 
 logger = logging.getLogger(__name__)
 
 
-def calculate_fasta_gc(path):
-    nucleotides = {
-        "a": 0,
-        "t": 0,
-        "g": 0,
-        "c": 0,
-        "n": 0
+#: The number of bytes to read from a FASTA file at a time.
+CHUNK_SIZE = 4 * 1024 * 1024
+
+#: The nucleotides reported in subtraction composition statistics.
+NUCLEOTIDES = "atgcn"
+
+#: The uppercase byte values of :data:`NUCLEOTIDES`.
+NUCLEOTIDE_CODES = numpy.frombuffer(NUCLEOTIDES.upper().encode(), dtype=numpy.uint8)
+
+
+def calculate_fasta_stats(path: str) -> dict:
+    """
+    Calculate the nucleotide composition, sequence count, and sequence length distribution for the FASTA file at
+    `path` in a single streaming pass. Gzip-compressed files are read directly.
+
+    Nucleotides are counted regardless of case. Characters other than A, T, G, C, and N are ignored.
+
+    :param path: the path to the FASTA file
+    :return: the nucleotide fractions, sequence count, and length distribution
+
+    """
+    counts = numpy.zeros(len(NUCLEOTIDES), dtype=numpy.int64)
+    lengths = list()
+
+    # The length of the sequence currently being read. ``None`` until the first header is seen.
+    length = None
+
+    # An incomplete trailing line carried over from the previous chunk.
+    partial = b""
+
+    opener = gzip.open if virtool.utils.is_gzipped(path) else open
+
+    with opener(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            data = partial + chunk
+
+            end = data.rfind(b"\n") + 1
+
+            partial = data[end:]
+
+            length = _count_block(data[:end], counts, lengths, length)
+
+    if partial:
+        length = _count_block(partial, counts, lengths, length)
+
+    if length is not None:
+        lengths.append(length)
+
+    total = int(counts.sum())
+
+    return {
+        "gc": {n: round(int(count) / total, 3) if total else 0.0 for n, count in zip(NUCLEOTIDES, counts)},
+        "count": len(lengths),
+        "lengths": get_length_distribution(lengths)
+    }
+
+
+def _count_block(data: bytes, counts: numpy.ndarray, lengths: list, length: Optional[int]) -> Optional[int]:
+    """
+    Add the nucleotide counts for a block of whole FASTA lines to `counts` and append the lengths of any sequences
+    completed in the block to `lengths`.
+
+    :param data: a block of whole FASTA lines
+    :param counts: the nucleotide counts so far
+    :param lengths: the lengths of the sequences completed so far
+    :param length: the length of the incomplete sequence from the previous block
+    :return: the length of the incomplete sequence at the end of the block
+
+    """
+    # Headers are rare, so they are located with bytes.find and everything else is counted with NumPy for the whole
+    # block at once.
+    header_starts = [0] if data.startswith(b">") else list()
+
+    position = data.find(b"\n>")
+
+    while position != -1:
+        header_starts.append(position + 1)
+        position = data.find(b"\n>", position + 1)
+
+    header_ends = list()
+
+    for header_start in header_starts:
+        newline = data.find(b"\n", header_start)
+        header_ends.append(len(data) if newline == -1 else newline + 1)
+
+    array = numpy.frombuffer(data, dtype=numpy.uint8)
+
+    counts += _count_nucleotides(array)
+
+    if header_starts:
+        headers = b"".join(data[start:end] for start, end in zip(header_starts, header_ends))
+        counts -= _count_nucleotides(numpy.frombuffer(headers, dtype=numpy.uint8))
+
+    # Each block is split into sequence segments by its headers. The first segment continues the sequence from the
+    # previous block.
+    starts = numpy.array([0] + header_ends, dtype=numpy.int64)
+    ends = numpy.array(header_starts + [len(data)], dtype=numpy.int64)
+
+    whitespace = numpy.zeros(len(starts), dtype=numpy.int64)
+
+    for character in b"\n\r":
+        found = numpy.flatnonzero(array == character)
+        whitespace += numpy.searchsorted(found, ends) - numpy.searchsorted(found, starts)
+
+    segment_lengths = (ends - starts - whitespace).tolist()
+
+    if length is not None:
+        length += segment_lengths[0]
+
+    for segment_length in segment_lengths[1:]:
+        if length is not None:
+            lengths.append(length)
+
+        length = segment_length
+
+    return length
+
+
+def _count_nucleotides(array: numpy.ndarray) -> numpy.ndarray:
+    """
+    Count each of :data:`NUCLEOTIDES` in an array of FASTA bytes regardless of case.
+
+    """
+    # Clearing bit 5 converts lowercase ASCII letters to uppercase without creating any new matches.
+    folded = array & 0xDF
+
+    return numpy.array([numpy.count_nonzero(folded == code) for code in NUCLEOTIDE_CODES], dtype=numpy.int64)
+
+
+def get_length_distribution(lengths: list) -> dict:
+    """
+    Summarize the sequence `lengths` from a FASTA file.
+
+    :param lengths: the length of each sequence
+    :return: the minimum, maximum, mean, and N50 sequence lengths
+
+    """
+    if not lengths:
+        return {
+            "min": 0,
+            "max": 0,
+            "mean": 0,
+            "n50": 0
+        }
+
+    lengths = numpy.sort(numpy.array(lengths, dtype=numpy.int64))[::-1]
+
+    cumulative = numpy.cumsum(lengths)
+
+    return {
+        "min": int(lengths[-1]),
+        "max": int(lengths[0]),
+        "mean": round(float(cumulative[-1]) / len(lengths), 1),
+        "n50": int(lengths[numpy.searchsorted(cumulative, cumulative[-1] / 2)])
     }
 
-    count = 0
 
-    # Go through the fasta file getting the nucleotide counts, lengths, and number of sequences
-    with open(path, "r") as handle:
-        for line in handle:
-            if line[0] == ">":
-                count += 1
-                continue
+def unpack_fasta(path: str, target: str) -> str:
+    """
+    Copy the FASTA file at `path` to `target`, decompressing it if it is gzipped. A SHA-256 hash of the uncompressed
+    content is calculated in the same pass.
+
+    :param path: the path to the uploaded FASTA file
+    :param target: the path to write the uncompressed FASTA file to
+    :return: the hex digest of the uncompressed content
+
+    """
+    digest = hashlib.sha256()
+
+    opener = gzip.open if virtool.utils.is_gzipped(path) else open
+
+    with opener(path, "rb") as f, open(target, "wb") as output:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+            output.write(chunk)
+
+    return digest.hexdigest()
+
+
+def link_subtraction_index(index_path: str, target_index_path: str) -> List[str]:
+    """
+    Hard link the Bowtie2 index files with the root name `index_path` so they are available under the root name
+    `target_index_path`. The files remain available under the new name if the original subtraction is deleted.
+
+    :param index_path: the root name of the existing index
+    :param target_index_path: the root name to link the index files to
+    :return: the names of the linked files
+
+    """
+    directory, root = os.path.split(index_path)
+    target_directory, target_root = os.path.split(target_index_path)
+
+    prefix = root + "."
+
+    names = sorted(name for name in os.listdir(directory) if name.startswith(prefix) and ".bt2" in name)
+
+    if not names:
+        raise FileNotFoundError(f"No Bowtie2 index found at {index_path}")
+
+    linked = list()
 
-            for i in ["a", "t", "g", "c", "n"]:
-                # Find lowercase and uppercase nucleotide characters
-                nucleotides[i] += line.lower().count(i)
+    try:
+        for name in names:
+            target_name = target_root + name[len(root):]
+            os.link(os.path.join(directory, name), os.path.join(target_directory, target_name))
+            linked.append(target_name)
+    except OSError:
+        for name in linked:
+            os.remove(os.path.join(target_directory, name))
 
-    nucleotides_sum = sum(nucleotides.values())
+        raise
 
-    return {k: round(nucleotides[k] / nucleotides_sum, 3) for k in nucleotides}, count
+    return linked
 
 
 def join_subtraction_path(settings: dict, subtraction_id: str) -> str:
@@ -1,4 +1,5 @@
 import asyncio
+import hashlib
 import logging
 import os
 import aiofiles
@@ -7,16 +8,17 @@ from cerberus import Validator
 
 import virtool.files.db
 import virtool.uploads.db
+import virtool.uploads.utils
 import virtool.samples.db
 import virtool.db.utils
 import virtool.http.routes
 import virtool.utils
-from virtool.api.response import invalid_query, json_response, not_found
+import virtool.validators
+from virtool.api.response import bad_request, conflict, insufficient_storage, invalid_query, json_response, no_content, \
+    not_found
 
 logger = logging.getLogger(__name__)
 
-CHUNK_SIZE = 4096
-
 FILE_TYPES = [
     "reference",
     "reads",
@@ -36,22 +38,285 @@ def naive_validator(req):
         return v.errors
 
 
-async def naive_writer(req, file_id):
+async def naive_writer(req, file_id) -> str:
+    """
+    Write the file in the multipart request body to the file path for `file_id`. The content is hashed as it is
+    written.
+
+    :param req: the request
+    :param file_id: the id of the file being uploaded
+    :return: the SHA-256 hex digest of the file content
+
+    """
     reader = await req.multipart()
     file = await reader.next()
 
     file_path = os.path.join(req.app["settings"]["data_path"], "files", file_id)
 
+    digest = hashlib.sha256()
+
     size = 0
 
     async with aiofiles.open(file_path, "wb") as handle:
         while True:
-            chunk = await file.read_chunk(CHUNK_SIZE)
+            chunk = await file.read_chunk(virtool.uploads.utils.BUFFER_SIZE)
             if not chunk:
                 break
             size += len(chunk)
+            digest.update(chunk)
             await handle.write(chunk)
 
+    return digest.hexdigest()
+
+
+async def get_owned_session(req):
+    """
+    Get the resumable upload session identified in the request path. Returns `None` if the session does not exist or
+    belongs to another user.
+
+    :param req: the request
+    :return: the session document
+
+    """
+    session = await req.app["db"].uploads.find_one(req.match_info["upload_id"])
+
+    if session is None or session["user"]["id"] != req["client"].user_id:
+        return None
+
+    return session
+
+
+# Session routes must be registered before `/upload/{file_type}` so that ``sessions`` is not matched as a file type.
+@routes.post("/upload/sessions", permission="upload_file", schema={
+    "name": {
+        "type": "string",
+        "coerce": virtool.validators.strip,
+        "empty": False,
+        "required": True
+    },
+    "type": {
+        "type": "string",
+        "allowed": FILE_TYPES,
+        "required": True
+    },
+    "size": {
+        "type": "integer",
+        "min": 0,
+        "max": virtool.uploads.utils.MAX_UPLOAD_SIZE,
+        "required": True
+    },
+    "chunk_size": {
+        "type": "integer",
+        "min": 1,
+        "max": virtool.uploads.utils.MAX_CHUNK_SIZE,
+        "default": virtool.uploads.utils.DEFAULT_CHUNK_SIZE
+    }
+})
+async def create_session(req):
+    """
+    Start a resumable upload. The file is sent as numbered chunks that can be uploaded in any order, in parallel, and
+    retried individually.
+
+    """
+    data = req["data"]
+
+    if not await req.app["run_in_thread"](virtool.uploads.utils.has_space, req.app["settings"], data["size"]):
+        return insufficient_storage("Not enough free space for upload")
+
+    document = await virtool.uploads.db.create_session(
+        req.app["db"],
+        req.app["settings"],
+        req.app["run_in_thread"],
+        data["name"],
+        data["type"],
+        data["size"],
+        data["chunk_size"],
+        req["client"].user_id
+    )
+
+    headers = {
+        "Location": f"/upload/sessions/{document['_id']}"
+    }
+
+    return json_response(virtool.utils.base_processor(document), status=201, headers=headers)
+
+
+@routes.get("/upload/sessions/{upload_id}", permission="upload_file")
+async def get_session(req):
+    """
+    Get a resumable upload session. The `received` field lists the chunks that have been stored and do not need to be
+    sent again.
+
+    """
+    session = await get_owned_session(req)
+
+    if session is None:
+        return not_found()
+
+    session["received"] = sorted(session["received"])
+
+    return json_response(virtool.utils.base_processor(session))
+
+
+@routes.put("/upload/sessions/{upload_id}/chunks/{index}", permission="upload_file")
+async def upload_chunk(req):
+    """
+    Store one chunk of a resumable upload. The request body is the raw chunk data. Each chunk is written directly to
+    its offset in the preallocated staging file.
+
+    """
+    db = req.app["db"]
+
+    session = await get_owned_session(req)
+
+    if session is None:
+        return not_found()
+
+    if session.get("completing"):
+        return conflict("Upload is being completed")
+
+    try:
+        index = int(req.match_info["index"])
+    except ValueError:
+        return not_found("Chunk not found")
+
+    if not 0 <= index < session["chunk_count"]:
+        return not_found("Chunk not found")
+
+    offset, length = virtool.uploads.utils.get_chunk_range(session["size"], session["chunk_size"], index)
+
+    if req.content_length is not None and req.content_length != length:
+        return bad_request(f"Chunk must be {length} bytes")
+
+    path = virtool.uploads.utils.join_upload_path(req.app["settings"], session["_id"])
+
+    run_in_thread = req.app["run_in_thread"]
+
+    # A chunk being rewritten is not valid until the new data has been completely received.
+    if not await virtool.uploads.db.begin_chunk(db, session["_id"], index):
+        return conflict("Upload is being completed")
+
+    received = 0
+
+    try:
+        fd = await run_in_thread(os.open, path, os.O_WRONLY)
+    except FileNotFoundError:
+        await virtool.uploads.db.end_chunk(db, session["_id"], index, False)
+        return not_found()
+
+    buffer = bytearray()
+
+    try:
+        async for data in req.content.iter_chunked(virtool.uploads.utils.BUFFER_SIZE):
+            buffer += data
+
+            if received + len(buffer) > length:
+                return bad_request(f"Chunk must be {length} bytes")
+
+            if len(buffer) >= virtool.uploads.utils.BUFFER_SIZE:
+                await run_in_thread(virtool.uploads.utils.write_at, fd, bytes(buffer), offset + received)
+                received += len(buffer)
+                buffer.clear()
+
+        if buffer:
+            await run_in_thread(virtool.uploads.utils.write_at, fd, bytes(buffer), offset + received)
+            received += len(buffer)
+    finally:
+        await run_in_thread(os.close, fd)
+
+        # The session can't be completed while any chunk is being written, so this must always run.
+        await virtool.uploads.db.end_chunk(db, session["_id"], index, received == length)
+
+    if received != length:
+        return bad_request(f"Chunk must be {length} bytes")
+
+    return no_content()
+
+
+@routes.post("/upload/sessions/{upload_id}/finalize", permission="upload_file", schema={
+    "checksum": {
+        "type": "string",
+        "regex": "^[a-f0-9]{64}$",
+        "required": True
+    }
+})
+async def finalize_session(req):
+    """
+    Complete a resumable upload. All chunks must have been received and the SHA-256 `checksum` of the file must match
+    the received data. The completed file is added to the file manager.
+
+    """
+    db = req.app["db"]
+
+    session = await get_owned_session(req)
+
+    if session is None:
+        return not_found()
+
+    if session.get("completing"):
+        return conflict("Upload is being completed")
+
+    missing = sorted(set(range(session["chunk_count"])) - set(session["received"]))
+
+    if missing:
+        return conflict(f"Missing chunks: {', '.join(str(index) for index in missing)}")
+
+    # Claiming the session stops chunks from being written while the checksum is calculated and the file is moved.
+    if not await virtool.uploads.db.claim_session(db, session):
+        return conflict("Chunks are being uploaded or the upload is being completed")
+
+    try:
+        checksum = await req.app["run_in_thread"](
+            virtool.utils.calculate_checksum,
+            virtool.uploads.utils.join_upload_path(req.app["settings"], session["_id"]),
+            virtool.uploads.utils.BUFFER_SIZE * 4
+        )
+    except Exception:
+        await virtool.uploads.db.release_session(db, session["_id"])
+        raise
+
+    if checksum != req["data"]["checksum"]:
+        await virtool.uploads.db.release_session(db, session["_id"])
+        return bad_request("Checksum does not match uploaded data")
+
+    document = await virtool.uploads.db.complete_session(req.app, session)
+
+    file_id = document["id"]
+
+    await virtool.uploads.db.finish_upload(req.app, file_id, checksum)
+
+    logger.debug(f"Resumable upload succeeded: {file_id}")
+
+    headers = {
+        "Location": f"/api/files/{file_id}"
+    }
+
+    return json_response(document, status=201, headers=headers)
+
+
+@routes.delete("/upload/sessions/{upload_id}", permission="upload_file")
+async def remove_session(req):
+    """
+    Abort a resumable upload and remove any data received for it.
+
+    """
+    session = await get_owned_session(req)
+
+    if session is None:
+        return not_found()
+
+    if session.get("completing"):
+        return conflict("Upload is being completed")
+
+    await virtool.uploads.db.remove_session(
+        req.app["db"],
+        req.app["settings"],
+        req.app["run_in_thread"],
+        session["_id"]
+    )
+
+    return no_content()
+
 
 @routes.post("/upload/{file_type}", permission="upload_file")
 async def upload(req):
@@ -79,9 +344,9 @@ async def upload(req):
     file_id = document["id"]
 
     try:
-        await naive_writer(req, file_id)
+        content_hash = await naive_writer(req, file_id)
 
-        await virtool.uploads.db.finish_upload(req.app, file_id)
+        await virtool.uploads.db.finish_upload(req.app, file_id, content_hash)
 
         logger.debug(f"Upload succeeded: {file_id}")
 
@@ -138,7 +403,9 @@ async def replace_sample_file(req):
         reserved=True
     )
 
-    await naive_writer(req, document["id"])
+    content_hash = await naive_writer(req, document["id"])
+
+    await virtool.uploads.db.finish_upload(req.app, document["id"], content_hash)
 
     replacement = {
         "id": document["id"],
@@ -1,15 +1,331 @@
+import asyncio
+import datetime
+import logging
 import os
+from typing import Optional
+
+import virtool.db.utils
+import virtool.files.db
+import virtool.files.utils
+import virtool.uploads.utils
 import virtool.utils
 
+logger = logging.getLogger(__name__)
+
+
+def get_expires_at() -> datetime.datetime:
+    """
+    Get the time a resumable upload session should expire at if no more chunks are received for it.
+
+    :return: the expiry time
+
+    """
+    return virtool.utils.timestamp() + datetime.timedelta(seconds=virtool.uploads.utils.SESSION_TTL)
+
 
-async def finish_upload(app, file_id):
+async def finish_upload(app, file_id: str, content_hash: Optional[str] = None):
+    """
+    Mark the upload with `file_id` as ready and record its size. If a `content_hash` is provided, the file is added to
+    the content-addressed blob store.
+
+    :param app: the application object
+    :param file_id: the id of the uploaded file
+    :param content_hash: the SHA-256 hex digest of the file content
+
+    """
     path = os.path.join(app["settings"]["data_path"], "files", file_id)
 
     size = virtool.utils.file_stats(path)["size"]
 
+    if content_hash:
+        await virtool.files.db.attach_blob(
+            app["db"],
+            app["settings"],
+            app["run_in_thread"],
+            file_id,
+            content_hash,
+            size
+        )
+
     await app["db"].files.update_one({"_id": file_id}, {
         "$set": {
             "size": size,
             "ready": True
         }
     })
+
+
+async def create_session(
+        db,
+        settings: dict,
+        run_in_thread: callable,
+        name: str,
+        file_type: str,
+        size: int,
+        chunk_size: int,
+        user_id: str
+) -> dict:
+    """
+    Create a session for a resumable upload and preallocate its staging file.
+
+    :param db: the application database object
+    :param settings: the application settings
+    :param run_in_thread: the application thread running function
+    :param name: the name of the file being uploaded
+    :param file_type: the type of the file (eg. reads)
+    :param size: the size of the complete file in bytes
+    :param chunk_size: the size of each chunk in bytes
+    :param user_id: the id of the uploading user
+    :return: the session document
+
+    """
+    upload_id = await virtool.db.utils.get_new_id(db.uploads)
+
+    await run_in_thread(
+        virtool.uploads.utils.preallocate,
+        virtool.uploads.utils.join_upload_path(settings, upload_id),
+        size
+    )
+
+    document = {
+        "_id": upload_id,
+        "name": name,
+        "type": file_type,
+        "size": size,
+        "chunk_size": chunk_size,
+        "chunk_count": virtool.uploads.utils.get_chunk_count(size, chunk_size),
+        "received": [],
+        "writing": 0,
+        "user": {
+            "id": user_id
+        },
+        "created_at": virtool.utils.timestamp(),
+        "expires_at": get_expires_at()
+    }
+
+    await db.uploads.insert_one(document)
+
+    return document
+
+
+async def begin_chunk(db, upload_id: str, index: int) -> bool:
+    """
+    Record that the chunk at `index` is being written for the upload session with `upload_id`. The chunk is no longer
+    counted as received until :func:`.end_chunk` is called.
+
+    Returns `False` without changing the session if it is being completed.
+
+    :param db: the application database object
+    :param upload_id: the id of the upload session
+    :param index: the index of the chunk
+    :return: a boolean indicating if the chunk can be written
+
+    """
+    update_result = await db.uploads.update_one({"_id": upload_id, "completing": {"$ne": True}}, {
+        "$pull": {
+            "received": index
+        },
+        "$inc": {
+            "writing": 1
+        }
+    })
+
+    return bool(update_result.matched_count)
+
+
+async def end_chunk(db, upload_id: str, index: int, received: bool):
+    """
+    Record that writing the chunk at `index` has finished for the upload session with `upload_id`. The chunk is marked
+    as received if it was completely written.
+
+    :param db: the application database object
+    :param upload_id: the id of the upload session
+    :param index: the index of the chunk
+    :param received: the chunk was completely written
+
+    """
+    update = {
+        "$inc": {
+            "writing": -1
+        }
+    }
+
+    if received:
+        update.update({
+            "$addToSet": {
+                "received": index
+            },
+            "$set": {
+                "expires_at": get_expires_at()
+            }
+        })
+
+    await db.uploads.update_one({"_id": upload_id}, update)
+
+
+async def claim_session(db, session: dict) -> bool:
+    """
+    Mark the upload `session` as completing so no more chunks can be written to it. The session is only claimed if all
+    of its chunks have been received and none are being written.
+
+    :param db: the application database object
+    :param session: the session document
+    :return: a boolean indicating if the session was claimed
+
+    """
+    update_result = await db.uploads.update_one({
+        "_id": session["_id"],
+        "completing": {"$ne": True},
+        "writing": {"$not": {"$gt": 0}},
+        "received": {"$all": list(range(session["chunk_count"]))}
+    }, {
+        "$set": {
+            "completing": True
+        }
+    })
+
+    return bool(update_result.matched_count)
+
+
+async def release_session(db, upload_id: str):
+    """
+    Remove the completing mark from the upload session with `upload_id` so chunks can be written to it again.
+
+    :param db: the application database object
+    :param upload_id: the id of the upload session
+
+    """
+    await db.uploads.update_one({"_id": upload_id}, {
+        "$unset": {
+            "completing": ""
+        }
+    })
+
+
+async def complete_session(app, session: dict) -> dict:
+    """
+    Move the staging file of a fully received upload `session` into the files directory and create a file document
+    for it. The session is removed once the file has been moved.
+
+    The session must have been claimed with :func:`.claim_session`. If the file can't be moved, the session is
+    released so completion can be retried.
+
+    :param app: the application object
+    :param session: the session document
+    :return: the file document
+
+    """
+    db = app["db"]
+    settings = app["settings"]
+
+    document = None
+
+    try:
+        document = await virtool.files.db.create(
+            db,
+            session["name"],
+            session["type"],
+            user_id=session["user"]["id"]
+        )
+
+        await app["run_in_thread"](
+            os.rename,
+            virtool.uploads.utils.join_upload_path(settings, session["_id"]),
+            virtool.files.utils.join_file_path(settings, document["id"])
+        )
+    except Exception:
+        if document:
+            await db.files.delete_one({"_id": document["id"]})
+
+        await release_session(db, session["_id"])
+
+        raise
+
+    await db.uploads.delete_one({"_id": session["_id"]})
+
+    return document
+
+
+async def remove_session(db, settings: dict, run_in_thread: callable, upload_id: str) -> int:
+    """
+    Remove the resumable upload session with `upload_id` and its staging file.
+
+    :param db: the application database object
+    :param settings: the application settings
+    :param run_in_thread: the application thread running function
+    :param upload_id: the id of the session to remove
+    :return: the number of removed sessions
+
+    """
+    delete_result = await db.uploads.delete_one({"_id": upload_id})
+
+    try:
+        await run_in_thread(virtool.utils.rm, virtool.uploads.utils.join_upload_path(settings, upload_id))
+    except FileNotFoundError:
+        pass
+
+    return delete_result.deleted_count
+
+
+async def remove_expired_sessions(app):
+    """
+    Remove upload sessions that have expired and staging files that no longer belong to a session.
+
+    Expired session documents are also removed by a TTL index, so staging files are removed if they have no session
+    document and haven't been written to for :data:`~virtool.uploads.utils.SWEEP_INTERVAL` seconds.
+
+    :param app: the application object
+
+    """
+    db = app["db"]
+    settings = app["settings"]
+    run_in_thread = app["run_in_thread"]
+
+    query = {
+        "expires_at": {
+            "$lt": virtool.utils.timestamp()
+        },
+        "completing": {
+            "$ne": True
+        }
+    }
+
+    for upload_id in await db.uploads.distinct("_id", query):
+        await remove_session(db, settings, run_in_thread, upload_id)
+
+    stale = await run_in_thread(
+        virtool.uploads.utils.get_stale_staging_files,
+        settings,
+        set(await db.uploads.distinct("_id")),
+        virtool.uploads.utils.SWEEP_INTERVAL
+    )
+
+    for upload_id in stale:
+        await run_in_thread(virtool.utils.rm, virtool.uploads.utils.join_upload_path(settings, upload_id))
+
+    if stale:
+        logger.info(f"Removed {len(stale)} orphaned upload staging files")
+
+
+async def sweep(app):
+    """
+    To be run in job scheduler. Removes expired upload sessions and their staging files every
+    :data:`~virtool.uploads.utils.SWEEP_INTERVAL` seconds.
+
+    :param app: the application object
+
+    """
+    try:
+        logging.debug("Started upload sweeper")
+
+        while True:
+            try:
+                await remove_expired_sessions(app)
+            except OSError as err:
+                logger.warning(f"Could not remove expired upload sessions: {err}")
+
+            await asyncio.sleep(virtool.uploads.utils.SWEEP_INTERVAL)
+    except asyncio.CancelledError:
+        pass
+
+    logging.debug("Stopped upload sweeper")
@@ -0,0 +1,146 @@
+import math
+import os
+import shutil
+import time
+from typing import Tuple
+
+#: The number of bytes of request data to buffer before each write to disk.
+BUFFER_SIZE = 1024 * 1024
+
+#: The chunk size used for resumable uploads if the client does not request one.
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+#: The largest chunk size allowed for resumable uploads.
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+
+#: The largest file that can be sent as a resumable upload.
+MAX_UPLOAD_SIZE = 100 * 1024 * 1024 * 1024
+
+#: The number of bytes that must be left free in the data path after a staging file is allocated.
+FREE_SPACE_MARGIN = 1024 * 1024 * 1024
+
+#: The number of seconds a resumable upload session is kept after its last chunk is received.
+SESSION_TTL = 24 * 60 * 60
+
+#: The number of seconds between sweeps for expired upload sessions and orphaned staging files.
+SWEEP_INTERVAL = 60 * 60
+
+
+def join_upload_path(settings: dict, upload_id: str) -> str:
+    """
+    Return the path to the staging file for the resumable upload with `upload_id`. Staging files are kept out of the
+    files directory until they are complete.
+
+    :param settings: the application settings
+    :param upload_id: the id of the upload session
+    :return: the staging file path
+
+    """
+    return os.path.join(settings["data_path"], "uploads", upload_id)
+
+
+def has_space(settings: dict, size: int) -> bool:
+    """
+    Check if a staging file of `size` bytes can be allocated while leaving :data:`FREE_SPACE_MARGIN` bytes free in the
+    data path.
+
+    :param settings: the application settings
+    :param size: the size of the staging file
+    :return: a boolean indicating if there is enough free space
+
+    """
+    return shutil.disk_usage(settings["data_path"]).free - size >= FREE_SPACE_MARGIN
+
+
+def get_chunk_count(size: int, chunk_size: int) -> int:
+    """
+    Return the number of chunks needed to upload a file of `size` bytes in chunks of `chunk_size` bytes. Empty files
+    are uploaded as a single empty chunk.
+
+    :param size: the file size
+    :param chunk_size: the chunk size
+    :return: the number of chunks
+
+    """
+    return max(1, math.ceil(size / chunk_size))
+
+
+def get_chunk_range(size: int, chunk_size: int, index: int) -> Tuple[int, int]:
+    """
+    Return the offset and length of the chunk at `index` in a file of `size` bytes.
+
+    :param size: the file size
+    :param chunk_size: the chunk size
+    :param index: the zero-based index of the chunk
+    :return: the offset and length of the chunk
+
+    """
+    offset = index * chunk_size
+    return offset, min(chunk_size, size - offset)
+
+
+def preallocate(path: str, size: int):
+    """
+    Create a file at `path` with `size` bytes allocated so chunks can be written into it at any offset.
+
+    :param path: the path to create the file at
+    :param size: the number of bytes to allocate
+
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+
+    try:
+        if size:
+            try:
+                os.posix_fallocate(fd, 0, size)
+            except (AttributeError, OSError):
+                # Not every platform and filesystem supports allocation. A sparse file works too.
+                os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+
+
+def write_at(fd: int, data: bytes, offset: int):
+    """
+    Write all of `data` to the file descriptor `fd` at `offset`. Positional writes do not move the file position, so
+    multiple chunks can be written to the same file concurrently.
+
+    :param fd: a file descriptor open for writing
+    :param data: the data to write
+    :param offset: the file offset to write at
+
+    """
+    view = memoryview(data)
+
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+
+def get_stale_staging_files(settings: dict, upload_ids: set, max_age: int) -> list:
+    """
+    Return the ids of staging files that don't belong to any of the sessions in `upload_ids` and haven't been modified
+    for `max_age` seconds. The age check keeps files that are being allocated for new sessions.
+
+    :param settings: the application settings
+    :param upload_ids: the ids of existing upload sessions
+    :param max_age: the number of seconds since modification after which an orphaned file is stale
+    :return: the ids of stale staging files
+
+    """
+    uploads_path = os.path.join(settings["data_path"], "uploads")
+
+    try:
+        entries = list(os.scandir(uploads_path))
+    except FileNotFoundError:
+        return list()
+
+    cutoff = time.time() - max_age
+
+    return [
+        entry.name for entry in entries
+        if entry.is_file() and entry.name not in upload_ids and entry.stat().st_mtime < cutoff
+    ]
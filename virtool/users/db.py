@@ -324,3 +324,5 @@ async def update_sessions_and_keys(db, user_id, administrator, groups, permissio
             "permissions": permissions
         }
     })
+
+    db.auth_cache.remove_user(user_id)
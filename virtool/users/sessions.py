@@ -51,6 +51,8 @@ async def create_session(db, ip, user_id=None, remember=False):
 
     await db.sessions.insert_one(session)
 
+    db.auth_cache.set_session(session_id, session, token)
+
     return session, token
 
 
@@ -79,12 +81,23 @@ async def get_session(db: virtool.db.core.DB, session_id: str, session_token: st
 
     Will return `None` if the session doesn't exist or the session id and token do not go together.
 
+    Sessions are cached with the token they were retrieved with, so repeat requests from the same client don't query
+    the database or hash the token again.
+
     :param db: the application database client
     :param session_id: the session id
     :param session_token: the token for the session
     :return: a session document
 
     """
+    if session_id is None:
+        return None
+
+    document = db.auth_cache.get_session(session_id, session_token)
+
+    if document:
+        return document
+
     document = await db.sessions.find_one({
         "_id": session_id
     })
@@ -95,6 +108,7 @@ async def get_session(db: virtool.db.core.DB, session_id: str, session_token: st
     try:
         document_token = document["token"]
     except KeyError:
+        db.auth_cache.set_session(session_id, document, session_token)
         return document
 
     if session_token is None:
@@ -103,6 +117,7 @@ async def get_session(db: virtool.db.core.DB, session_id: str, session_token: st
     hashed_token = hashlib.sha256(session_token.encode()).hexdigest()
 
     if document_token == hashed_token:
+        db.auth_cache.set_session(session_id, document, session_token)
         return document
 
 
@@ -130,6 +145,8 @@ async def create_reset_code(db, session_id, user_id, remember=False):
         }
     })
 
+    db.auth_cache.remove_session(session_id)
+
     return reset_code
 
 
@@ -144,6 +161,8 @@ async def check_reset_code(db, session_id, reset_code):
         }
     })
 
+    db.auth_cache.remove_session(session_id)
+
     db_reset_code = session.get("reset_code")
 
     return db_reset_code and db_reset_code == reset_code
@@ -165,6 +184,8 @@ async def clear_reset_code(db: virtool.db.core.DB, session_id: str):
         }
     })
 
+    db.auth_cache.remove_session(session_id)
+
 
 async def replace_session(
         db: virtool.db.core.DB,
@@ -187,8 +208,11 @@ async def replace_session(
     :return: new session document and token
     """
     await db.sessions.delete_one({"_id": session_id})
+    db.auth_cache.remove_session(session_id)
+
     return await create_session(db, ip, user_id, remember=remember)
 
 
 async def invalidate_sessions_by_user(db, user_id):
     await db.sessions.delete_many({"user.id": user_id})
+    db.auth_cache.remove_user(user_id)
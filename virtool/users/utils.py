@@ -1,7 +1,17 @@
 import hashlib
+import secrets
+import time
+from typing import Union
 
 import bcrypt
 
+#: The number of seconds session and API key documents are cached for by :class:`.AuthCache`. Changes made by other API
+#: processes can take this long to be seen.
+AUTH_CACHE_TTL = 10
+
+#: The number of entries kept in each :class:`.AuthCache` table. A table is cleared when it is full.
+AUTH_CACHE_SIZE = 10000
+
 #: A list of the permission strings used by Virtool.
 PERMISSIONS = [
     "cancel_job",
@@ -15,6 +25,122 @@ PERMISSIONS = [
 ]
 
 
+class AuthCache:
+    """
+    Caches the session and API key documents used to authorize requests so most requests don't need to query the
+    database or hash secrets.
+
+    Entries expire after :data:`AUTH_CACHE_TTL` seconds. They are removed sooner when sessions or user permissions are
+    changed in this process.
+
+    """
+
+    def __init__(self):
+        #: Session documents and the tokens they were retrieved with keyed by session id.
+        self._sessions = dict()
+
+        #: API key documents keyed by user id and raw API key.
+        self._keys = dict()
+
+    def get_session(self, session_id: str, token: Union[str, None]) -> Union[dict, None]:
+        """
+        Get the cached session with `session_id` if it was cached with the same `token`.
+
+        :param session_id: the session id
+        :param token: the session token sent by the client
+        :return: the session document
+
+        """
+        try:
+            expires_at, (document, cached_token) = self._sessions[session_id]
+        except KeyError:
+            return None
+
+        if expires_at < time.monotonic():
+            self._sessions.pop(session_id, None)
+            return None
+
+        if token is None or cached_token is None:
+            return document if token is cached_token else None
+
+        if secrets.compare_digest(token.encode(), cached_token.encode()):
+            return document
+
+        return None
+
+    def set_session(self, session_id: str, document: dict, token: Union[str, None]):
+        """
+        Cache a session `document` that was retrieved with `token`.
+
+        :param session_id: the session id
+        :param document: the session document
+        :param token: the session token sent by the client
+
+        """
+        _set_entry(self._sessions, session_id, (document, token))
+
+    def remove_session(self, session_id: str):
+        """
+        Remove the session with `session_id` from the cache.
+
+        :param session_id: the session id
+
+        """
+        self._sessions.pop(session_id, None)
+
+    def get_key(self, user_id: str, key: str) -> Union[dict, None]:
+        """
+        Get the cached API key document for `user_id` and the raw `key`.
+
+        :param user_id: the user id
+        :param key: the raw API key
+        :return: the API key document
+
+        """
+        try:
+            expires_at, document = self._keys[(user_id, key)]
+        except KeyError:
+            return None
+
+        if expires_at < time.monotonic():
+            self._keys.pop((user_id, key), None)
+            return None
+
+        return document
+
+    def set_key(self, user_id: str, key: str, document: dict):
+        """
+        Cache an API key `document`.
+
+        :param user_id: the user id
+        :param key: the raw API key
+        :param document: the API key document
+
+        """
+        _set_entry(self._keys, (user_id, key), document)
+
+    def remove_user(self, user_id: str):
+        """
+        Remove all sessions and API keys belonging to the user with `user_id` from the cache.
+
+        :param user_id: the user id
+
+        """
+        self._sessions = {
+            session_id: entry for session_id, entry in self._sessions.items()
+            if entry[1][0].get("user", {}).get("id") != user_id
+        }
+
+        self._keys = {key: entry for key, entry in self._keys.items() if key[0] != user_id}
+
+
+def _set_entry(entries: dict, key, value):
+    if len(entries) >= AUTH_CACHE_SIZE:
+        entries.clear()
+
+    entries[key] = (time.monotonic() + AUTH_CACHE_TTL, value)
+
+
 def calculate_identicon(user_id: str) -> str:
     """
     Calculate an identicon hash string based on a user name.
@@ -1,5 +1,6 @@
 import datetime
 import gzip
+import hashlib
 import os
 import re
 import shutil
@@ -16,6 +17,7 @@ import arrow
 RE_STATIC_HASH = re.compile("^main.([a-z0-9]+).css$")
 
 SUB_DIRS = [
+    "blobs",
     "caches",
     "files",
     "references",
@@ -23,7 +25,8 @@ SUB_DIRS = [
     "samples",
     "history",
     "hmm",
-    "logs/jobs"
+    "logs/jobs",
+    "uploads"
 ]
 
 
@@ -167,6 +170,24 @@ def file_length(path):
     return i + 1
 
 
+def calculate_checksum(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Calculate the SHA-256 checksum of the file at `path`.
+
+    :param path: the path to the file
+    :param chunk_size: the number of bytes to read at a time
+    :return: the hex digest of the file contents
+
+    """
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
 def file_stats(path: str) -> dict:
     """
     Return the size and last modification date for the file at `path`.